@@ -0,0 +1,93 @@
+import asyncio
+import collections
+
+
+class ConcurrencyLimit:
+    """
+    Admit at most max_in_flight calls at a time. Up to max_queued more calls
+    wait for a slot for at most max_wait seconds, anything beyond that is
+    shed straight away so the server stays responsive under load.
+
+    The counters are totals since the limit was created: admitted calls
+    (including those that had to wait), calls that were queued and calls
+    that were shed.
+    """
+
+    def __init__(self, max_in_flight, max_queued=0, max_wait=0.1):
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.max_wait = max_wait
+
+        self.in_flight = 0
+        self.admitted = 0
+        self.queued = 0
+        self.shed = 0
+
+        self._waiters = collections.deque()
+
+    @property
+    def waiting(self):
+        return len(self._waiters)
+
+    async def acquire(self):
+        """
+        Take a slot, waiting in the queue if there is room. Returns False if
+        the call should be shed.
+        """
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+
+        if len(self._waiters) >= self.max_queued:
+            self.shed += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+        except asyncio.TimeoutError:
+            self._pass_on(waiter)
+            self.shed += 1
+            return False
+        except BaseException:
+            self._pass_on(waiter)
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+        self.admitted += 1
+        return True
+
+    def release(self):
+        """
+        Give back a slot, handing it straight to the next queued call if
+        there is one.
+        """
+        while self._waiters:
+            waiter = self._waiters.popleft()
+
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+        self.in_flight -= 1
+
+    def _pass_on(self, waiter):
+        # The slot may have been handed over just as we stopped waiting for
+        # it, the next call gets it instead.
+        if waiter.done() and not waiter.cancelled():
+            self.release()
+
+    def stats(self):
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "shed": self.shed,
+        }
@@ -1,25 +1,59 @@
 import asyncio
+import functools
+import inspect
 import io
+import time
+import weakref
 
 import aiohttp
+import grpc.aio
 import grpc.experimental.aio
 
 from sonora import protocol
 import sonora.client
+import sonora.compression
 
+# Failures to reach the server at all, which retry and hedging policies and
+# the balancer treat as UNAVAILABLE, as gRPC does.
+_TRANSPORT_ERRORS = (aiohttp.ClientConnectionError,)
 
-def insecure_web_channel(url):
-    return WebChannel(url)
 
+def insecure_web_channel(url, compression=None, interceptors=None):
+    return WebChannel(url, compression=compression, interceptors=interceptors)
 
-class WebChannel:
-    def __init__(self, url):
-        if not url.startswith("http") and "://" not in url:
-            url = f"http://{url}"
 
-        self._url = url
+class WebChannel:
+    def __init__(
+        self,
+        url,
+        compression=None,
+        compression_threshold=sonora.compression.DEFAULT_THRESHOLD,
+        interceptors=None,
+        pool_maxsize=100,
+        idle_timeout=15.0,
+        dns_cache_ttl=10,
+        connector=None,
+        service_config=None,
+        max_receive_message_length=4 * 1024 * 1024,
+    ):
+        self._url, self._balancer = sonora.client._target(url)
+
+        owns_connector = connector is None
+        if owns_connector:
+            connector = Connector(
+                limit=pool_maxsize,
+                keepalive_timeout=idle_timeout,
+                ttl_dns_cache=dns_cache_ttl,
+            )
 
-        self._session = aiohttp.ClientSession()
+        self._session = aiohttp.ClientSession(
+            connector=connector, connector_owner=owns_connector
+        )
+        self._codec = sonora.compression.resolve(compression)
+        self._compression_threshold = compression_threshold
+        self._max_receive_message_length = max_receive_message_length
+        self._interceptors = tuple(interceptors or ())
+        self._service_config = sonora.client._service_config(service_config)
 
     async def __aenter__(self):
         return self
@@ -27,45 +61,206 @@ class WebChannel:
     async def __aexit__(self, exception_type, exception_value, traceback):
         await self._session.close()
 
+    def stats(self):
+        """
+        Connection counts for the channel's connector, see Connector.stats().
+        """
+        return self._session.connector.stats()
+
     def __await__(self):
         yield self
 
     def unary_unary(self, path, request_serializer, response_deserializer):
         return UnaryUnaryMulticallable(
-            self._session, self._url, path, request_serializer, response_deserializer
+            self._session,
+            self._url,
+            path,
+            request_serializer,
+            response_deserializer,
+            codec=self._codec,
+            compression_threshold=self._compression_threshold,
+            max_receive_message_length=self._max_receive_message_length,
+            interceptors=self._interceptors,
+            balancer=self._balancer,
+            service_config=self._service_config,
         )
 
     def unary_stream(self, path, request_serializer, response_deserializer):
         return UnaryStreamMulticallable(
-            self._session, self._url, path, request_serializer, response_deserializer
+            self._session,
+            self._url,
+            path,
+            request_serializer,
+            response_deserializer,
+            codec=self._codec,
+            compression_threshold=self._compression_threshold,
+            max_receive_message_length=self._max_receive_message_length,
+            interceptors=self._interceptors,
+            balancer=self._balancer,
         )
 
     def stream_unary(self, path, request_serializer, response_deserializer):
-        return sonora.client.NotImplementedMulticallable()
+        return StreamUnaryMulticallable(
+            self._session,
+            self._url,
+            path,
+            request_serializer,
+            response_deserializer,
+            codec=self._codec,
+            compression_threshold=self._compression_threshold,
+            max_receive_message_length=self._max_receive_message_length,
+            interceptors=self._interceptors,
+            balancer=self._balancer,
+        )
 
     def stream_stream(self, path, request_serializer, response_deserializer):
-        return sonora.client.NotImplementedMulticallable()
+        return StreamStreamMulticallable(
+            self._session,
+            self._url,
+            path,
+            request_serializer,
+            response_deserializer,
+            codec=self._codec,
+            compression_threshold=self._compression_threshold,
+            max_receive_message_length=self._max_receive_message_length,
+            interceptors=self._interceptors,
+            balancer=self._balancer,
+        )
+
+
+class Connector(aiohttp.TCPConnector):
+    """
+    An aiohttp.TCPConnector that counts how its connections are used. Pass
+    one to several WebChannels as connector to share connections between
+    them.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
 
+        # Every connection handed out by connect() and the ones among them
+        # that haven't been released yet, by their protocol.
+        self._protocols = weakref.WeakSet()
+        self._busy = weakref.WeakSet()
+        self._created = 0
+        self._reused = 0
+
+    async def connect(self, req, traces, timeout):
+        connection = await super().connect(req, traces, timeout)
+        protocol = connection.protocol
+
+        if protocol in self._protocols:
+            self._reused += 1
+        else:
+            self._protocols.add(protocol)
+            self._created += 1
+
+        self._busy.add(protocol)
+        connection.add_callback(functools.partial(self._busy.discard, protocol))
+
+        return connection
+
+    def stats(self):
+        """
+        Return the number of connections currently open, idle and in use by
+        a call, and how many requests opened a new connection or reused an
+        idle one so far.
+        """
+        open = [protocol for protocol in self._protocols if protocol.is_connected()]
+        in_use = sum(1 for protocol in open if protocol in self._busy)
+
+        return {
+            "open": len(open),
+            "idle": len(open) - in_use,
+            "in_use": in_use,
+            "created": self._created,
+            "reused": self._reused,
+        }
+
+
+class _InterceptableMulticallable(sonora.client.Multicallable):
+    def _call_details(self, timeout, metadata):
+        return grpc.aio.ClientCallDetails(
+            self._path, timeout, grpc.aio.Metadata(*(metadata or ())), None, None
+        )
+
+    async def _continue(self, client_call_details, request):
+        return self._invoke(
+            request,
+            client_call_details.timeout,
+            client_call_details.metadata,
+            self._url_for(client_call_details.method),
+        )
+
+
+class UnaryUnaryMulticallable(_InterceptableMulticallable):
+    _interceptor_class = grpc.aio.UnaryUnaryClientInterceptor
+    _intercept_method = "intercept_unary_unary"
 
-class UnaryUnaryMulticallable(sonora.client.Multicallable):
     def __call__(self, request, timeout=None, metadata=None):
+        if self._intercepted is not None:
+            return InterceptedUnaryUnaryCall(
+                self._intercepted, self._call_details(timeout, metadata), request
+            )
+
+        return self._invoke(request, timeout, metadata, self._rpc_url)
+
+    def _invoke(self, request, timeout, metadata, url):
+        if self._method_config is None:
+            return self._attempt(request, timeout, metadata, url)
+
+        if timeout is None:
+            timeout = self._method_config.timeout
+
+        if (
+            self._method_config.retry_policy is None
+            and self._method_config.hedging_policy is None
+        ):
+            return self._attempt(request, timeout, metadata, url)
+
+        return PolicyCall(self, request, timeout, metadata, url)
+
+    def _attempt(self, request, timeout, metadata, url):
         call_metadata = self._metadata.copy()
         if metadata is not None:
             call_metadata.extend(protocol.encode_headers(metadata))
 
-        return UnaryUnaryCall(
+        if self._balancer is not None:
+            endpoint = self._balancer.pick(metadata)
+            url = self._balanced_url(endpoint, url)
+
+        call = UnaryUnaryCall(
             request,
             timeout,
             call_metadata,
-            self._rpc_url,
+            url,
             self._session,
             self._serializer,
             self._deserializer,
+            codec=self._codec,
+            compression_threshold=self._compression_threshold,
+            max_receive_message_length=self._max_receive_message_length,
         )
 
+        if self._balancer is not None:
+            call._balanced = (self._balancer, endpoint)
+
+        return call
+
+
+class UnaryStreamMulticallable(_InterceptableMulticallable):
+    _interceptor_class = grpc.aio.UnaryStreamClientInterceptor
+    _intercept_method = "intercept_unary_stream"
 
-class UnaryStreamMulticallable(sonora.client.Multicallable):
     def __call__(self, request, timeout=None, metadata=None):
+        if self._intercepted is not None:
+            return InterceptedUnaryStreamCall(
+                self._intercepted, self._call_details(timeout, metadata), request
+            )
+
+        return self._invoke(request, timeout, metadata, self._rpc_url)
+
+    def _invoke(self, request, timeout, metadata, url):
         call_metadata = self._metadata.copy()
         if metadata is not None:
             call_metadata.extend(protocol.encode_headers(metadata))
@@ -74,10 +269,53 @@ class UnaryStreamMulticallable(sonora.client.Multicallable):
             request,
             timeout,
             call_metadata,
-            self._rpc_url,
+            self._route(url, metadata),
+            self._session,
+            self._serializer,
+            self._deserializer,
+            codec=self._codec,
+            compression_threshold=self._compression_threshold,
+            max_receive_message_length=self._max_receive_message_length,
+        )
+
+
+class StreamUnaryMulticallable(sonora.client.Multicallable):
+    def __call__(self, request_iterator, timeout=None, metadata=None):
+        call_metadata = self._metadata.copy()
+        if metadata is not None:
+            call_metadata.extend(protocol.encode_headers(metadata))
+
+        return StreamUnaryCall(
+            request_iterator,
+            timeout,
+            call_metadata,
+            self._route(self._rpc_url, metadata),
+            self._session,
+            self._serializer,
+            self._deserializer,
+            codec=self._codec,
+            compression_threshold=self._compression_threshold,
+            max_receive_message_length=self._max_receive_message_length,
+        )
+
+
+class StreamStreamMulticallable(sonora.client.Multicallable):
+    def __call__(self, request_iterator, timeout=None, metadata=None):
+        call_metadata = self._metadata.copy()
+        if metadata is not None:
+            call_metadata.extend(protocol.encode_headers(metadata))
+
+        return StreamStreamCall(
+            request_iterator,
+            timeout,
+            call_metadata,
+            self._route(self._rpc_url, metadata),
             self._session,
             self._serializer,
             self._deserializer,
+            codec=self._codec,
+            compression_threshold=self._compression_threshold,
+            max_receive_message_length=self._max_receive_message_length,
         )
 
 
@@ -99,9 +337,7 @@ class Call(sonora.client.Call):
 
             self._response = await self._session.post(
                 self._url,
-                data=protocol.wrap_message(
-                    False, False, self._serializer(self._request)
-                ),
+                data=self._request_body(),
                 headers=dict(self._metadata),
                 timeout=timeout,
             )
@@ -119,8 +355,58 @@ class Call(sonora.client.Call):
 
 
 class UnaryUnaryCall(Call):
-    @Call._raise_timeout(asyncio.TimeoutError)
+    # The outcome of the call, kept so that awaiting it again (as client
+    # interceptors do) doesn't read the released response a second time.
+    _done = False
+    _result = None
+    _error = None
+
+    # The balancer and endpoint the call was sent to, told of its outcome
+    # once it's known.
+    _balanced = None
+
+    def __del__(self):
+        self._abandon()
+        super().__del__()
+
     def __await__(self):
+        if not self._done:
+            try:
+                self._result = yield from self._read_response()
+            except grpc.RpcError as exc:
+                self._error = exc
+            except asyncio.CancelledError:
+                self._abandon()
+                raise
+            except _TRANSPORT_ERRORS as exc:
+                self._release(sonora.client._rpc_error(exc))
+                raise
+            except Exception as exc:
+                self._release(exc)
+                raise
+
+            self._done = True
+            self._release(self._error)
+
+        if self._error is not None:
+            raise self._error
+
+        return self._result
+
+    def _release(self, error=None):
+        if self._balanced is not None:
+            balancer, endpoint = self._balanced
+            self._balanced = None
+            balancer.done(endpoint, error)
+
+    def _abandon(self):
+        if self._balanced is not None:
+            balancer, endpoint = self._balanced
+            self._balanced = None
+            balancer.abandon(endpoint)
+
+    @Call._raise_timeout(asyncio.TimeoutError)
+    def _read_response(self):
         response = yield from self._get_response().__await__()
 
         data = yield from response.read().__await__()
@@ -134,13 +420,14 @@ class UnaryUnaryCall(Call):
 
         messages = protocol.unwrap_message_stream(buffer)
 
-        trailers, _, message = next(messages)
+        trailers, compressed, message = next(messages)
 
         if trailers:
             self._trailers = protocol.unpack_trailers(message)
+            protocol.raise_for_status(response.headers, self._trailers)
             return
         else:
-            result = self._deserializer(message)
+            result = self._deserialize(compressed, message)
 
         try:
             trailers, _, message = next(messages)
@@ -152,7 +439,7 @@ class UnaryUnaryCall(Call):
             else:
                 raise ValueError("UnaryUnary should only return a single message")
 
-        protocol.raise_for_status(response.headers)
+        protocol.raise_for_status(response.headers, self._trailers)
 
         return result
 
@@ -162,14 +449,14 @@ class UnaryStreamCall(Call):
     async def read(self):
         response = await self._get_response()
 
-        async for trailers, _, message in protocol.unwrap_message_stream_async(
+        async for trailers, compressed, message in protocol.unwrap_message_stream_async(
             response.content
         ):
             if trailers:
                 self._trailers = protocol.unpack_trailers(message)
                 break
             else:
-                return self._deserializer(message)
+                return self._deserialize(compressed, message)
 
         response.release()
 
@@ -181,15 +468,282 @@ class UnaryStreamCall(Call):
     async def __aiter__(self):
         response = await self._get_response()
 
-        async for trailers, _, message in protocol.unwrap_message_stream_async(
+        async for trailers, compressed, message in protocol.unwrap_message_stream_async(
             response.content
         ):
             if trailers:
                 self._trailers = protocol.unpack_trailers(message)
                 break
             else:
-                yield self._deserializer(message)
+                yield self._deserialize(compressed, message)
 
         response.release()
 
         protocol.raise_for_status(response.headers, self._trailers)
+
+
+class PolicyCall:
+    """
+    A unary-unary call made of as many attempts as the method's retry or
+    hedging policy allows. Its metadata is that of the attempt that decided
+    the outcome.
+    """
+
+    _done = False
+    _result = None
+    _error = None
+
+    def __init__(self, multicallable, request, timeout, metadata, url):
+        self._multicallable = multicallable
+        self._request = request
+        self._deadline = None if timeout is None else time.monotonic() + timeout
+        self._metadata = metadata
+        self._url = url
+        self._call = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        if self._call is not None:
+            self._call.__exit__(exception_type, exception_value, traceback)
+
+    def __await__(self):
+        return self._outcome().__await__()
+
+    async def initial_metadata(self):
+        await self._settle()
+
+        if self._call is not None:
+            return await self._call.initial_metadata()
+
+    async def trailing_metadata(self):
+        await self._settle()
+
+        if self._call is not None:
+            return await self._call.trailing_metadata()
+
+    async def _settle(self):
+        try:
+            await self
+        except grpc.RpcError:
+            pass
+
+    async def _outcome(self):
+        if not self._done:
+            method_config = self._multicallable._method_config
+
+            try:
+                if method_config.retry_policy is not None:
+                    self._result = await self._retry(method_config.retry_policy)
+                else:
+                    self._result = await self._hedge(method_config.hedging_policy)
+            except grpc.RpcError as exc:
+                self._error = exc
+
+            self._done = True
+
+        if self._error is not None:
+            raise self._error
+
+        return self._result
+
+    def _attempt(self):
+        return self._multicallable._attempt(
+            self._request,
+            sonora.client._time_left(self._deadline),
+            self._metadata,
+            self._url,
+        )
+
+    async def _retry(self, policy):
+        throttle = self._multicallable._throttle
+        attempt = 1
+
+        while True:
+            try:
+                self._call = self._attempt()
+                result = await self._call
+            except (grpc.RpcError, *_TRANSPORT_ERRORS) as exc:
+                error = sonora.client._rpc_error(exc)
+
+                if error.code() not in policy.retryable_status_codes:
+                    raise error
+
+                if throttle is not None:
+                    throttle.record_failure()
+
+                    if not throttle.allows_retry():
+                        raise error
+
+                if attempt >= policy.max_attempts:
+                    raise error
+
+                backoff = policy.backoff(attempt)
+                if (
+                    self._deadline is not None
+                    and time.monotonic() + backoff >= self._deadline
+                ):
+                    raise error
+
+                await asyncio.sleep(backoff)
+                attempt += 1
+            else:
+                if throttle is not None:
+                    throttle.record_success()
+
+                return result
+
+    async def _hedge(self, policy):
+        throttle = self._multicallable._throttle
+        pending = {}
+        attempts = 0
+        error = None
+
+        try:
+            while True:
+                if (
+                    attempts < policy.max_attempts
+                    and (attempts == 0 or throttle is None or throttle.allows_retry())
+                    and (self._deadline is None or time.monotonic() < self._deadline)
+                ):
+                    call = self._attempt()
+                    pending[asyncio.ensure_future(call)] = call
+                    attempts += 1
+
+                    # Wait for the next hedge, unless this was the last one.
+                    timeout = None
+                    if attempts < policy.max_attempts:
+                        timeout = policy.hedging_delay
+                elif pending:
+                    timeout = None
+                else:
+                    raise error or sonora.client._deadline_exceeded()
+
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for task in done:
+                    self._call = pending.pop(task)
+                    error = task.exception()
+
+                    if error is None:
+                        if throttle is not None:
+                            throttle.record_success()
+
+                        return task.result()
+
+                    if isinstance(error, _TRANSPORT_ERRORS):
+                        error = sonora.client._rpc_error(error)
+
+                    if (
+                        not isinstance(error, grpc.RpcError)
+                        or error.code() not in policy.non_fatal_status_codes
+                    ):
+                        raise error
+
+                    if throttle is not None:
+                        throttle.record_failure()
+        finally:
+            # Unlike the sync client's, the attempts that lost can be stopped.
+            for task in pending:
+                task.cancel()
+
+
+class _InterceptedCall:
+    """
+    Runs the interceptor chain when the call is first used. The chain
+    returns the call made by the innermost continuation, or whatever an
+    interceptor put in its place.
+    """
+
+    def __init__(self, intercepted, client_call_details, request):
+        self._intercepted = intercepted
+        self._client_call_details = client_call_details
+        self._request = request
+        self._call = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        if isinstance(self._call, Call):
+            self._call.__exit__(exception_type, exception_value, traceback)
+
+    async def _get_call(self):
+        if self._call is None:
+            call = self._intercepted(self._client_call_details, self._request)
+
+            # Unary-stream interceptors can be async generators.
+            if inspect.isawaitable(call):
+                call = await call
+
+            self._call = call
+
+        return self._call
+
+    async def initial_metadata(self):
+        if isinstance(self._call, Call):
+            return await self._call.initial_metadata()
+
+    async def trailing_metadata(self):
+        if isinstance(self._call, Call):
+            return await self._call.trailing_metadata()
+
+
+class InterceptedUnaryUnaryCall(_InterceptedCall):
+    def __await__(self):
+        return self._result().__await__()
+
+    async def _result(self):
+        call = await self._get_call()
+
+        # Interceptors may hand back the response itself instead of a call.
+        if inspect.isawaitable(call):
+            return await call
+
+        return call
+
+
+class InterceptedUnaryStreamCall(_InterceptedCall):
+    def __init__(self, intercepted, client_call_details, request):
+        super().__init__(intercepted, client_call_details, request)
+        self._responses = None
+
+    async def read(self):
+        if self._responses is None:
+            self._responses = (await self._get_call()).__aiter__()
+
+        try:
+            return await self._responses.__anext__()
+        except StopAsyncIteration:
+            return grpc.experimental.aio.EOF
+
+    async def __aiter__(self):
+        async for response in await self._get_call():
+            yield response
+
+
+async def _stream_request_body(call):
+    """
+    Serialize and frame messages from a sync or async request iterator as
+    aiohttp asks for them. aiohttp drains the connection as it writes the
+    chunks, so the iterator isn't consumed faster than the server reads.
+    """
+    if hasattr(call._request, "__aiter__"):
+        async for request in call._request:
+            yield call._wrap_request(request)
+    else:
+        for request in call._request:
+            yield call._wrap_request(request)
+
+
+class StreamUnaryCall(UnaryUnaryCall):
+    def _request_body(self):
+        return _stream_request_body(self)
+
+
+class StreamStreamCall(UnaryStreamCall):
+    def _request_body(self):
+        return _stream_request_body(self)
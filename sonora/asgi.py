@@ -1,7 +1,10 @@
 import asyncio
 import base64
-from collections import namedtuple
 from collections.abc import AsyncIterator
+import concurrent.futures
+import contextvars
+import inspect
+import threading
 import time
 from urllib.parse import quote
 
@@ -9,17 +12,88 @@ from async_timeout import timeout
 import grpc
 
 from sonora import protocol
-
-_HandlerCallDetails = namedtuple(
-    "_HandlerCallDetails", ("method", "invocation_metadata")
+import sonora.compression
+import sonora.cors
+import sonora.metrics
+from sonora.routing import RpcRouter
+
+# Compressing messages at least this large is handed off to the default
+# executor so it doesn't stall the event loop.
+_COMPRESS_IN_EXECUTOR_THRESHOLD = 64 * 1024
+
+# How many messages the handler of a coalesced stream can get ahead of the
+# sends before it has to wait.
+_COALESCE_BUFFER = 16
+
+# Generic handlers can serve any path, so the per-route cache is bounded.
+_MAX_CACHED_ROUTES = 1024
+
+# The request headers the transport itself looks at, everything else is only
+# decoded if the handler asks for its invocation metadata.
+_TRANSPORT_HEADERS = frozenset(
+    [
+        b"grpc-timeout",
+        b"content-type",
+        b"accept",
+        b"host",
+        b"origin",
+        b"grpc-encoding",
+        b"grpc-accept-encoding",
+    ]
 )
 
 
 class grpcASGI(grpc.Server):
-    def __init__(self, application=None, enable_cors=True):
+    def __init__(
+        self,
+        application=None,
+        enable_cors=True,
+        compression=None,
+        compression_threshold=sonora.compression.DEFAULT_THRESHOLD,
+        coalesce=False,
+        coalesce_max_bytes=64 * 1024,
+        coalesce_max_delay=0.005,
+        max_receive_message_length=4 * 1024 * 1024,
+        cors=None,
+        executor=None,
+        max_workers=10,
+        sync_stream_buffer=16,
+        concurrency_limit=None,
+        method_concurrency_limits=None,
+        metrics=None,
+        metrics_path="/metrics",
+        interceptors=None,
+        intercept_per_method=True,
+    ):
+        interceptors = tuple(interceptors or ())
+
+        for interceptor in interceptors:
+            if not _is_async_interceptor(interceptor):
+                raise TypeError(
+                    f"grpcASGI needs grpc.aio.ServerInterceptors, {interceptor!r}"
+                    " has a synchronous intercept_service"
+                )
+
         self._application = application
-        self._handlers = []
-        self._enable_cors = enable_cors
+        self._router = RpcRouter(
+            interceptors=interceptors, intercept_per_method=intercept_per_method
+        )
+        self._cors = sonora.cors.resolve(enable_cors, cors)
+        self._compression = sonora.compression.resolve(compression)
+        self._compression_threshold = compression_threshold
+        self._coalesce = coalesce
+        self._coalesce_max_bytes = coalesce_max_bytes
+        self._coalesce_max_delay = coalesce_max_delay
+        self._max_receive_message_length = max_receive_message_length
+        self._executor = executor
+        self._max_workers = max_workers
+        self._sync_stream_buffer = sync_stream_buffer
+        self._concurrency_limit = concurrency_limit
+        self._method_concurrency_limits = method_concurrency_limits or {}
+        self._limited = bool(concurrency_limit or method_concurrency_limits)
+        self._metrics = metrics
+        self._metrics_path = metrics_path if metrics is not None else None
+        self._context_classes = {}
 
     async def __call__(self, scope, receive, send):
         """
@@ -33,19 +107,44 @@ class grpcASGI(grpc.Server):
         rpc_method = self._get_rpc_handler(scope["path"])
         request_method = scope["method"]
 
-        if rpc_method:
-            if request_method == "POST":
-                context = self._create_context(scope)
+        if rpc_method and request_method == "POST":
+            invocation_metadata = None
 
-                try:
-                    async with timeout(context.time_remaining()):
-                        await self._do_grpc_request(rpc_method, context, receive, send)
-                except asyncio.TimeoutError:
-                    context.code = grpc.StatusCode.DEADLINE_EXCEEDED
-                    context.details = "request timed out at the server"
+            if self._router.intercepts_calls:
+                if self._router.intercepts_each_call:
+                    invocation_metadata = tuple(_decode_metadata(scope["headers"]))
+
+                rpc_method = await self._router.intercept_async(
+                    scope["path"], rpc_method, lambda: invocation_metadata
+                )
+
+                if rpc_method is None and _is_grpc_request(scope["headers"]):
+                    context = ServicerContext.from_headers(
+                        scope["headers"], cors=self._cors
+                    )
+                    context.code = grpc.StatusCode.UNIMPLEMENTED
+                    context.details = "Method not found!"
                     await self._do_grpc_error(send, context)
+                    return
+
+            if rpc_method:
+                context = self._create_context(scope, rpc_method)
+
+                if invocation_metadata is not None:
+                    context._invocation_metadata = invocation_metadata
+
+        if rpc_method:
+            if request_method == "POST":
+                if self._metrics is not None:
+                    await self._do_instrumented_request(
+                        scope["path"], rpc_method, context, receive, send
+                    )
+                else:
+                    await self._do_request(
+                        scope["path"], rpc_method, context, receive, send
+                    )
 
-            elif self._enable_cors and request_method == "OPTIONS":
+            elif self._cors is not None and request_method == "OPTIONS":
                 await self._do_cors_preflight(scope, receive, send)
             else:
                 await send({"type": "http.response.start", "status": 400})
@@ -53,6 +152,9 @@ class grpcASGI(grpc.Server):
                     {"type": "http.response.body", "body": b"", "more_body": False}
                 )
 
+        elif scope["path"] == self._metrics_path and request_method == "GET":
+            await self._do_metrics(send)
+
         elif self._application:
             await self._application(scope, receive, send)
 
@@ -61,37 +163,124 @@ class grpcASGI(grpc.Server):
             await send({"type": "http.response.body", "body": b"", "more_body": False})
 
     def _get_rpc_handler(self, path):
-        handler_call_details = _HandlerCallDetails(path, None)
+        return self._router.get(path)
 
-        rpc_handler = None
-        for handler in self._handlers:
-            rpc_handler = handler.service(handler_call_details)
-            if rpc_handler:
-                return rpc_handler
+    def _create_context(self, scope, rpc_method):
+        return self._get_context_class(scope["path"], rpc_method).from_headers(
+            scope["headers"],
+            cors=self._cors,
+            compression=self._compression,
+        )
 
-        return None
+    def _get_context_class(self, path, rpc_method):
+        """
+        Sync and async handlers get different contexts. Which one a route
+        needs is worked out on its first call, unless interceptors build a
+        new handler for every call.
+        """
+        if self._router.intercepts_each_call:
+            return _context_class(rpc_method)
 
-    def _create_context(self, scope):
-        timeout = None
-        metadata = []
+        context_class = self._context_classes.get(path)
 
-        for header, value in scope["headers"]:
-            if timeout is None and header == b"grpc-timeout":
-                timeout = protocol.parse_timeout(value)
-            else:
-                if header.endswith(b"-bin"):
-                    value = base64.b64decode(value)
+        if context_class is None:
+            context_class = _context_class(rpc_method)
+
+            if len(self._context_classes) >= _MAX_CACHED_ROUTES:
+                self._context_classes.clear()
+            self._context_classes[path] = context_class
+
+        return context_class
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self._max_workers, thread_name_prefix="sonora"
+            )
+
+        return self._executor
+
+    async def _do_request(self, path, rpc_method, context, receive, send):
+        try:
+            async with timeout(context.time_remaining()):
+                if self._limited:
+                    await self._do_limited_request(
+                        path, rpc_method, context, receive, send
+                    )
                 else:
-                    value = value.decode("ascii")
+                    await self._do_grpc_request(rpc_method, context, receive, send)
+        except asyncio.TimeoutError:
+            context.code = grpc.StatusCode.DEADLINE_EXCEEDED
+            context.details = "request timed out at the server"
+            await self._do_grpc_error(send, context)
 
-                metadata.append((header.decode("ascii"), value))
+    async def _do_instrumented_request(self, path, rpc_method, context, receive, send):
+        """
+        Run the request with its messages, body bytes and latency recorded in
+        the metrics registry.
+        """
+        call = self._metrics.start_call(path, rpc_method)
+        call.context = context
+        receive, send = call.wrap_asgi(receive, send)
+        code = None
+
+        try:
+            await self._do_request(path, call.handler, context, receive, send)
+        except asyncio.CancelledError:
+            code = grpc.StatusCode.CANCELLED
+            raise
+        except Exception:
+            code = grpc.StatusCode.UNKNOWN
+            raise
+        finally:
+            if context._disconnected:
+                code = grpc.StatusCode.CANCELLED
+
+            call.finish(code)
+
+    async def _do_metrics(self, send):
+        body = self._metrics.exposition().encode("utf-8")
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", sonora.metrics.CONTENT_TYPE.encode("ascii")),
+                    (b"content-length", str(len(body)).encode("ascii")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body, "more_body": False})
+
+    async def _do_limited_request(self, path, rpc_method, context, receive, send):
+        """
+        Run the request once the method's and the server's concurrency limits
+        admit it, or reject it with RESOURCE_EXHAUSTED if either sheds it.
+        """
+        limits = (self._method_concurrency_limits.get(path), self._concurrency_limit)
+        acquired = []
+
+        try:
+            for limit in limits:
+                if limit is None:
+                    continue
+
+                if not await limit.acquire():
+                    context.code = grpc.StatusCode.RESOURCE_EXHAUSTED
+                    context.details = "Concurrent RPC limit exceeded"
+                    await self._do_grpc_error(send, context)
+                    return
+
+                acquired.append(limit)
 
-        return ServicerContext(timeout, metadata, enable_cors=self._enable_cors)
+            await self._do_grpc_request(rpc_method, context, receive, send)
+        finally:
+            for limit in acquired:
+                limit.release()
 
     async def _do_grpc_request(self, rpc_method, context, receive, send):
-        headers = context._response_headers
         wrap_message = context._wrap_message
-        unwrap_message = context._unwrap_message
 
         if not rpc_method.request_streaming and not rpc_method.response_streaming:
             method = rpc_method.unary_unary
@@ -104,22 +293,48 @@ class grpcASGI(grpc.Server):
         else:
             raise NotImplementedError
 
+        if context.code is not grpc.StatusCode.OK:
+            await self._do_grpc_error(send, context)
+            return
+
         request_proto_iterator = (
-            rpc_method.request_deserializer(bytes(message))
-            async for _, _, message in unwrap_message(receive)
+            rpc_method.request_deserializer(message)
+            async for message in self._read_messages(context, receive)
         )
 
+        if rpc_method.request_streaming:
+            context._request_done = asyncio.Event()
+            request_proto_iterator = _signal_exhausted(
+                request_proto_iterator, context._request_done
+            )
+
         try:
             if rpc_method.request_streaming:
-                coroutine = method(request_proto_iterator, context)
+                request = request_proto_iterator
             else:
-                request_proto = await anext(
+                request = await anext(
                     request_proto_iterator, None
                 ) or rpc_method.request_deserializer(b"")
-                coroutine = method(request_proto, context)
+                await request_proto_iterator.aclose()
+
+            if isinstance(context, SyncServicerContext):
+                if rpc_method.request_streaming:
+                    request = _iterate_from_thread(
+                        request, asyncio.get_running_loop(), context
+                    )
+
+                if rpc_method.response_streaming:
+                    coroutine = self._iterate_sync(method, request, context)
+                else:
+                    coroutine = self._run_sync(method, request, context)
+            else:
+                coroutine = method(request, context)
         except NotImplementedError:
             context.set_code(grpc.StatusCode.UNIMPLEMENTED)
             coroutine = None
+        except grpc.RpcError:
+            await self._do_grpc_error(send, context)
+            return
 
         try:
             if rpc_method.response_streaming:
@@ -133,96 +348,265 @@ class grpcASGI(grpc.Server):
         except grpc.RpcError:
             await self._do_grpc_error(send, context)
 
+    async def _read_messages(self, context, receive):
+        """
+        Yield the request messages, decompressed, as they arrive. Messages
+        longer than max_receive_message_length are rejected with
+        RESOURCE_EXHAUSTED, before their data arrives or as soon as they
+        decompress past it, and ones that don't decompress with INTERNAL. A
+        client that disconnects before the request body ends cancels the
+        call.
+        """
+        max_length = self._max_receive_message_length
+
+        try:
+            async for _, compressed, message in context._unwrap_message(
+                receive, max_length=max_length
+            ):
+                if compressed:
+                    message = context._decompress(message, max_length)
+
+                yield message
+        except protocol.MessageTooLargeError as exc:
+            context.code = grpc.StatusCode.RESOURCE_EXHAUSTED
+            context.details = str(exc)
+            raise grpc.RpcError()
+        except protocol.IncompleteMessageError as exc:
+            context.code = grpc.StatusCode.INTERNAL
+            context.details = str(exc)
+            raise grpc.RpcError()
+        except sonora.compression.DECOMPRESSION_ERRORS:
+            context.code = grpc.StatusCode.INTERNAL
+            context.details = "Could not decompress message"
+            raise grpc.RpcError()
+        except protocol.DisconnectedError as exc:
+            context._disconnected = True
+            context.code = grpc.StatusCode.CANCELLED
+            context.details = str(exc)
+            raise grpc.RpcError()
+
     async def _do_streaming_response(
         self, rpc_method, receive, send, wrap_message, context, coroutine
     ):
         headers = context._response_headers
 
         if coroutine:
-            message = await anext(coroutine)
+            message = await anext(coroutine, None)
         else:
             message = b""
 
         status = 200
 
-        body = wrap_message(False, False, rpc_method.response_serializer(message))
+        if message is None:
+            body = b""
+        else:
+            body = await self._wrap_response(
+                context, wrap_message, rpc_method.response_serializer(message)
+            )
 
         if context._initial_metadata:
             headers.extend(context._initial_metadata)
 
+        if context._codec is not None:
+            headers.append((b"grpc-encoding", context._codec.name.encode("ascii")))
+
+        context._codec_fixed = True
+
         await send(
             {"type": "http.response.start", "status": status, "headers": headers}
         )
 
-        await send({"type": "http.response.body", "body": body, "more_body": True})
+        watcher = asyncio.ensure_future(
+            self._watch_disconnect(receive, context, asyncio.current_task())
+        )
+
+        try:
+            if self._coalesce:
+                pending = await self._send_coalesced(
+                    rpc_method, send, wrap_message, context, coroutine, [body]
+                )
+            else:
+                pending = None
 
-        async for message in coroutine:
-            body = wrap_message(False, False, rpc_method.response_serializer(message))
+                await send(
+                    {"type": "http.response.body", "body": body, "more_body": True}
+                )
 
-            send_task = asyncio.create_task(
-                send({"type": "http.response.body", "body": body, "more_body": True})
+                try:
+                    async for message in coroutine:
+                        body = await self._wrap_response(
+                            context,
+                            wrap_message,
+                            rpc_method.response_serializer(message),
+                        )
+
+                        await send(
+                            {
+                                "type": "http.response.body",
+                                "body": body,
+                                "more_body": True,
+                            }
+                        )
+                except grpc.RpcError:
+                    pass
+
+            body = protocol.pack_status_frame(
+                wrap_message,
+                context.code,
+                context.details,
+                context._trailing_metadata,
             )
 
-            recv_task = asyncio.create_task(receive())
+            if pending:
+                pending.append(body)
+                body = b"".join(pending)
 
-            done, pending = await asyncio.wait(
-                {send_task, recv_task}, return_when=asyncio.FIRST_COMPLETED
-            )
+            await send({"type": "http.response.body", "body": body, "more_body": False})
+        except asyncio.CancelledError:
+            if not context._disconnected:
+                raise
 
-            if recv_task in done:
-                send_task.cancel()
-                result = recv_task.result()
-                if result["type"] == "http.disconnect":
-                    break
-            else:
-                recv_task.cancel()
+            _uncancel()
+            await coroutine.aclose()
+        finally:
+            watcher.cancel()
 
-        trailers = [("grpc-status", str(context.code.value[0]))]
+    async def _watch_disconnect(self, receive, context, task):
+        """
+        Wait for the client to go away while the handler runs or its
+        response is being sent, and cancel the task running the call when it
+        does. The context is marked cancelled too, so that a synchronous
+        handler, whose thread can't be cancelled, sees is_active() turn
+        false.
+        """
+        if context._request_done is not None:
+            await context._request_done.wait()
 
-        if context.details:
-            trailers.append(("grpc-message", quote(context.details)))
+        while True:
+            event = await receive()
 
-        if context._trailing_metadata:
-            trailers.extend(context._trailing_metadata)
+            if event["type"] == "http.disconnect":
+                context._disconnected = True
+                context.code = grpc.StatusCode.CANCELLED
+                context.details = "Client disconnected"
+                task.cancel()
+                return
 
-        trailer_message = protocol.pack_trailers(trailers)
-        body = wrap_message(True, False, trailer_message)
-        await send({"type": "http.response.body", "body": body, "more_body": False})
+    async def _send_coalesced(
+        self, rpc_method, send, wrap_message, context, coroutine, pending
+    ):
+        """
+        Stream the handler's messages, packing consecutive frames into a
+        single send. A task moves the messages to a queue as the handler
+        produces them. Buffered frames are sent as soon as the queue runs
+        dry, and while messages keep arriving once they reach
+        coalesce_max_bytes or have waited coalesce_max_delay. Returns the
+        frames that should go out along with the trailers.
+        """
+        loop = asyncio.get_running_loop()
+        messages = asyncio.Queue(_COALESCE_BUFFER)
+        producer = asyncio.ensure_future(_queue_messages(coroutine, messages))
+        flush_at = loop.time() + self._coalesce_max_delay
+        size = sum(len(body) for body in pending)
+
+        try:
+            while True:
+                if pending and messages.empty():
+                    # Let the handler queue whatever it has ready before
+                    # deciding that it is waiting.
+                    await asyncio.sleep(0)
+
+                    if messages.empty():
+                        await send(
+                            {
+                                "type": "http.response.body",
+                                "body": b"".join(pending),
+                                "more_body": True,
+                            }
+                        )
+                        pending = []
+
+                message = await messages.get()
+
+                if message is _END_OF_STREAM or isinstance(message, grpc.RpcError):
+                    return pending
+                if isinstance(message, Exception):
+                    raise message
+
+                body = await self._wrap_response(
+                    context, wrap_message, rpc_method.response_serializer(message)
+                )
+
+                if not pending:
+                    flush_at = loop.time() + self._coalesce_max_delay
+                    size = 0
+
+                pending.append(body)
+                size += len(body)
+
+                if size >= self._coalesce_max_bytes or loop.time() >= flush_at:
+                    await send(
+                        {
+                            "type": "http.response.body",
+                            "body": b"".join(pending),
+                            "more_body": True,
+                        }
+                    )
+                    pending = []
+        finally:
+            # The handler has to be stopped before anything else touches it.
+            producer.cancel()
+            await asyncio.wait([producer])
 
     async def _do_unary_response(
         self, rpc_method, receive, send, wrap_message, context, coroutine
     ):
-        headers = context._response_headers
-
         if coroutine is None:
-            message = None
-        else:
+            await self._send_unary_response(
+                rpc_method, send, wrap_message, context, None
+            )
+            return
+
+        watcher = asyncio.ensure_future(
+            self._watch_disconnect(receive, context, asyncio.current_task())
+        )
+
+        try:
             message = await coroutine
 
+            await self._send_unary_response(
+                rpc_method, send, wrap_message, context, message
+            )
+        except asyncio.CancelledError:
+            if not context._disconnected:
+                raise
+
+            _uncancel()
+        finally:
+            watcher.cancel()
+
+    async def _send_unary_response(
+        self, rpc_method, send, wrap_message, context, message
+    ):
+        headers = context._response_headers
         status = 200
 
         if context._initial_metadata:
             headers.extend(context._initial_metadata)
 
         if message is not None:
-            message_data = wrap_message(
-                False, False, rpc_method.response_serializer(message)
+            message_data = await self._wrap_response(
+                context, wrap_message, rpc_method.response_serializer(message)
             )
+
+            if context._codec is not None:
+                headers.append((b"grpc-encoding", context._codec.name.encode("ascii")))
         else:
             message_data = b""
 
-        trailers = [(b"grpc-status", str(context.code.value[0]).encode())]
-
-        if context.details:
-            trailers.append(
-                (b"grpc-message", quote(context.details.encode("utf8")).encode("ascii"))
-            )
-
-        if context._trailing_metadata:
-            trailers.extend(context._trailing_metadata)
-
-        trailer_message = protocol.pack_trailers(trailers)
-        trailer_data = wrap_message(True, False, trailer_message)
+        trailer_data = protocol.pack_status_frame(
+            wrap_message, context.code, context.details, context._trailing_metadata
+        )
 
         content_length = len(message_data) + len(trailer_data)
 
@@ -240,6 +624,133 @@ class grpcASGI(grpc.Server):
             {"type": "http.response.body", "body": trailer_data, "more_body": False}
         )
 
+    async def _run_sync(self, method, request, context):
+        """
+        Call a synchronous unary-response handler in the executor.
+        """
+        loop = asyncio.get_running_loop()
+
+        try:
+            response = await loop.run_in_executor(
+                self._get_executor(),
+                contextvars.copy_context().run,
+                method,
+                request,
+                context,
+            )
+
+            if inspect.isawaitable(response):
+                # An async handler that didn't look like one.
+                _make_async(context)
+                response = await response
+
+            return response
+        except NotImplementedError:
+            context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+            return None
+
+    async def _iterate_sync(self, method, request, context):
+        """
+        Run a synchronous response-streaming handler in the executor and
+        yield its messages. At most sync_stream_buffer messages wait to be
+        sent, a handler that gets further ahead blocks until they are. Once
+        the response ends early, because of a disconnect or the deadline,
+        the handler is closed at its next yield.
+        """
+        loop = asyncio.get_running_loop()
+        messages = asyncio.Queue()
+        slots = threading.Semaphore(self._sync_stream_buffer)
+        stopped = threading.Event()
+
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(messages.put_nowait, item)
+            except RuntimeError:
+                # The event loop is gone, there's nobody left to tell.
+                pass
+
+        def produce():
+            iterator = None
+
+            try:
+                response = method(request, context)
+
+                if hasattr(response, "__aiter__"):
+                    # An async handler that didn't look like one, it's
+                    # iterated on the event loop instead.
+                    put((True, response))
+                    return
+
+                iterator = iter(response)
+
+                while True:
+                    slots.acquire()
+
+                    if stopped.is_set():
+                        break
+
+                    try:
+                        message = next(iterator)
+                    except StopIteration:
+                        break
+
+                    put((False, message))
+            except NotImplementedError:
+                context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+                put((True, None))
+            except BaseException as e:
+                put((True, e))
+            else:
+                put((True, None))
+            finally:
+                if hasattr(iterator, "close"):
+                    iterator.close()
+
+        loop.run_in_executor(
+            self._get_executor(), contextvars.copy_context().run, produce
+        )
+
+        try:
+            while True:
+                done, value = await messages.get()
+
+                if done:
+                    if isinstance(value, BaseException):
+                        raise value
+
+                    if value is not None:
+                        _make_async(context)
+
+                        async for message in value:
+                            yield message
+
+                    return
+
+                slots.release()
+                yield value
+        finally:
+            stopped.set()
+            slots.release()
+
+    async def _wrap_response(self, context, wrap_message, data):
+        codec = context._codec
+
+        if (
+            codec is None
+            or len(data) < self._compression_threshold
+            or context._disable_next_compression
+        ):
+            context._disable_next_compression = False
+            return wrap_message(False, False, data)
+
+        if len(data) >= _COMPRESS_IN_EXECUTOR_THRESHOLD:
+            loop = asyncio.get_running_loop()
+            data = await loop.run_in_executor(None, codec.compress, data)
+        else:
+            data = codec.compress(data)
+
+        return wrap_message(False, True, data)
+
     async def _do_grpc_error(self, send, context):
         status = 200
         headers = context._response_headers
@@ -256,10 +767,19 @@ class grpcASGI(grpc.Server):
         await send({"type": "http.response.body", "body": b"", "more_body": False})
 
     async def _do_cors_preflight(self, scope, receive, send):
-        origin = next(
-            (value for header, value in scope["headers"] if header == "host"),
-            scope["server"][0],
-        )
+        origin = None
+        host = None
+
+        for header, value in scope["headers"]:
+            if header == b"origin":
+                origin = value
+            elif header == b"host":
+                host = value
+
+        if host is None and scope.get("server"):
+            host = scope["server"][0]
+
+        cors_headers = self._cors.match(origin, host)
 
         await send(
             {
@@ -268,18 +788,19 @@ class grpcASGI(grpc.Server):
                 "headers": [
                     (b"Content-Type", b"text/plain"),
                     (b"Content-Length", b"0"),
-                    (b"Access-Control-Allow-Methods", b"POST, OPTIONS"),
-                    (b"Access-Control-Allow-Headers", b"*"),
-                    (b"Access-Control-Allow-Origin", origin),
-                    (b"Access-Control-Allow-Credentials", b"true"),
-                    (b"Access-Control-Expose-Headers", b"*"),
+                    *cors_headers.preflight,
                 ],
             }
         )
         await send({"type": "http.response.body", "body": b"", "more_body": False})
 
     def add_generic_rpc_handlers(self, handlers):
-        self._handlers.extend(handlers)
+        self._router.add_generic_rpc_handlers(handlers)
+        self._context_classes.clear()
+
+    def add_registered_method_handlers(self, service_name, method_handlers):
+        self._router.add_registered_method_handlers(service_name, method_handlers)
+        self._context_classes.clear()
 
     def add_insecure_port(self, port):
         raise NotImplementedError()
@@ -296,9 +817,59 @@ class grpcASGI(grpc.Server):
 
 class ServicerContext(grpc.ServicerContext):
     def __init__(self, timeout=None, metadata=None, enable_cors=True):
+        metadata = tuple(metadata or ())
+        transport = {}
+
+        for key, value in metadata:
+            header = key.encode("ascii")
+            if header in _TRANSPORT_HEADERS:
+                transport[header] = value.encode("latin-1")
+
+        self._setup(transport, timeout, sonora.cors.resolve(enable_cors, None), None)
+        self._invocation_metadata = metadata
+
+    @classmethod
+    def from_headers(cls, headers, cors=None, compression=None):
+        """
+        Build the context for a call from its raw ASGI request headers.
+        invocation_metadata() only decodes them if it's asked for.
+        """
+        transport = {
+            header: value for header, value in headers if header in _TRANSPORT_HEADERS
+        }
+
+        timeout = transport.get(b"grpc-timeout")
+        malformed_timeout = False
+
+        if timeout is not None:
+            try:
+                timeout = protocol.parse_timeout(timeout)
+            except (KeyError, ValueError):
+                timeout = None
+                malformed_timeout = True
+
+        context = cls.__new__(cls)
+        context._setup(transport, timeout, cors, compression)
+        context._headers = headers
+
+        if malformed_timeout:
+            context.code = grpc.StatusCode.INTERNAL
+            context.details = "Malformed grpc-timeout header"
+
+        return context
+
+    def _setup(self, transport, timeout, cors, compression):
         self.code = grpc.StatusCode.OK
         self.details = None
 
+        self._headers = ()
+        self._invocation_metadata = None
+        self._initial_metadata = None
+        self._trailing_metadata = None
+
+        self._disconnected = False
+        self._request_done = None
+
         self._timeout = timeout
 
         if timeout is not None:
@@ -306,38 +877,74 @@ class ServicerContext(grpc.ServicerContext):
         else:
             self._deadline = None
 
-        self._invocation_metadata = metadata or tuple()
-        self._initial_metadata = None
-        self._trailing_metadata = None
+        if transport.get(b"content-type") == b"application/grpc-web-text":
+            self._wrap_message = protocol.b64_wrap_message
+            self._unwrap_message = protocol.b64_unwrap_message_asgi
+        else:
+            self._wrap_message = protocol.wrap_message
+            self._unwrap_message = protocol.unwrap_message_asgi
 
-        response_content_type = "application/grpc-web+proto"
+        accept = transport.get(b"accept")
+        if accept is not None:
+            response_content_type = accept.split(b",", 1)[0].strip()
+        else:
+            response_content_type = b"application/grpc-web+proto"
 
-        self._wrap_message = protocol.wrap_message
-        self._unwrap_message = protocol.unwrap_message_asgi
-        origin = None
+        host = transport.get(b"host")
+        if not host:
+            raise ValueError("Request is missing the host header")
 
-        for header, value in metadata:
-            if header == "content-type":
-                if value == "application/grpc-web-text":
-                    self._wrap_message = protocol.b64_wrap_message
-                    self._unwrap_message = protocol.b64_unwrap_message_asgi
-            elif header == "accept":
-                response_content_type = value.split(",")[0].strip()
-            elif header == "host":
-                origin = value
+        self._response_headers = [(b"Content-Type", response_content_type)]
 
-        if not origin:
-            raise ValueError("Request is missing the host header")
+        if cors is not None:
+            self._response_headers += cors.match(
+                transport.get(b"origin"), host
+            ).response
 
-        self._response_headers = [
-            (b"Content-Type", response_content_type.encode("ascii")),
-        ]
+        request_encoding = transport.get(b"grpc-encoding")
+        if request_encoding is not None:
+            request_encoding = request_encoding.decode("ascii")
+
+        accept_encoding = transport.get(b"grpc-accept-encoding")
+        if accept_encoding is not None:
+            accept_encoding = accept_encoding.decode("ascii")
+
+        self._accept_encoding = accept_encoding
+        self._codec = sonora.compression.negotiate(compression, accept_encoding)
+        self._disable_next_compression = False
+        self._codec_fixed = False
+
+        try:
+            self._request_codec = sonora.compression.get_codec(request_encoding)
+        except KeyError:
+            self._request_codec = None
+            self.code = grpc.StatusCode.UNIMPLEMENTED
+            self.details = f"Unsupported grpc-encoding: {request_encoding}"
+            self._response_headers.append(
+                (
+                    b"grpc-accept-encoding",
+                    sonora.compression.accept_encoding().encode("ascii"),
+                )
+            )
+
+    def _decompress(self, message, max_length=None):
+        if self._request_codec is None:
+            self.code = grpc.StatusCode.INTERNAL
+            self.details = "Compressed message received without a grpc-encoding"
+            raise grpc.RpcError()
+
+        return self._request_codec.decompress(message, max_length)
 
-        if enable_cors:
-            self._response_headers += [
-                (b"Access-Control-Allow-Origin", origin.encode("ascii")),
-                (b"Access-Control-Expose-Headers", b"*"),
-            ]
+    def set_compression(self, compression):
+        if self._codec_fixed:
+            return
+
+        self._codec = sonora.compression.negotiate(
+            sonora.compression.resolve(compression), self._accept_encoding
+        )
+
+    def disable_next_message_compression(self):
+        self._disable_next_compression = True
 
     def set_code(self, code):
         if isinstance(code, grpc.StatusCode):
@@ -359,6 +966,15 @@ class ServicerContext(grpc.ServicerContext):
         self.details = details
 
     async def abort(self, code, details):
+        self._abort(code, details)
+
+    async def abort_with_status(self, status):
+        self._abort_with_status(status)
+
+    async def send_initial_metadata(self, initial_metadata):
+        self._send_initial_metadata(initial_metadata)
+
+    def _abort(self, code, details):
         if code == grpc.StatusCode.OK:
             raise ValueError()
 
@@ -367,7 +983,7 @@ class ServicerContext(grpc.ServicerContext):
 
         raise grpc.RpcError()
 
-    async def abort_with_status(self, status):
+    def _abort_with_status(self, status):
         if status == grpc.StatusCode.OK:
             raise ValueError()
 
@@ -375,16 +991,19 @@ class ServicerContext(grpc.ServicerContext):
 
         raise grpc.RpcError()
 
-    async def send_initial_metadata(self, initial_metadata):
+    def _send_initial_metadata(self, initial_metadata):
         self._initial_metadata = [
             (key.encode("ascii"), value.encode("utf8"))
             for key, value in protocol.encode_headers(initial_metadata)
         ]
 
     def set_trailing_metadata(self, trailing_metadata):
-        self._trailing_metadata = protocol.encode_headers(trailing_metadata)
+        self._trailing_metadata = protocol.pack_trailers(trailing_metadata)
 
     def invocation_metadata(self):
+        if self._invocation_metadata is None:
+            self._invocation_metadata = tuple(_decode_metadata(self._headers))
+
         return self._invocation_metadata
 
     def time_remaining(self):
@@ -412,7 +1031,141 @@ class ServicerContext(grpc.ServicerContext):
         raise NotImplementedError()
 
     def is_active(self):
-        raise NotImplementedError()
+        if self._disconnected:
+            return False
+
+        return self._deadline is None or time.monotonic() < self._deadline
+
+
+_END_OF_STREAM = object()
+
+
+class SyncServicerContext(ServicerContext):
+    """
+    The context passed to synchronous handlers. They run in a worker thread
+    and can't await, so the methods that are coroutines for async handlers
+    are plain methods here.
+    """
+
+    def abort(self, code, details):
+        self._abort(code, details)
+
+    def abort_with_status(self, status):
+        self._abort_with_status(status)
+
+    def send_initial_metadata(self, initial_metadata):
+        self._send_initial_metadata(initial_metadata)
+
+
+def _is_sync_handler(rpc_method):
+    method = (
+        rpc_method.unary_unary
+        or rpc_method.unary_stream
+        or rpc_method.stream_unary
+        or rpc_method.stream_stream
+    )
+
+    # Look through decorators that used functools.wraps.
+    method = inspect.unwrap(method)
+
+    return not (
+        inspect.iscoroutinefunction(method) or inspect.isasyncgenfunction(method)
+    )
+
+
+def _is_async_interceptor(interceptor):
+    return inspect.iscoroutinefunction(inspect.unwrap(interceptor.intercept_service))
+
+
+def _context_class(rpc_method):
+    if _is_sync_handler(rpc_method):
+        return SyncServicerContext
+
+    return ServicerContext
+
+
+def _make_async(context):
+    """
+    Give a handler that turned out to be async the context async handlers
+    get, once it's known. The classes only differ in their methods.
+    """
+    if type(context) is SyncServicerContext:
+        context.__class__ = ServicerContext
+
+
+def _iterate_from_thread(request_iterator, loop, context):
+    """
+    Let a synchronous handler in a worker thread iterate over the async
+    request iterator, one message at a time.
+    """
+    while True:
+        future = asyncio.run_coroutine_threadsafe(
+            anext(request_iterator, _END_OF_STREAM), loop
+        )
+
+        try:
+            message = future.result(context.time_remaining())
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            context.code = grpc.StatusCode.DEADLINE_EXCEEDED
+            context.details = "request timed out at the server"
+            raise grpc.RpcError()
+
+        if message is _END_OF_STREAM:
+            return
+
+        yield message
+
+
+def _is_grpc_request(headers):
+    for header, value in headers:
+        if header == b"content-type":
+            return value.startswith(b"application/grpc")
+
+    return False
+
+
+def _decode_metadata(headers):
+    for header, value in headers:
+        if header == b"grpc-timeout":
+            continue
+
+        if header.endswith(b"-bin"):
+            value = base64.b64decode(value)
+        else:
+            value = value.decode("ascii")
+
+        yield header.decode("ascii"), value
+
+
+async def _signal_exhausted(iterator, event):
+    async for item in iterator:
+        yield item
+
+    event.set()
+
+
+def _uncancel():
+    # Python 3.11+ counts cancellation requests, a task that handles one has
+    # to say so or later timeouts will mistake themselves for cancellation.
+    task = asyncio.current_task()
+
+    if hasattr(task, "uncancel"):
+        task.uncancel()
+
+
+async def _queue_messages(iterator, messages):
+    """
+    Move the messages of a coalesced stream to a queue, followed by
+    _END_OF_STREAM or the exception that ended the stream.
+    """
+    try:
+        async for message in iterator:
+            await messages.put(message)
+    except Exception as exc:
+        await messages.put(exc)
+    else:
+        await messages.put(_END_OF_STREAM)
 
 
 # Copied from https://github.com/python/cpython/pull/8895
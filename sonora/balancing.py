@@ -0,0 +1,268 @@
+import bisect
+import hashlib
+import threading
+import time
+
+import grpc
+
+from sonora import protocol
+
+ROUND_ROBIN = "round_robin"
+LEAST_OUTSTANDING = "least_outstanding"
+CONSISTENT_HASH = "consistent_hash"
+
+# The statuses that count as a failure of the endpoint rather than of the
+# call. The channels report failures to reach it as UNAVAILABLE.
+_EJECTING_CODES = frozenset(
+    (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED)
+)
+
+# Points each endpoint gets on the consistent hash ring, more spread the
+# keys more evenly.
+_RING_POINTS = 100
+
+
+class Balancer:
+    """
+    Spreads a channel's calls across several grpc-web endpoints.
+
+    The endpoints are either a fixed list of URLs or whatever resolver, a
+    callable returning a list of URLs, returns. The resolver is polled again
+    once resolve_interval seconds have passed, from the call that notices.
+
+    policy picks the endpoint for each call:
+
+    - ROUND_ROBIN takes the endpoints in turn.
+    - LEAST_OUTSTANDING takes the endpoint with the fewest unary-unary calls
+      in flight.
+    - CONSISTENT_HASH hashes the call's hash_key metadata value, so calls
+      with the same value go to the same endpoint for as long as it's
+      there. Calls without the key are sent round robin.
+
+    An endpoint is ejected for ejection_time seconds after max_failures
+    consecutive unary-unary calls to it failed with UNAVAILABLE or
+    DEADLINE_EXCEEDED or couldn't reach it at all. Other errors neither
+    count as failures nor reset the count. If every endpoint is ejected
+    they are all used anyway.
+    """
+
+    def __init__(
+        self,
+        endpoints=None,
+        resolver=None,
+        policy=ROUND_ROBIN,
+        hash_key=None,
+        resolve_interval=30,
+        max_failures=5,
+        ejection_time=30,
+    ):
+        if (endpoints is None) == (resolver is None):
+            raise ValueError("pass either endpoints or a resolver")
+        if policy not in (ROUND_ROBIN, LEAST_OUTSTANDING, CONSISTENT_HASH):
+            raise ValueError(f"unknown load balancing policy: {policy!r}")
+        if policy == CONSISTENT_HASH and hash_key is None:
+            raise ValueError("consistent hashing needs a hash_key")
+
+        self.policy = policy
+        self.hash_key = hash_key
+        self.resolve_interval = resolve_interval
+        self.max_failures = max_failures
+        self.ejection_time = ejection_time
+
+        self._resolver = resolver
+        self._next_resolve = 0
+        self._lock = threading.Lock()
+        self._endpoints = []
+        self._ring = []
+        self._next = 0
+
+        if endpoints is not None:
+            self._update(endpoints)
+
+    @property
+    def endpoints(self):
+        return [endpoint.url for endpoint in self._endpoints]
+
+    def pick(self, metadata=None):
+        """
+        Pick the endpoint for a unary-unary call and count it as in flight
+        until done() is called with the outcome.
+        """
+        if self._resolver is not None and time.monotonic() >= self._next_resolve:
+            self._resolve()
+
+        with self._lock:
+            endpoint = self._choose(metadata)
+            endpoint.outstanding += 1
+
+        return endpoint
+
+    def choose(self, metadata=None):
+        """
+        Pick the endpoint for a call without keeping track of it.
+        """
+        if self._resolver is not None and time.monotonic() >= self._next_resolve:
+            self._resolve()
+
+        with self._lock:
+            return self._choose(metadata)
+
+    def done(self, endpoint, error=None):
+        """
+        Record the outcome of a call to an endpoint returned by pick().
+        Only UNAVAILABLE and DEADLINE_EXCEEDED count against the endpoint,
+        other errors leave its count of failures alone.
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+
+            if error is None:
+                endpoint.failures = 0
+                return
+
+            if (
+                not isinstance(error, grpc.RpcError)
+                or error.code() not in _EJECTING_CODES
+            ):
+                return
+
+            endpoint.failures += 1
+            if endpoint.failures >= self.max_failures:
+                endpoint.failures = 0
+                endpoint.ejected_until = time.monotonic() + self.ejection_time
+
+    def abandon(self, endpoint):
+        """
+        Stop counting a call to an endpoint returned by pick() as in flight
+        when it ended without an outcome, e.g. because it was cancelled.
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+
+    def _resolve(self):
+        with self._lock:
+            if time.monotonic() < self._next_resolve:
+                return
+
+            # Other calls carry on with the current endpoints meanwhile.
+            self._next_resolve = time.monotonic() + self.resolve_interval
+
+        try:
+            endpoints = self._resolver()
+        except Exception:
+            # Keep the endpoints there are until the next poll, or poll again
+            # on the next call if there are none.
+            if self._endpoints:
+                return
+
+            self._next_resolve = 0
+            raise
+
+        self._update(endpoints)
+
+    def _update(self, urls):
+        with self._lock:
+            current = {endpoint.url: endpoint for endpoint in self._endpoints}
+            endpoints = []
+
+            for url in urls:
+                url = _normalize(url)
+                if url not in current:
+                    current[url] = _Endpoint(url)
+                endpoints.append(current[url])
+
+            self._endpoints = endpoints
+
+            if self.policy == CONSISTENT_HASH:
+                self._ring = sorted(
+                    (_hash(f"{endpoint.url}#{point}".encode()), endpoint)
+                    for endpoint in endpoints
+                    for point in range(_RING_POINTS)
+                )
+
+    def _choose(self, metadata):
+        now = time.monotonic()
+        endpoints = [
+            endpoint for endpoint in self._endpoints if endpoint.ejected_until <= now
+        ] or self._endpoints
+
+        if not endpoints:
+            raise protocol.WebRpcError(
+                grpc.StatusCode.UNAVAILABLE, "No endpoints to send the call to"
+            )
+
+        if self.policy == CONSISTENT_HASH:
+            value = _metadata_value(metadata, self.hash_key)
+            if value is not None:
+                return self._hash_endpoint(value, now)
+
+        self._next += 1
+        start = self._next % len(endpoints)
+
+        if self.policy == LEAST_OUTSTANDING:
+            # Start from a different endpoint each time so that ties are
+            # shared out.
+            return min(
+                endpoints[start:] + endpoints[:start],
+                key=lambda endpoint: endpoint.outstanding,
+            )
+
+        return endpoints[start]
+
+    def _hash_endpoint(self, value, now):
+        if isinstance(value, str):
+            value = value.encode()
+
+        ring = self._ring
+        start = bisect.bisect(ring, (_hash(value),))
+
+        # Walk around the ring past any ejected endpoints.
+        for i in range(len(ring)):
+            endpoint = ring[(start + i) % len(ring)][1]
+            if endpoint.ejected_until <= now:
+                return endpoint
+
+        return ring[start % len(ring)][1]
+
+
+class _Endpoint:
+    __slots__ = ("url", "outstanding", "failures", "ejected_until")
+
+    def __init__(self, url):
+        self.url = url
+        self.outstanding = 0
+        self.failures = 0
+        self.ejected_until = 0
+
+    def __lt__(self, other):
+        # Only compared on the ring when two points hash the same.
+        return self.url < other.url
+
+
+def _md5(data):
+    # The hash only spreads keys over the ring, so it works on FIPS builds
+    # that only allow md5 for other uses than security.
+    try:
+        return hashlib.md5(data, usedforsecurity=False)
+    except TypeError:  # pragma: no cover
+        # Python < 3.9
+        return hashlib.md5(data)
+
+
+def _normalize(url):
+    if not url.startswith("http") and "://" not in url:
+        url = f"http://{url}"
+
+    return url
+
+
+def _hash(data):
+    return int.from_bytes(_md5(data).digest()[:8], "big")
+
+
+def _metadata_value(metadata, key):
+    for name, value in metadata or ():
+        if name == key:
+            return value
+
+    return None
@@ -1,53 +1,353 @@
+from collections import namedtuple
+import concurrent.futures
 import functools
 import inspect
 import io
+import threading
+import time
+from typing import Optional
 from urllib.parse import urljoin
 import warnings
+import weakref
 
 import grpc
 import urllib3
+import urllib3.connection
+import urllib3.connectionpool
 import urllib3.exceptions
 
 from sonora import protocol
+import sonora.balancing
+import sonora.compression
+import sonora.retry
 
 
-def insecure_web_channel(url):
-    return WebChannel(url)
+def insecure_web_channel(url, compression=None, interceptors=None):
+    return WebChannel(url, compression=compression, interceptors=interceptors)
 
 
 class WebChannel:
-    def __init__(self, url):
-        if not url.startswith("http") and "://" not in url:
-            url = f"http://{url}"
+    def __init__(
+        self,
+        url,
+        compression=None,
+        compression_threshold=sonora.compression.DEFAULT_THRESHOLD,
+        interceptors=None,
+        max_workers=10,
+        pool_maxsize=None,
+        pool_block=False,
+        idle_timeout=None,
+        pool_manager=None,
+        service_config=None,
+        max_receive_message_length=4 * 1024 * 1024,
+    ):
+        self._url, self._balancer = _target(url)
+        self._owns_session = pool_manager is None
 
-        self._url = url
-        self._session = urllib3.PoolManager()
+        if pool_manager is None:
+            # By default keep a connection per host for each thread that can
+            # run a future.
+            pool_manager = PoolManager(
+                maxsize=max_workers if pool_maxsize is None else pool_maxsize,
+                block=pool_block,
+                idle_timeout=idle_timeout,
+            )
+
+        self._session = pool_manager
+        self._codec = sonora.compression.resolve(compression)
+        self._compression_threshold = compression_threshold
+        self._max_receive_message_length = max_receive_message_length
+        self._interceptors = tuple(interceptors or ())
+        self._service_config = _service_config(service_config)
+        self._max_workers = max_workers
+        self._executor = None
+        self._hedging_executor = None
 
     def __enter__(self):
         return self
 
     def __exit__(self, exception_type, exception_value, traceback):
-        self._session.clear()
+        for executor in (self._executor, self._hedging_executor):
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+        if self._owns_session:
+            self._session.clear()
+
+    def stats(self):
+        """
+        Connection counts for the channel's pool manager, see
+        PoolManager.stats().
+        """
+        return self._session.stats()
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self._max_workers, thread_name_prefix="sonora-client"
+            )
+
+        return self._executor
+
+    def _get_hedging_executor(self):
+        # Hedged attempts get their own threads, a call running as a future
+        # would deadlock waiting for attempts queued behind it otherwise.
+        if self._hedging_executor is None:
+            self._hedging_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self._max_workers, thread_name_prefix="sonora-hedging"
+            )
+
+        return self._hedging_executor
 
     def unary_unary(self, path, request_serializer, response_deserializer):
         return UnaryUnaryMulticallable(
-            self._session, self._url, path, request_serializer, response_deserializer
+            self._session,
+            self._url,
+            path,
+            request_serializer,
+            response_deserializer,
+            codec=self._codec,
+            compression_threshold=self._compression_threshold,
+            max_receive_message_length=self._max_receive_message_length,
+            interceptors=self._interceptors,
+            balancer=self._balancer,
+            service_config=self._service_config,
+            get_executor=self._get_executor,
+            get_hedging_executor=self._get_hedging_executor,
         )
 
     def unary_stream(self, path, request_serializer, response_deserializer):
         return UnaryStreamMulticallable(
-            self._session, self._url, path, request_serializer, response_deserializer
+            self._session,
+            self._url,
+            path,
+            request_serializer,
+            response_deserializer,
+            codec=self._codec,
+            compression_threshold=self._compression_threshold,
+            max_receive_message_length=self._max_receive_message_length,
+            interceptors=self._interceptors,
+            balancer=self._balancer,
         )
 
     def stream_unary(self, path, request_serializer, response_deserializer):
-        return NotImplementedMulticallable()
+        return StreamUnaryMulticallable(
+            self._session,
+            self._url,
+            path,
+            request_serializer,
+            response_deserializer,
+            codec=self._codec,
+            compression_threshold=self._compression_threshold,
+            max_receive_message_length=self._max_receive_message_length,
+            interceptors=self._interceptors,
+            balancer=self._balancer,
+        )
 
     def stream_stream(self, path, request_serializer, response_deserializer):
-        return NotImplementedMulticallable()
+        return StreamStreamMulticallable(
+            self._session,
+            self._url,
+            path,
+            request_serializer,
+            response_deserializer,
+            codec=self._codec,
+            compression_threshold=self._compression_threshold,
+            max_receive_message_length=self._max_receive_message_length,
+            interceptors=self._interceptors,
+            balancer=self._balancer,
+        )
+
+
+def _target(url):
+    """
+    Split a channel's url, a URL, a list of them or a
+    sonora.balancing.Balancer, into the base URL for its calls and its
+    balancer. Calls to balanced channels are relative to their endpoint.
+    """
+    if isinstance(url, sonora.balancing.Balancer):
+        return "", url
+
+    if isinstance(url, (list, tuple)):
+        return "", sonora.balancing.Balancer(url)
+
+    if not url.startswith("http") and "://" not in url:
+        url = f"http://{url}"
+
+    return url, None
+
+
+def _service_config(service_config):
+    if service_config is None or isinstance(service_config, sonora.retry.ServiceConfig):
+        return service_config
+
+    return sonora.retry.ServiceConfig(service_config)
+
+
+class PoolManager(urllib3.PoolManager):
+    """
+    A urllib3.PoolManager that counts how its connections are used and can
+    close connections that have been idle for more than idle_timeout
+    seconds, before the server or a middlebox drops them.
+
+    Keeps up to maxsize connections per host. If block is true, requests
+    wait for one of them to be free, until the call's deadline, rather than
+    opening extra connections that are closed after use. Pass one to several
+    WebChannels as pool_manager to share connections between them.
+    """
+
+    def __init__(self, maxsize=10, block=False, idle_timeout=None, **kwargs):
+        super().__init__(maxsize=maxsize, block=block, **kwargs)
+
+        self.pool_classes_by_scheme = {
+            "http": functools.partial(_HTTPConnectionPool, manager=self),
+            "https": functools.partial(_HTTPSConnectionPool, manager=self),
+        }
+        self.idle_timeout = idle_timeout
+
+        # The connections' own connect, close and request methods and the
+        # pools' release hook keep these up to date.
+        self._lock = threading.Lock()
+        self._open = weakref.WeakSet()
+        self._busy = weakref.WeakSet()
+        self._created = 0
+        self._reused = 0
+
+    def stats(self):
+        """
+        Return the number of connections currently open, idle in the pools
+        and in use by a call, and how many requests opened a new connection
+        or reused an idle one so far.
+        """
+        with self._lock:
+            open = len(self._open)
+            in_use = sum(1 for conn in self._busy if conn in self._open)
+
+            return {
+                "open": open,
+                "idle": open - in_use,
+                "in_use": in_use,
+                "created": self._created,
+                "reused": self._reused,
+            }
+
+    def _connected(self, conn):
+        with self._lock:
+            self._open.add(conn)
+            self._created += 1
+
+    def _closed(self, conn):
+        with self._lock:
+            self._open.discard(conn)
+
+    def _checked_out(self, conn):
+        """
+        Note that conn is about to send a request. Returns whether it has
+        been idle for too long and should be closed first.
+        """
+        with self._lock:
+            self._busy.add(conn)
+
+            if conn not in self._open:
+                return False
+
+            if self.idle_timeout is not None and conn.idle_since is not None:
+                if time.monotonic() - conn.idle_since > self.idle_timeout:
+                    return True
+
+            self._reused += 1
+            return False
+
+    def _released(self, conn):
+        conn.idle_since = time.monotonic()
+
+        with self._lock:
+            self._busy.discard(conn)
+
+
+class _ConnectionMixin:
+    _manager = None
+    idle_since = None
+
+    def connect(self):
+        super().connect()
+        self._manager._connected(self)
+
+    def close(self):
+        super().close()
+        self._manager._closed(self)
+
+    def request(self, *args, **kwargs):
+        self._check_out()
+        return super().request(*args, **kwargs)
+
+    def request_chunked(self, *args, **kwargs):
+        self._check_out()
+        return super().request_chunked(*args, **kwargs)
+
+    def _check_out(self):
+        if self._manager._checked_out(self):
+            # Sending the request opens a new connection.
+            self.close()
+
+
+class _HTTPConnection(_ConnectionMixin, urllib3.connection.HTTPConnection):
+    pass
+
+
+class _HTTPSConnection(_ConnectionMixin, urllib3.connection.HTTPSConnection):
+    pass
+
+
+class _ConnectionPoolMixin:
+    def __init__(self, *args, manager, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._manager = manager
+
+    def _new_conn(self):
+        conn = super()._new_conn()
+        conn._manager = self._manager
+        return conn
+
+    def _put_conn(self, conn):
+        if conn is not None:
+            self._manager._released(conn)
+
+        super()._put_conn(conn)
+
+
+class _HTTPConnectionPool(
+    _ConnectionPoolMixin, urllib3.connectionpool.HTTPConnectionPool
+):
+    ConnectionCls = _HTTPConnection
+
+
+class _HTTPSConnectionPool(
+    _ConnectionPoolMixin, urllib3.connectionpool.HTTPSConnectionPool
+):
+    ConnectionCls = _HTTPSConnection
 
 
 class Multicallable:
-    def __init__(self, session, url, path, request_serializer, request_deserializer):
+    # The kind of client interceptor that applies to this kind of call, and
+    # its method.
+    _interceptor_class: Optional[type] = None
+    _intercept_method: Optional[str] = None
+
+    def __init__(
+        self,
+        session,
+        url,
+        path,
+        request_serializer,
+        request_deserializer,
+        codec=None,
+        compression_threshold=sonora.compression.DEFAULT_THRESHOLD,
+        max_receive_message_length=4 * 1024 * 1024,
+        interceptors=(),
+        service_config=None,
+        balancer=None,
+    ):
         self._session = session
 
         self._url = url
@@ -57,10 +357,91 @@ class Multicallable:
         self._metadata = [
             ("x-user-agent", "grpc-web-python/0.1"),
             ("content-type", "application/grpc-web+proto"),
+            ("grpc-accept-encoding", sonora.compression.accept_encoding()),
         ]
 
+        if codec is not None:
+            self._metadata.append(("grpc-encoding", codec.name))
+
         self._serializer = request_serializer
         self._deserializer = request_deserializer
+        self._codec = codec
+        self._compression_threshold = compression_threshold
+        self._max_receive_message_length = max_receive_message_length
+
+        self._intercepted = self._chain_interceptors(interceptors)
+
+        self._balancer = balancer
+        self._balanced_urls = {}
+
+        self._method_config = None
+        self._throttle = None
+
+        if service_config is not None:
+            self._method_config = service_config.method_config(path)
+            self._throttle = service_config.throttle
+
+    def _chain_interceptors(self, interceptors):
+        """
+        Build the interceptor chain for this method once, the first
+        interceptor outermost. Returns None if none of the interceptors apply
+        to this kind of call.
+        """
+        if self._interceptor_class is None:
+            return None
+
+        interceptors = [
+            interceptor
+            for interceptor in interceptors
+            if isinstance(interceptor, self._interceptor_class)
+        ]
+
+        if not interceptors:
+            return None
+
+        continuation = self._continue
+
+        for interceptor in reversed(interceptors):
+            continuation = functools.partial(
+                getattr(interceptor, self._intercept_method), continuation
+            )
+
+        return continuation
+
+    def _call_details(self, timeout, metadata):
+        return _ClientCallDetails(self._path, timeout, metadata, None, None, None)
+
+    def _url_for(self, method):
+        if method == self._path:
+            return self._rpc_url
+
+        # grpc.aio passes the method to its interceptors as bytes.
+        if isinstance(method, bytes):
+            method = method.decode("ascii")
+
+        return urljoin(self._url, method[1:])
+
+    def _balanced_url(self, endpoint, url):
+        key = (endpoint.url, url)
+
+        balanced = self._balanced_urls.get(key)
+        if balanced is None:
+            # Resolvers can keep coming up with new endpoints.
+            if len(self._balanced_urls) >= 1024:
+                self._balanced_urls.clear()
+
+            balanced = self._balanced_urls[key] = urljoin(endpoint.url, url)
+
+        return balanced
+
+    def _route(self, url, metadata):
+        """
+        The URL for a call that the balancer doesn't keep track of.
+        """
+        if self._balancer is None:
+            return url
+
+        return self._balanced_url(self._balancer.choose(metadata), url)
 
     def future(self, request):
         raise NotImplementedError()
@@ -78,11 +459,212 @@ class NotImplementedMulticallable(Multicallable):
 
 
 class UnaryUnaryMulticallable(Multicallable):
+    _interceptor_class = grpc.UnaryUnaryClientInterceptor
+    _intercept_method = "intercept_unary_unary"
+
+    def __init__(self, *args, get_executor=None, get_hedging_executor=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._get_executor = get_executor
+        self._get_hedging_executor = get_hedging_executor
+
     def __call__(self, request, timeout=None, metadata=None):
         result, _call = self.with_call(request, timeout, metadata)
         return result
 
+    def future(self, request, timeout=None, metadata=None):
+        """
+        Start the call on the channel's thread pool and return a grpc.Future
+        for its outcome.
+        """
+        if self._get_executor is None:
+            raise NotImplementedError()
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        return _CallFuture(
+            self._get_executor().submit(
+                self._with_deadline, request, deadline, metadata
+            ),
+            deadline,
+        )
+
+    def _with_deadline(self, request, deadline, metadata):
+        timeout = None
+
+        if deadline is not None:
+            # The call may have waited for a thread, only send what's left.
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                raise _deadline_exceeded()
+
+        return self.with_call(request, timeout, metadata)
+
     def with_call(self, request, timeout=None, metadata=None):
+        if self._intercepted is not None:
+            outcome = self._intercepted(self._call_details(timeout, metadata), request)
+            return outcome.result(), outcome
+
+        return self._invoke(request, timeout, metadata, self._rpc_url)
+
+    def _continue(self, client_call_details, request):
+        try:
+            result, call = self._invoke(
+                request,
+                client_call_details.timeout,
+                client_call_details.metadata,
+                self._url_for(client_call_details.method),
+            )
+        except grpc.RpcError as exc:
+            return _FailedOutcome(exc)
+
+        return _UnaryOutcome(result, call)
+
+    def _invoke(self, request, timeout, metadata, url):
+        if self._method_config is None:
+            return self._attempt(request, timeout, metadata, url)
+
+        if timeout is None:
+            timeout = self._method_config.timeout
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        if self._method_config.retry_policy is not None:
+            return self._retry(request, deadline, metadata, url)
+
+        if (
+            self._method_config.hedging_policy is not None
+            and self._get_hedging_executor is not None
+        ):
+            return self._hedge(request, deadline, metadata, url)
+
+        return self._attempt(request, timeout, metadata, url)
+
+    def _retry(self, request, deadline, metadata, url):
+        policy = self._method_config.retry_policy
+        throttle = self._throttle
+        attempt = 1
+
+        while True:
+            try:
+                outcome = self._attempt(
+                    request, _time_left(deadline), metadata, url, retries=False
+                )
+            except (grpc.RpcError, *_TRANSPORT_ERRORS) as exc:
+                error = _rpc_error(exc)
+
+                if error.code() not in policy.retryable_status_codes:
+                    raise error
+
+                if throttle is not None:
+                    throttle.record_failure()
+
+                    if not throttle.allows_retry():
+                        raise error
+
+                if attempt >= policy.max_attempts:
+                    raise error
+
+                backoff = policy.backoff(attempt)
+                if deadline is not None and time.monotonic() + backoff >= deadline:
+                    raise error
+
+                time.sleep(backoff)
+                attempt += 1
+            else:
+                if throttle is not None:
+                    throttle.record_success()
+
+                return outcome
+
+    def _hedge(self, request, deadline, metadata, url):
+        """
+        Send attempts in parallel on the hedging pool. The attempts that lose
+        can't be interrupted, they finish in the background.
+        """
+        policy = self._method_config.hedging_policy
+        throttle = self._throttle
+        executor = self._get_hedging_executor()
+        pending = set()
+        attempts = 0
+        error = None
+
+        while True:
+            if (
+                attempts < policy.max_attempts
+                and (attempts == 0 or throttle is None or throttle.allows_retry())
+                and (deadline is None or time.monotonic() < deadline)
+            ):
+                pending.add(
+                    executor.submit(
+                        self._attempt,
+                        request,
+                        _time_left(deadline),
+                        metadata,
+                        url,
+                        retries=False,
+                    )
+                )
+                attempts += 1
+
+                # Wait for the next hedge, unless this was the last one.
+                timeout = None
+                if attempts < policy.max_attempts:
+                    timeout = policy.hedging_delay
+            elif pending:
+                timeout = None
+            else:
+                raise error or _deadline_exceeded()
+
+            done, pending = concurrent.futures.wait(
+                pending, timeout, concurrent.futures.FIRST_COMPLETED
+            )
+
+            for future in done:
+                error = future.exception()
+
+                if error is None:
+                    if throttle is not None:
+                        throttle.record_success()
+
+                    return future.result()
+
+                if isinstance(error, _TRANSPORT_ERRORS):
+                    error = _rpc_error(error)
+
+                if (
+                    not isinstance(error, grpc.RpcError)
+                    or error.code() not in policy.non_fatal_status_codes
+                ):
+                    raise error
+
+                if throttle is not None:
+                    throttle.record_failure()
+
+    def _attempt(self, request, timeout, metadata, url, retries=None):
+        """
+        Send the request once. The policies pass retries=False, so that
+        urllib3 doesn't retry on top of them.
+        """
+        if self._balancer is None:
+            return self._send(request, timeout, metadata, url, retries)
+
+        endpoint = self._balancer.pick(metadata)
+
+        try:
+            outcome = self._send(
+                request, timeout, metadata, self._balanced_url(endpoint, url), retries
+            )
+        except _TRANSPORT_ERRORS as exc:
+            self._balancer.done(endpoint, _rpc_error(exc))
+            raise
+        except Exception as exc:
+            self._balancer.done(endpoint, exc)
+            raise
+
+        self._balancer.done(endpoint)
+        return outcome
+
+    def _send(self, request, timeout, metadata, url, retries=None):
         call_metadata = self._metadata.copy()
         if metadata is not None:
             call_metadata.extend(protocol.encode_headers(metadata))
@@ -91,17 +673,38 @@ class UnaryUnaryMulticallable(Multicallable):
             request,
             timeout,
             call_metadata,
-            self._rpc_url,
+            url,
             self._session,
             self._serializer,
             self._deserializer,
+            codec=self._codec,
+            compression_threshold=self._compression_threshold,
+            max_receive_message_length=self._max_receive_message_length,
+            retries=retries,
         )
 
         return call(), call
 
 
 class UnaryStreamMulticallable(Multicallable):
+    _interceptor_class = grpc.UnaryStreamClientInterceptor
+    _intercept_method = "intercept_unary_stream"
+
     def __call__(self, request, timeout=None, metadata=None):
+        if self._intercepted is not None:
+            return self._intercepted(self._call_details(timeout, metadata), request)
+
+        return self._invoke(request, timeout, metadata, self._rpc_url)
+
+    def _continue(self, client_call_details, request):
+        return self._invoke(
+            request,
+            client_call_details.timeout,
+            client_call_details.metadata,
+            self._url_for(client_call_details.method),
+        )
+
+    def _invoke(self, request, timeout, metadata, url):
         call_metadata = self._metadata.copy()
         if metadata is not None:
             call_metadata.extend(protocol.encode_headers(metadata))
@@ -110,16 +713,346 @@ class UnaryStreamMulticallable(Multicallable):
             request,
             timeout,
             call_metadata,
-            self._rpc_url,
+            self._route(url, metadata),
+            self._session,
+            self._serializer,
+            self._deserializer,
+            codec=self._codec,
+            compression_threshold=self._compression_threshold,
+            max_receive_message_length=self._max_receive_message_length,
+        )
+
+
+class StreamUnaryMulticallable(Multicallable):
+    def __call__(self, request_iterator, timeout=None, metadata=None):
+        result, _call = self.with_call(request_iterator, timeout, metadata)
+        return result
+
+    def with_call(self, request_iterator, timeout=None, metadata=None):
+        call_metadata = self._metadata.copy()
+        if metadata is not None:
+            call_metadata.extend(protocol.encode_headers(metadata))
+
+        call = StreamUnaryCall(
+            request_iterator,
+            timeout,
+            call_metadata,
+            self._route(self._rpc_url, metadata),
+            self._session,
+            self._serializer,
+            self._deserializer,
+            codec=self._codec,
+            compression_threshold=self._compression_threshold,
+            max_receive_message_length=self._max_receive_message_length,
+        )
+
+        return call(), call
+
+
+class StreamStreamMulticallable(Multicallable):
+    def __call__(self, request_iterator, timeout=None, metadata=None):
+        call_metadata = self._metadata.copy()
+        if metadata is not None:
+            call_metadata.extend(protocol.encode_headers(metadata))
+
+        return StreamStreamCall(
+            request_iterator,
+            timeout,
+            call_metadata,
+            self._route(self._rpc_url, metadata),
             self._session,
             self._serializer,
             self._deserializer,
+            codec=self._codec,
+            compression_threshold=self._compression_threshold,
+            max_receive_message_length=self._max_receive_message_length,
         )
 
 
+class _ClientCallDetails(
+    namedtuple(
+        "_ClientCallDetails",
+        (
+            "method",
+            "timeout",
+            "metadata",
+            "credentials",
+            "wait_for_ready",
+            "compression",
+        ),
+    ),
+    grpc.ClientCallDetails,
+):
+    pass
+
+
+class _CallFuture(grpc.Call, grpc.Future):
+    """
+    A unary-unary call running on the channel's thread pool.
+
+    Only calls that are still queued can be cancelled, a running request
+    can't be interrupted. A call still queued when its deadline passes is
+    dropped as soon as something waits for it, and fails with
+    DEADLINE_EXCEEDED.
+    """
+
+    def __init__(self, future, deadline):
+        self._future = future
+        self._deadline = deadline
+        # The error of a call dropped from the queue at its deadline.
+        self._expired = None
+
+    def _wait(self, timeout=None):
+        end = None if timeout is None else time.monotonic() + timeout
+
+        if self._deadline is not None and (end is None or self._deadline < end):
+            _wait_for(self._future, max(self._deadline - time.monotonic(), 0))
+
+            # A call that started running in the meantime can't be dropped,
+            # it's waited for like any other.
+            if not self._future.done() and self._future.cancel():
+                self._expired = _deadline_exceeded()
+
+        _wait_for(self._future, None if end is None else max(end - time.monotonic(), 0))
+
+        if not self._future.done():
+            raise grpc.FutureTimeoutError()
+
+    def _error(self):
+        if self._future.cancelled():
+            if self._expired is None:
+                raise grpc.FutureCancelledError()
+
+            return self._expired
+
+        return self._future.exception()
+
+    def _call(self):
+        self._wait()
+
+        if not self._future.cancelled() and self._future.exception() is None:
+            return self._future.result()[1]
+
+    def initial_metadata(self):
+        call = self._call()
+        return None if call is None else call.initial_metadata()
+
+    def trailing_metadata(self):
+        call = self._call()
+        return None if call is None else call.trailing_metadata()
+
+    def code(self):
+        self._wait()
+
+        if self.cancelled():
+            return grpc.StatusCode.CANCELLED
+
+        error = self._error()
+        return grpc.StatusCode.OK if error is None else error.code()
+
+    def details(self):
+        self._wait()
+
+        if self.cancelled():
+            return "Locally cancelled by application!"
+
+        error = self._error()
+        return None if error is None else error.details()
+
+    def is_active(self):
+        return not self._future.done()
+
+    def time_remaining(self):
+        if self._deadline is not None:
+            return max(self._deadline - time.monotonic(), 0)
+
+    def cancel(self):
+        return self._future.cancel()
+
+    def cancelled(self):
+        return self._future.cancelled() and self._expired is None
+
+    def running(self):
+        return not self._future.done()
+
+    def done(self):
+        return self._future.done()
+
+    def result(self, timeout=None):
+        self._wait(timeout)
+
+        error = self._error()
+        if error is not None:
+            raise error
+
+        return self._future.result()[0]
+
+    def exception(self, timeout=None):
+        self._wait(timeout)
+        return self._error()
+
+    def traceback(self, timeout=None):
+        error = self.exception(timeout)
+        return None if error is None else error.__traceback__
+
+    def add_callback(self, callback):
+        if self._future.done():
+            return False
+
+        self._future.add_done_callback(lambda _: callback())
+        return True
+
+    def add_done_callback(self, fn):
+        self._future.add_done_callback(lambda _: fn(self))
+
+
+def _wait_for(future, timeout):
+    # Unlike concurrent.futures.wait(), this returns as soon as the future is
+    # cancelled rather than once a worker has picked it up.
+    try:
+        future.exception(timeout)
+    except (concurrent.futures.CancelledError, concurrent.futures.TimeoutError):
+        pass
+
+
+def _time_left(deadline):
+    if deadline is None:
+        return None
+
+    timeout = deadline - time.monotonic()
+    if timeout <= 0:
+        raise _deadline_exceeded()
+
+    return timeout
+
+
+def _deadline_exceeded():
+    return protocol.WebRpcError(
+        grpc.StatusCode.DEADLINE_EXCEEDED, "request timed out at the client"
+    )
+
+
+# Failures to reach the server at all, which retry and hedging policies and
+# the balancer treat as UNAVAILABLE, as gRPC does.
+_TRANSPORT_ERRORS = (
+    urllib3.exceptions.MaxRetryError,
+    urllib3.exceptions.NewConnectionError,
+    urllib3.exceptions.ProtocolError,
+)
+
+
+def _rpc_error(exc):
+    """
+    The RpcError a failed attempt counts as, transport errors are
+    UNAVAILABLE.
+    """
+    if isinstance(exc, grpc.RpcError):
+        return exc
+
+    error = protocol.WebRpcError(grpc.StatusCode.UNAVAILABLE, str(exc))
+    error.__cause__ = exc
+    return error
+
+
+class _UnaryOutcome(grpc.Call, grpc.Future):
+    """
+    The finished call a unary-unary continuation hands back to client
+    interceptors, like grpc's own.
+    """
+
+    def __init__(self, result, call):
+        self._result = result
+        self._call = call
+
+    def initial_metadata(self):
+        return self._call.initial_metadata()
+
+    def trailing_metadata(self):
+        return self._call.trailing_metadata()
+
+    def code(self):
+        return grpc.StatusCode.OK
+
+    def details(self):
+        return None
+
+    def is_active(self):
+        return False
+
+    def time_remaining(self):
+        return None
+
+    def cancel(self):
+        return False
+
+    def cancelled(self):
+        return False
+
+    def running(self):
+        return False
+
+    def done(self):
+        return True
+
+    def result(self, timeout=None):
+        return self._result
+
+    def exception(self, timeout=None):
+        return None
+
+    def traceback(self, timeout=None):
+        return None
+
+    def add_callback(self, callback):
+        return False
+
+    def add_done_callback(self, fn):
+        fn(self)
+
+
+class _FailedOutcome(_UnaryOutcome):
+    def __init__(self, exception):
+        self._exception = exception
+
+    def initial_metadata(self):
+        return None
+
+    def trailing_metadata(self):
+        return None
+
+    def code(self):
+        return self._exception.code()
+
+    def details(self):
+        return self._exception.details()
+
+    def result(self, timeout=None):
+        raise self._exception
+
+    def exception(self, timeout=None):
+        return self._exception
+
+    def traceback(self, timeout=None):
+        return self._exception.__traceback__
+
+
 class Call:
+    # Request streaming calls send their messages as a chunked body.
+    _chunked = False
+
     def __init__(
-        self, request, timeout, metadata, url, session, serializer, deserializer
+        self,
+        request,
+        timeout,
+        metadata,
+        url,
+        session,
+        serializer,
+        deserializer,
+        codec=None,
+        compression_threshold=sonora.compression.DEFAULT_THRESHOLD,
+        max_receive_message_length=4 * 1024 * 1024,
+        retries=None,
     ):
         self._request = request
         self._timeout = timeout
@@ -130,6 +1063,12 @@ class Call:
         self._deserializer = deserializer
         self._response = None
         self._trailers = None
+        self._codec = codec
+        self._compression_threshold = compression_threshold
+        self._max_receive_message_length = max_receive_message_length
+        self._response_codec = None
+        # None leaves urllib3's own retries on.
+        self._retries = retries
 
         if timeout is not None:
             self._metadata.append(("grpc-timeout", protocol.serialize_timeout(timeout)))
@@ -137,6 +1076,48 @@ class Call:
     def initial_metadata(self):
         return self._response.headers.items()
 
+    def _request_body(self):
+        return self._wrap_request(self._request)
+
+    def _wrap_request(self, request):
+        data = self._serializer(request)
+
+        if self._codec is not None and len(data) >= self._compression_threshold:
+            return protocol.wrap_message(False, True, self._codec.compress(data))
+
+        return protocol.wrap_message(False, False, data)
+
+    def _deserialize(self, compressed, message):
+        max_length = self._max_receive_message_length
+
+        if compressed:
+            if self._response_codec is None:
+                try:
+                    self._response_codec = sonora.compression.get_codec(
+                        self._response.headers.get("grpc-encoding")
+                    )
+                except KeyError:
+                    self._response_codec = None
+
+                if self._response_codec is None:
+                    raise protocol.WebRpcError(
+                        grpc.StatusCode.INTERNAL,
+                        "Compressed message received with an unsupported "
+                        "grpc-encoding",
+                    )
+
+        try:
+            if compressed:
+                message = self._response_codec.decompress(message, max_length)
+            elif len(message) > max_length:
+                raise protocol.MessageTooLargeError(len(message), max_length)
+        except protocol.MessageTooLargeError as exc:
+            raise protocol.WebRpcError(
+                grpc.StatusCode.RESOURCE_EXHAUSTED, str(exc)
+            ) from None
+
+        return self._deserializer(message)
+
     def trailing_metadata(self):
         return self._trailers
 
@@ -194,23 +1175,40 @@ class Call:
         return decorator
 
 
+# A blocking pool running out of connections before the deadline counts as
+# a timeout too.
+_TIMEOUT_ERRORS = (
+    urllib3.exceptions.TimeoutError,
+    urllib3.exceptions.EmptyPoolError,
+)
+
+
 class UnaryUnaryCall(Call):
-    @Call._raise_timeout(urllib3.exceptions.TimeoutError)
+    @Call._raise_timeout(_TIMEOUT_ERRORS)
     def __call__(self):
-        self._response = self._session.request(
-            "POST",
-            self._url,
-            body=protocol.wrap_message(False, False, self._serializer(self._request)),
-            headers=dict(self._metadata),
-            timeout=self._timeout,
-        )
+        try:
+            self._response = self._session.request(
+                "POST",
+                self._url,
+                body=self._request_body(),
+                headers=dict(self._metadata),
+                timeout=self._timeout,
+                pool_timeout=self._timeout,
+                chunked=self._chunked,
+                retries=self._retries,
+            )
+        except urllib3.exceptions.NewConnectionError as exc:
+            # Without retries urllib3 raises this bare, and it is a
+            # TimeoutError subclass; wrap it as urllib3's own retries would
+            # so it stays UNAVAILABLE rather than DEADLINE_EXCEEDED.
+            raise urllib3.exceptions.MaxRetryError(None, self._url, exc) from exc
 
         buffer = io.BytesIO(self._response.data)
 
         messages = protocol.unwrap_message_stream(buffer)
 
         try:
-            trailers, _, message = next(messages)
+            trailers, compressed, message = next(messages)
         except StopIteration:
             protocol.raise_for_status(self._response.headers)
             return
@@ -218,7 +1216,7 @@ class UnaryUnaryCall(Call):
         if trailers:
             self._trailers = protocol.unpack_trailers(message)
         else:
-            result = self._deserializer(message)
+            result = self._deserialize(compressed, message)
 
         try:
             trailers, _, message = next(messages)
@@ -236,26 +1234,28 @@ class UnaryUnaryCall(Call):
 
 
 class UnaryStreamCall(Call):
-    @Call._raise_timeout(urllib3.exceptions.TimeoutError)
+    @Call._raise_timeout(_TIMEOUT_ERRORS)
     def __iter__(self):
         self._response = self._session.request(
             "POST",
             self._url,
-            body=protocol.wrap_message(False, False, self._serializer(self._request)),
+            body=self._request_body(),
             headers=dict(self._metadata),
             timeout=self._timeout,
+            pool_timeout=self._timeout,
             preload_content=False,
+            chunked=self._chunked,
         )
         self._response.auto_close = False
 
         stream = io.BufferedReader(self._response, buffer_size=16384)
 
-        for trailers, _, message in protocol.unwrap_message_stream(stream):
+        for trailers, compressed, message in protocol.unwrap_message_stream(stream):
             if trailers:
                 self._trailers = protocol.unpack_trailers(message)
                 break
             else:
-                yield self._deserializer(message)
+                yield self._deserialize(compressed, message)
 
         self._response.release_conn()
 
@@ -264,3 +1264,19 @@ class UnaryStreamCall(Call):
     def __del__(self):
         if self._response and self._response.connection:
             self._response.close()
+
+
+class StreamUnaryCall(UnaryUnaryCall):
+    _chunked = True
+
+    def _request_body(self):
+        for request in self._request:
+            yield self._wrap_request(request)
+
+
+class StreamStreamCall(UnaryStreamCall):
+    _chunked = True
+
+    def _request_body(self):
+        for request in self._request:
+            yield self._wrap_request(request)
@@ -0,0 +1,204 @@
+import threading
+from typing import Dict, Tuple, Type
+import zlib
+
+import grpc
+
+from sonora import protocol
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None  # type: ignore
+
+
+# What the codecs raise for data that doesn't decompress. Codecs added with
+# register_codec can raise ValueError.
+DECOMPRESSION_ERRORS: Tuple[Type[Exception], ...] = (zlib.error, ValueError)
+
+if zstandard is not None:
+    DECOMPRESSION_ERRORS += (zstandard.ZstdError,)
+
+# Messages smaller than this are sent uncompressed by default, the framing
+# and codec headers would eat most of the saving.
+DEFAULT_THRESHOLD = 1024
+
+
+class Codec:
+    """
+    A message compression codec as named in the grpc-encoding header.
+    """
+
+    name: str
+
+    def compress(self, data):
+        raise NotImplementedError()
+
+    def decompress(self, data, max_length=None):
+        """
+        Decompress a message. If max_length is given, raise
+        protocol.MessageTooLargeError as soon as the message decompresses
+        to more than max_length bytes. Data that doesn't decompress should
+        raise one of DECOMPRESSION_ERRORS.
+        """
+        raise NotImplementedError()
+
+
+class GzipCodec(Codec):
+    name = "gzip"
+
+    def __init__(self, level=6):
+        self._level = level
+
+    def compress(self, data):
+        compressor = zlib.compressobj(self._level, zlib.DEFLATED, 31)
+        return compressor.compress(data) + compressor.flush()
+
+    def decompress(self, data, max_length=None):
+        if max_length is None:
+            return zlib.decompress(data, 31)
+
+        return _inflate(zlib.decompressobj(31), data, max_length)
+
+
+class DeflateCodec(Codec):
+    name = "deflate"
+
+    def __init__(self, level=6):
+        self._level = level
+
+    def compress(self, data):
+        return zlib.compress(data, self._level)
+
+    def decompress(self, data, max_length=None):
+        if max_length is None:
+            return zlib.decompress(data)
+
+        return _inflate(zlib.decompressobj(), data, max_length)
+
+
+class ZstdCodec(Codec):
+    name = "zstd"
+
+    def __init__(self, level=3):
+        self._level = level
+
+        # zstandard contexts can't be used from several threads at once, and
+        # codecs are shared by every call, so each thread gets its own.
+        self._local = threading.local()
+
+    def compress(self, data):
+        compressor = getattr(self._local, "compressor", None)
+        if compressor is None:
+            compressor = self._local.compressor = zstandard.ZstdCompressor(
+                level=self._level
+            )
+
+        return compressor.compress(data)
+
+    def decompress(self, data, max_length=None):
+        decompressor = getattr(self._local, "decompressor", None)
+        if decompressor is None:
+            decompressor = self._local.decompressor = zstandard.ZstdDecompressor()
+
+        if max_length is None:
+            return decompressor.decompressobj().decompress(data)
+
+        chunks = []
+        length = 0
+
+        for chunk in decompressor.read_to_iter(data):
+            length += len(chunk)
+            if length > max_length:
+                raise protocol.MessageTooLargeError(length, max_length)
+
+            chunks.append(chunk)
+
+        return b"".join(chunks)
+
+
+def _inflate(decompressor, data, max_length):
+    # Ask zlib for one byte more than allowed, so a message that would
+    # inflate past the limit is caught without inflating the rest of it.
+    message = decompressor.decompress(data, max_length + 1)
+
+    if len(message) > max_length:
+        raise protocol.MessageTooLargeError(len(message), max_length)
+
+    if not decompressor.eof:
+        raise zlib.error("incomplete or truncated stream")
+
+    return message
+
+
+_codecs: Dict[str, Codec] = {}
+_accept_encoding = "identity"
+
+_grpc_compression_names = {
+    grpc.Compression.NoCompression: None,
+    grpc.Compression.Deflate: "deflate",
+    grpc.Compression.Gzip: "gzip",
+}
+
+
+def register_codec(codec):
+    """
+    Make a codec available for negotiation by servers and clients.
+    """
+    global _accept_encoding
+
+    _codecs[codec.name] = codec
+    _accept_encoding = ",".join(["identity", *_codecs])
+
+
+def get_codec(name):
+    """
+    Look up a codec by its grpc-encoding name.
+
+    Returns None for identity and raises KeyError for unknown codecs.
+    """
+    if name is None or name == "identity":
+        return None
+
+    return _codecs[name]
+
+
+def resolve(compression):
+    """
+    Turn a grpc.Compression value, codec name or Codec into a Codec or None.
+    """
+    if isinstance(compression, grpc.Compression):
+        compression = _grpc_compression_names[compression]
+
+    if compression is None or isinstance(compression, Codec):
+        return compression
+
+    return get_codec(compression)
+
+
+def accept_encoding():
+    """
+    The value to advertise in grpc-accept-encoding for the registered codecs.
+    """
+    return _accept_encoding
+
+
+def negotiate(codec, header):
+    """
+    Return codec if the peer listed it in its grpc-accept-encoding header.
+    """
+    if codec is None or not header:
+        return None
+
+    for name in header.split(","):
+        if name.strip() == codec.name:
+            return codec
+
+    return None
+
+
+register_codec(GzipCodec())
+register_codec(DeflateCodec())
+
+if zstandard is not None:
+    register_codec(ZstdCodec())
@@ -0,0 +1,162 @@
+import re
+
+# Chrome caps Access-Control-Max-Age at two hours, longer values buy nothing.
+DEFAULT_MAX_AGE = 7200
+
+# Origins are client controlled, so the per-origin header cache is bounded.
+_MAX_CACHED_ORIGINS = 1024
+
+
+class CORSHeaders:
+    """
+    The CORS headers to send for one origin, as (bytes, bytes) pairs for ASGI
+    and (str, str) pairs for WSGI. Built once and shared between requests, so
+    treat them as read-only.
+    """
+
+    __slots__ = ("response", "preflight", "wsgi_response", "wsgi_preflight")
+
+    def __init__(self, response, preflight):
+        self.wsgi_response = tuple(response)
+        self.wsgi_preflight = tuple(preflight)
+        self.response = _encode(response)
+        self.preflight = _encode(preflight)
+
+
+def _encode(headers):
+    return tuple(
+        (name.encode("ascii"), value.encode("latin-1")) for name, value in headers
+    )
+
+
+_NOT_ALLOWED = CORSHeaders((), ())
+
+
+class CORSPolicy:
+    """
+    Decide which cross-origin requests browsers may make and what CORS headers
+    to send for them.
+
+    origins lists exact origins such as "https://app.example.com", or "*" to
+    allow any. origin_suffixes allows every origin ending with one of the
+    suffixes, include the leading dot (".example.com") so that lookalike
+    domains don't match. origin_regex must match the whole origin. An allowed
+    origin is echoed back in Access-Control-Allow-Origin, "*" is sent as it
+    is and can't be combined with allow_credentials.
+
+    When no origins are configured the Host header of the request is echoed
+    instead, which is what sonora has always done.
+
+    max_age sets Access-Control-Max-Age so browsers can cache preflight
+    responses instead of repeating them before every call.
+    """
+
+    def __init__(
+        self,
+        origins=None,
+        origin_suffixes=None,
+        origin_regex=None,
+        methods=("POST", "OPTIONS"),
+        headers=("*",),
+        expose_headers=("*",),
+        allow_credentials=False,
+        max_age=DEFAULT_MAX_AGE,
+    ):
+        self._origins = frozenset(origins or ())
+        self._any_origin = "*" in self._origins
+
+        if self._any_origin and allow_credentials:
+            raise ValueError("origins=['*'] can't be combined with allow_credentials")
+        self._origin_suffixes = tuple(origin_suffixes or ())
+
+        if isinstance(origin_regex, str):
+            origin_regex = re.compile(origin_regex)
+        self._origin_regex = origin_regex
+
+        self._echo_host = not (
+            self._origins or self._origin_suffixes or self._origin_regex
+        )
+
+        self._methods = ", ".join(methods)
+        self._headers = ", ".join(headers)
+        self._expose_headers = ", ".join(expose_headers)
+        self._allow_credentials = allow_credentials
+        self._max_age = max_age
+
+        self._cache = {}
+
+    def match(self, origin, host):
+        """
+        Return the CORSHeaders for a request with the given Origin and Host
+        headers, as str or the raw bytes, either may be None. Disallowed
+        origins get no CORS headers.
+        """
+        if self._echo_host:
+            key = host
+        elif self._any_origin and origin:
+            key = "*"
+        else:
+            key = origin
+
+        headers = self._cache.get(key)
+        if headers is None:
+            headers = self._build(key)
+
+            if len(self._cache) >= _MAX_CACHED_ORIGINS:
+                self._cache.clear()
+            self._cache[key] = headers
+
+        return headers
+
+    def is_allowed(self, origin):
+        if self._echo_host or self._any_origin or origin in self._origins:
+            return True
+
+        if origin.endswith(self._origin_suffixes):
+            return True
+
+        return bool(self._origin_regex and self._origin_regex.fullmatch(origin))
+
+    def _build(self, origin):
+        if isinstance(origin, bytes):
+            origin = origin.decode("latin-1")
+
+        if not origin or not self.is_allowed(origin):
+            return _NOT_ALLOWED
+
+        response = [("Access-Control-Allow-Origin", origin)]
+
+        if not (self._echo_host or self._any_origin):
+            response.append(("Vary", "Origin"))
+
+        if self._expose_headers:
+            response.append(("Access-Control-Expose-Headers", self._expose_headers))
+
+        preflight = [
+            ("Access-Control-Allow-Methods", self._methods),
+            ("Access-Control-Allow-Headers", self._headers),
+            *response,
+        ]
+
+        if self._allow_credentials:
+            response.append(("Access-Control-Allow-Credentials", "true"))
+            preflight.append(("Access-Control-Allow-Credentials", "true"))
+
+        if self._max_age is not None:
+            preflight.append(("Access-Control-Max-Age", str(self._max_age)))
+
+        return CORSHeaders(response, preflight)
+
+
+def resolve(enable_cors, cors):
+    """
+    Turn the enable_cors and cors server arguments into a CORSPolicy or None.
+    """
+    if cors is not None:
+        return cors
+
+    if enable_cors:
+        # enable_cors has always allowed credentialed requests.
+        return CORSPolicy(allow_credentials=True)
+
+    return None
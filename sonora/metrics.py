@@ -0,0 +1,335 @@
+import bisect
+import threading
+import time
+
+import grpc
+
+# The Prometheus client's default latency buckets, in seconds.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Label sets are only built for routed methods, but dynamic handlers can
+# route any path so the cache is bounded.
+_MAX_CACHED_LABELS = 1024
+
+_COUNTERS = (
+    (
+        "grpc_server_msg_received_total",
+        "Total number of request messages received on the server.",
+        "messages_received",
+    ),
+    (
+        "grpc_server_msg_sent_total",
+        "Total number of response messages sent by the server.",
+        "messages_sent",
+    ),
+    (
+        "grpc_server_received_bytes_total",
+        "Total number of request body bytes received on the server.",
+        "bytes_received",
+    ),
+    (
+        "grpc_server_sent_bytes_total",
+        "Total number of response body bytes sent by the server.",
+        "bytes_sent",
+    ),
+)
+
+
+class MetricsRegistry:
+    """
+    Per-method call metrics for grpcASGI and grpcWSGI, rendered in the
+    Prometheus text format by exposition().
+
+    Each thread records into its own shard, so recording a call takes no
+    locks. The shards are only added up when the metrics are scraped.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self._buckets = tuple(sorted(buckets))
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+        self._labels = {}
+
+    def start_call(self, path, rpc_method):
+        """
+        Count a call to the method at path as started and return the _Call
+        that records the rest of it.
+        """
+        labels = self._labels.get(path)
+        if labels is None:
+            labels = _method_labels(path, rpc_method)
+
+            if len(self._labels) >= _MAX_CACHED_LABELS:
+                self._labels.clear()
+            self._labels[path] = labels
+
+        started = self._shard().started
+        started[labels] = started.get(labels, 0) + 1
+
+        return _Call(self, labels, rpc_method)
+
+    def exposition(self):
+        started = {}
+        finished = {}
+
+        for shard in list(self._shards):
+            for labels, count in list(shard.started.items()):
+                started[labels] = started.get(labels, 0) + count
+
+            for key, stats in list(shard.finished.items()):
+                merged = finished.get(key)
+                if merged is None:
+                    merged = finished[key] = _Stats(len(self._buckets))
+                merged.add(stats)
+
+        finished = sorted(finished.items())
+
+        lines = [
+            "# HELP grpc_server_started_total "
+            "Total number of RPCs started on the server.",
+            "# TYPE grpc_server_started_total counter",
+        ]
+        for labels, count in sorted(started.items()):
+            lines.append(f"grpc_server_started_total{{{labels}}} {count}")
+
+        lines += [
+            "# HELP grpc_server_handled_total "
+            "Total number of RPCs completed on the server.",
+            "# TYPE grpc_server_handled_total counter",
+        ]
+        for (labels, code), stats in finished:
+            lines.append(
+                f'grpc_server_handled_total{{{labels},grpc_code="{code}"}} '
+                f"{sum(stats.buckets)}"
+            )
+
+        lines += [
+            "# HELP grpc_server_handling_seconds "
+            "Time taken by the server to complete RPCs.",
+            "# TYPE grpc_server_handling_seconds histogram",
+        ]
+        for (labels, code), stats in finished:
+            labels = f'{labels},grpc_code="{code}"'
+            count = 0
+
+            for bound, bucket in zip(self._buckets, stats.buckets):
+                count += bucket
+                bound = float(bound)
+                lines.append(
+                    f'grpc_server_handling_seconds_bucket{{{labels},le="{bound!r}"}}'
+                    f" {count}"
+                )
+
+            count += stats.buckets[-1]
+            lines += [
+                f'grpc_server_handling_seconds_bucket{{{labels},le="+Inf"}} {count}',
+                f"grpc_server_handling_seconds_sum{{{labels}}} {stats.seconds!r}",
+                f"grpc_server_handling_seconds_count{{{labels}}} {count}",
+            ]
+
+        for name, help, attribute in _COUNTERS:
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} counter"]
+
+            for (labels, code), stats in finished:
+                lines.append(
+                    f'{name}{{{labels},grpc_code="{code}"}} '
+                    f"{getattr(stats, attribute)}"
+                )
+
+        lines.append("")
+        return "\n".join(lines)
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = _Shard()
+
+            with self._shards_lock:
+                self._shards.append(shard)
+
+            return shard
+
+    def _finish(self, labels, code, seconds, call):
+        finished = self._shard().finished
+        key = (labels, code.name)
+
+        stats = finished.get(key)
+        if stats is None:
+            stats = finished[key] = _Stats(len(self._buckets))
+
+        stats.buckets[bisect.bisect_left(self._buckets, seconds)] += 1
+        stats.seconds += seconds
+        stats.messages_received += call.handler.messages_received
+        stats.messages_sent += call.handler.messages_sent
+        stats.bytes_received += call.bytes_received
+        stats.bytes_sent += call.bytes_sent
+
+
+class _Shard:
+    __slots__ = ("started", "finished")
+
+    def __init__(self):
+        self.started = {}
+        self.finished = {}
+
+
+class _Stats:
+    __slots__ = (
+        "buckets",
+        "seconds",
+        "messages_received",
+        "messages_sent",
+        "bytes_received",
+        "bytes_sent",
+    )
+
+    def __init__(self, buckets):
+        # One count per bucket plus one for calls slower than all of them.
+        self.buckets = [0] * (buckets + 1)
+        self.seconds = 0.0
+        self.messages_received = 0
+        self.messages_sent = 0
+        self.bytes_received = 0
+        self.bytes_sent = 0
+
+    def add(self, other):
+        for i, count in enumerate(other.buckets):
+            self.buckets[i] += count
+
+        self.seconds += other.seconds
+        self.messages_received += other.messages_received
+        self.messages_sent += other.messages_sent
+        self.bytes_received += other.bytes_received
+        self.bytes_sent += other.bytes_sent
+
+
+class _Call:
+    """
+    Counts the messages and body bytes of one call until finish() adds them
+    to the registry. The server reads and writes through handler, receive
+    and send (ASGI) or count_received (WSGI) and sets context once it has
+    one.
+    """
+
+    __slots__ = (
+        "_registry",
+        "_labels",
+        "_start",
+        "_receive",
+        "_send",
+        "handler",
+        "context",
+        "bytes_received",
+        "bytes_sent",
+    )
+
+    def __init__(self, registry, labels, rpc_method):
+        self._registry = registry
+        self._labels = labels
+        self._start = time.perf_counter()
+        self._receive = None
+        self._send = None
+        self.handler = _CountingHandler(rpc_method)
+        self.context = None
+        self.bytes_received = 0
+        self.bytes_sent = 0
+
+    def wrap_asgi(self, receive, send):
+        self._receive = receive
+        self._send = send
+        return self.receive, self.send
+
+    async def receive(self):
+        event = await self._receive()
+        self.bytes_received += len(event.get("body", b""))
+        return event
+
+    async def send(self, event):
+        self.bytes_sent += len(event.get("body", b""))
+        await self._send(event)
+
+    def count_received(self, chunks):
+        for chunk in chunks:
+            self.bytes_received += len(chunk)
+            yield chunk
+
+    def finish(self, code=None):
+        if code is None:
+            if self.context is None:
+                code = grpc.StatusCode.UNKNOWN
+            else:
+                code = self.context.code
+
+        self._registry._finish(
+            self._labels, code, time.perf_counter() - self._start, self
+        )
+
+
+class _CountingHandler:
+    """
+    Stands in for an RpcMethodHandler, counting the messages that pass
+    through its (de)serializer.
+    """
+
+    __slots__ = (
+        "request_streaming",
+        "response_streaming",
+        "unary_unary",
+        "unary_stream",
+        "stream_unary",
+        "stream_stream",
+        "messages_received",
+        "messages_sent",
+        "_request_deserializer",
+        "_response_serializer",
+    )
+
+    def __init__(self, rpc_method):
+        self.request_streaming = rpc_method.request_streaming
+        self.response_streaming = rpc_method.response_streaming
+        self.unary_unary = rpc_method.unary_unary
+        self.unary_stream = rpc_method.unary_stream
+        self.stream_unary = rpc_method.stream_unary
+        self.stream_stream = rpc_method.stream_stream
+        self.messages_received = 0
+        self.messages_sent = 0
+        self._request_deserializer = rpc_method.request_deserializer or _identity
+        self._response_serializer = rpc_method.response_serializer or _identity
+
+    def request_deserializer(self, data):
+        self.messages_received += 1
+        return self._request_deserializer(data)
+
+    def response_serializer(self, message):
+        self.messages_sent += 1
+        return self._response_serializer(message)
+
+
+def _identity(value):
+    return value
+
+
+def _method_labels(path, rpc_method):
+    service, _, method = path[1:].rpartition("/")
+
+    if rpc_method.request_streaming and rpc_method.response_streaming:
+        grpc_type = "bidi_stream"
+    elif rpc_method.request_streaming:
+        grpc_type = "client_stream"
+    elif rpc_method.response_streaming:
+        grpc_type = "server_stream"
+    else:
+        grpc_type = "unary"
+
+    return (
+        f'grpc_type="{grpc_type}",grpc_service="{_escape(service)}",'
+        f'grpc_method="{_escape(method)}"'
+    )
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
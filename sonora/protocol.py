@@ -1,13 +1,19 @@
 import base64
-import functools
+import binascii
+import re
 import struct
-from urllib.parse import unquote
+from typing import Dict, Union
+from urllib.parse import quote, unquote
 
 import grpc
 
-
 _HEADER_FORMAT = ">BI"
 _HEADER_LENGTH = struct.calcsize(_HEADER_FORMAT)
+_HEADER = struct.Struct(_HEADER_FORMAT)
+
+# Frames at least this large are read into a buffer allocated up front from
+# their declared length rather than accumulated and copied out afterwards.
+_PREALLOCATE_THRESHOLD = 64 * 1024
 
 
 def _pack_header_flags(trailers, compressed):
@@ -50,6 +56,26 @@ def b64_unwrap_message(message):
     return unwrap_message(base64.b64decode(message))
 
 
+def _read_exactly(stream, length):
+    if length < _PREALLOCATE_THRESHOLD or not hasattr(stream, "readinto"):
+        data = stream.read(length)
+        if len(data) != length:
+            raise ValueError("truncated gRPC-Web frame")
+        return data
+
+    data = bytearray(length)
+    view = memoryview(data)
+    filled = 0
+
+    while filled < length:
+        count = stream.readinto(view[filled:])
+        if not count:
+            raise ValueError("truncated gRPC-Web frame")
+        filled += count
+
+    return bytes(data)
+
+
 def unwrap_message_stream(stream):
     data = stream.read(_HEADER_LENGTH)
 
@@ -57,7 +83,7 @@ def unwrap_message_stream(stream):
         flags, length = struct.unpack(_HEADER_FORMAT, data)
         trailers, compressed = _unpack_header_flags(flags)
 
-        yield trailers, compressed, stream.read(length)
+        yield trailers, compressed, _read_exactly(stream, length)
 
         if trailers:
             break
@@ -80,55 +106,294 @@ async def unwrap_message_stream_async(stream):
         data = await stream.readexactly(_HEADER_LENGTH)
 
 
-async def unwrap_message_asgi(receive, decoder=None):
-    buffer = bytearray()
-    waiting = False
-    flags = None
-    length = None
+class FrameDecoder:
+    """
+    Incrementally splits a byte stream into gRPC-Web frames.
+
+    Frames are sliced straight out of the data passed to feed() where
+    possible. Only an incomplete trailing frame is kept in a buffer, which
+    is consumed by moving a cursor forward and is compacted once the
+    consumed prefix makes up most of it. Large frames are copied into a
+    buffer of their declared size as their data arrives.
+
+    If max_length is given, a frame declaring a longer message raises
+    MessageTooLargeError before any of its data is buffered.
+    """
+
+    def __init__(self, max_length=None):
+        self._max_length = max_length
+
+        self._buffer = bytearray()
+        self._offset = 0
+
+        self._frame = None
+        self._frame_flags = 0
+        self._frame_filled = 0
+        self._complete_frame = None
+
+    def feed(self, data):
+        """
+        Add data to the decoder and return a list of every frame it completed
+        as (trailers, compressed, message) tuples.
+        """
+        frames = []
+
+        with memoryview(data) as view:
+            if self._frame is not None:
+                view = self._fill_frame(view)
+
+                if self._frame is not None:
+                    return frames
+
+                frames.append(self._complete_frame)
+
+            if len(self._buffer) > self._offset:
+                self._buffer += view
+                self._decode(self._buffer, frames)
+            else:
+                self._buffer.clear()
+                self._offset = 0
+                self._decode(view, frames)
+
+        return frames
+
+    def _decode(self, data, frames):
+        buffered = data is self._buffer
+        offset = self._offset if buffered else 0
+        end = len(data)
+
+        unpack_from = _HEADER.unpack_from
+        append = frames.append
+        max_length = self._max_length
+
+        with memoryview(data) as view:
+            while end - offset >= _HEADER_LENGTH:
+                flags, length = unpack_from(view, offset)
+                start = offset + _HEADER_LENGTH
+
+                if max_length is not None and length > max_length:
+                    raise MessageTooLargeError(length, max_length)
+
+                if end - start < length:
+                    if length >= _PREALLOCATE_THRESHOLD:
+                        self._frame = bytearray(length)
+                        self._frame_flags = flags
+                        self._frame_filled = end - start
+                        self._frame[: end - start] = view[start:end]
+                        offset = end
+                    break
+
+                offset = start + length
+                append(
+                    (bool(flags & 0x80), bool(flags & 1), view[start:offset].tobytes())
+                )
+
+            if not buffered:
+                self._buffer += view[offset:]
+                return
+
+        if offset == end:
+            data.clear()
+            offset = 0
+        elif offset > end // 2:
+            del data[:offset]
+            offset = 0
+
+        self._offset = offset
+
+    def _fill_frame(self, view):
+        filled = self._frame_filled
+        count = min(len(view), len(self._frame) - filled)
+
+        self._frame[filled : filled + count] = view[:count]
+        self._frame_filled = filled + count
+
+        if self._frame_filled == len(self._frame):
+            trailers, compressed = _unpack_header_flags(self._frame_flags)
+            self._complete_frame = (trailers, compressed, bytes(self._frame))
+            self._frame = None
+
+        return view[count:]
+
+    def pending(self):
+        """
+        Return True if the decoder holds part of an incomplete frame.
+        """
+        return self._frame is not None or len(self._buffer) > self._offset
+
+
+async def unwrap_message_asgi(receive, decoder=None, max_length=None):
+    frames = FrameDecoder(max_length)
 
     while True:
         event = await receive()
         assert event["type"].startswith("http.")
 
+        if event["type"] == "http.disconnect":
+            raise DisconnectedError()
+
         if decoder:
-            chunk = decoder(event["body"])
+            chunk = decoder(event.get("body", b""))
         else:
-            chunk = event["body"]
+            chunk = event.get("body", b"")
 
-        buffer += chunk
+        for frame in frames.feed(chunk):
+            yield frame
 
-        if len(buffer) >= _HEADER_LENGTH:
-            if not waiting:
-                flags, length = struct.unpack(_HEADER_FORMAT, buffer[:_HEADER_LENGTH])
+        if not event.get("more_body"):
+            break
 
-            if len(buffer) >= _HEADER_LENGTH + length:
-                waiting = False
-                data = buffer[_HEADER_LENGTH : _HEADER_LENGTH + length]
-                trailers, compressed = _unpack_header_flags(flags)
+    if frames.pending():
+        raise IncompleteMessageError()
 
-                yield trailers, compressed, data
-                buffer = buffer[_HEADER_LENGTH + length :]
-            else:
-                waiting = True
 
-        if not event.get("more_body"):
-            break
+class Base64Decoder:
+    """
+    Incrementally decodes a grpc-web-text body.
+
+    Each frame in the body may have been base64 encoded and padded on its
+    own, so padding can appear in the middle of the stream. Data is decoded
+    up to the last complete 4 character quantum, splitting at every padded
+    quantum, and the remainder is carried over to the next call.
+    """
+
+    def __init__(self):
+        self._pending = b""
+
+    def decode(self, data):
+        if self._pending:
+            data = self._pending + data
+
+        start = 0
+        end = len(data)
+        decoded = []
+
+        pad = data.find(b"=")
+
+        while pad != -1:
+            quantum_end = pad + 4 - (pad - start) % 4
+
+            if quantum_end > end:
+                break
+
+            decoded.append(binascii.a2b_base64(data[start:quantum_end]))
+            start = quantum_end
+            pad = data.find(b"=", start)
+
+        aligned = start + (end - start) // 4 * 4
+
+        if aligned > start:
+            decoded.append(binascii.a2b_base64(data[start:aligned]))
+
+        self._pending = data[aligned:]
+
+        if len(decoded) == 1:
+            return decoded[0]
+
+        return b"".join(decoded)
 
+    def pending(self):
+        """
+        Return True if part of a base64 quantum is waiting for more data.
+        """
+        return bool(self._pending)
 
-b64_unwrap_message_asgi = functools.partial(
-    unwrap_message_asgi, decoder=base64.b64decode
-)
+
+async def b64_unwrap_message_asgi(receive, max_length=None):
+    decoder = Base64Decoder()
+
+    async for frame in unwrap_message_asgi(
+        receive, decoder=decoder.decode, max_length=max_length
+    ):
+        yield frame
+
+    if decoder.pending():
+        raise IncompleteMessageError()
+
+
+def unwrap_message_wsgi(chunks, decoder=None, max_length=None):
+    frames = FrameDecoder(max_length)
+
+    for chunk in chunks:
+        if decoder:
+            chunk = decoder(chunk)
+
+        yield from frames.feed(chunk)
+
+    if frames.pending():
+        raise IncompleteMessageError()
+
+
+def b64_unwrap_message_wsgi(chunks, max_length=None):
+    decoder = Base64Decoder()
+
+    yield from unwrap_message_wsgi(
+        chunks, decoder=decoder.decode, max_length=max_length
+    )
+
+    if decoder.pending():
+        raise IncompleteMessageError()
+
+
+_trailer_name_re = re.compile(rb"[0-9a-z_.-]+\Z")
+
+# Servers send the same few metadata keys over and over, so each key is
+# validated and encoded once.
+_trailer_names: Dict[Union[str, bytes], bytes] = {}
+_MAX_TRAILER_NAMES = 1024
+
+
+def _trailer_name(key):
+    name = key.encode("ascii") if isinstance(key, str) else key
+    name = name.lower()
+
+    if not _trailer_name_re.match(name):
+        raise ValueError(f"invalid metadata key: {key!r}")
+
+    if len(_trailer_names) >= _MAX_TRAILER_NAMES:
+        _trailer_names.clear()
+
+    _trailer_names[key] = name
+    return name
 
 
 def pack_trailers(trailers):
+    """
+    Pack (key, value) pairs into the body of a trailers frame. Keys and values
+    may be str or bytes, binary values are base64 encoded.
+    """
     message = []
     for k, v in trailers:
-        k = k.lower()
-        message.append(f"{k}: {v}\r\n".encode("ascii"))
-    return b"".join(message)
+        name = _trailer_names.get(k)
+        if name is None:
+            name = _trailer_name(k)
+
+        if isinstance(v, str):
+            v = v.encode("ascii")
+        elif isinstance(v, bytes):
+            if not name.endswith(b"-bin"):
+                raise ValueError("binary headers must have the '-bin' suffix")
+
+            v = base64.b64encode(v)
+        else:
+            v = str(v).encode("ascii")
+
+        message.append(b"%s: %s\r\n" % (name, v))
+
+    count = len(message)
+    message = b"".join(message)
+
+    if message.count(b"\n") != count or message.count(b"\r") != count:
+        raise ValueError("metadata values must not contain line breaks")
+
+    return message
 
 
 def unpack_trailers(message):
+    trailers = _status_only_trailers.get(message)
+    if trailers is not None:
+        return list(trailers)
+
     trailers = []
     for line in message.decode("ascii").splitlines():
         k, v = line.split(":", 1)
@@ -138,6 +403,53 @@ def unpack_trailers(message):
     return trailers
 
 
+_status_trailers = {
+    code: b"grpc-status: %d\r\n" % code.value[0]  # type: ignore
+    for code in grpc.StatusCode
+}
+
+_status_only_trailers = {
+    trailers: (("grpc-status", str(code.value[0])),)  # type: ignore
+    for code, trailers in _status_trailers.items()
+}
+
+# Almost every response ends with nothing but a grpc-status trailer, so those
+# frames are built once per status code for each way of wrapping them.
+_status_frames = {
+    wrap: {
+        code: wrap(True, False, trailers) for code, trailers in _status_trailers.items()
+    }
+    for wrap in (wrap_message, b64_wrap_message)
+}
+
+
+def pack_status_frame(wrap, code, details=None, trailing_metadata=None):
+    """
+    Return the trailers frame that ends a response with the given status,
+    wrapped with wrap. Frames that carry only the status are prebuilt.
+    trailing_metadata may be (key, value) pairs or already packed bytes.
+    """
+    if not details and not trailing_metadata:
+        frames = _status_frames.get(wrap)
+
+        if frames is not None:
+            return frames[code]
+
+    trailers = _status_trailers[code]
+
+    if details:
+        message = quote(details.encode("utf8")).encode("ascii")
+        trailers += b"grpc-message: %s\r\n" % message
+
+    if trailing_metadata:
+        if not isinstance(trailing_metadata, bytes):
+            trailing_metadata = pack_trailers(trailing_metadata)
+
+        trailers += trailing_metadata
+
+    return wrap(True, False, trailers)
+
+
 def encode_headers(metadata):
     for header, value in metadata:
         if isinstance(value, bytes):
@@ -152,6 +464,26 @@ def encode_headers(metadata):
         yield header, value
 
 
+class MessageTooLargeError(ValueError):
+    def __init__(self, length, max_length):
+        super().__init__(
+            f"Received message larger than max ({length} vs. {max_length})"
+        )
+
+        self.length = length
+        self.max_length = max_length
+
+
+class IncompleteMessageError(ValueError):
+    def __init__(self, message="Incomplete message"):
+        super().__init__(message)
+
+
+class DisconnectedError(ConnectionError):
+    def __init__(self, message="Client disconnected"):
+        super().__init__(message)
+
+
 class WebRpcError(grpc.RpcError):
     _code_to_enum = {code.value[0]: code for code in grpc.StatusCode}  # type: ignore
 
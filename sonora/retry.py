@@ -0,0 +1,199 @@
+from collections import namedtuple
+import json
+import random
+import threading
+
+import grpc
+
+# gRPC never makes more attempts than this, whatever the service config asks.
+MAX_ATTEMPTS = 5
+
+_CODES_BY_VALUE = {code.value[0]: code for code in grpc.StatusCode}  # type: ignore
+
+MethodConfig = namedtuple("MethodConfig", ("timeout", "retry_policy", "hedging_policy"))
+
+
+class ServiceConfig:
+    """
+    The per-method timeouts, retry and hedging policies and the retry
+    throttle from a gRPC service config, given as JSON or as the decoded
+    dict.
+
+    Methods are matched the way gRPC does: a name with a service and method
+    first, then one with just the service, then an empty name as the
+    default for every method.
+    """
+
+    def __init__(self, config):
+        if isinstance(config, (str, bytes)):
+            config = json.loads(config)
+
+        self._methods = {}
+
+        for method_config in config.get("methodConfig", ()):
+            parsed = _method_config(method_config)
+
+            for name in method_config.get("name", ()):
+                key = (name.get("service") or None, name.get("method") or None)
+
+                if key[0] is None and key[1] is not None:
+                    raise ValueError(f"method name without a service: {name!r}")
+                if key in self._methods:
+                    raise ValueError(f"duplicate method config name: {name!r}")
+
+                self._methods[key] = parsed
+
+        throttling = config.get("retryThrottling")
+        if throttling is None:
+            self.throttle = None
+        else:
+            self.throttle = RetryThrottle(
+                throttling["maxTokens"], throttling["tokenRatio"]
+            )
+
+    def method_config(self, path):
+        """
+        Return the MethodConfig for the method at path, or None if the
+        service config doesn't cover it.
+        """
+        service, _, method = path[1:].rpartition("/")
+
+        for key in ((service, method), (service, None), (None, None)):
+            method_config = self._methods.get(key)
+            if method_config is not None:
+                return method_config
+
+        return None
+
+
+class RetryPolicy:
+    """
+    Retry calls that fail with one of retryable_status_codes, up to
+    max_attempts attempts in all. Before each retry the call waits for a
+    random time between zero and the current backoff, which starts at
+    initial_backoff and grows by backoff_multiplier up to max_backoff.
+    """
+
+    def __init__(
+        self,
+        max_attempts,
+        initial_backoff,
+        max_backoff,
+        backoff_multiplier,
+        retryable_status_codes,
+    ):
+        if max_attempts < 2:
+            raise ValueError("retry policies need at least 2 attempts")
+        if initial_backoff <= 0 or max_backoff <= 0 or backoff_multiplier <= 0:
+            raise ValueError("retry backoff must be positive")
+        if not retryable_status_codes:
+            raise ValueError("retry policies need retryable status codes")
+
+        self.max_attempts = min(max_attempts, MAX_ATTEMPTS)
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.backoff_multiplier = backoff_multiplier
+        self.retryable_status_codes = frozenset(retryable_status_codes)
+
+    def backoff(self, attempt):
+        """
+        The time to wait before the retry that follows the given attempt,
+        counting from 1.
+        """
+        backoff = self.initial_backoff * self.backoff_multiplier ** (attempt - 1)
+        return random.uniform(0, min(backoff, self.max_backoff))
+
+
+class HedgingPolicy:
+    """
+    Send up to max_attempts copies of a call, a new one every hedging_delay
+    seconds until one of them succeeds or fails with a status that isn't in
+    non_fatal_status_codes. A copy failing with a non-fatal status starts
+    the next one straight away.
+    """
+
+    def __init__(self, max_attempts, hedging_delay=0, non_fatal_status_codes=()):
+        if max_attempts < 2:
+            raise ValueError("hedging policies need at least 2 attempts")
+        if hedging_delay < 0:
+            raise ValueError("the hedging delay can't be negative")
+
+        self.max_attempts = min(max_attempts, MAX_ATTEMPTS)
+        self.hedging_delay = hedging_delay
+        self.non_fatal_status_codes = frozenset(non_fatal_status_codes)
+
+
+class RetryThrottle:
+    """
+    A token bucket shared by the calls of a channel. Failed attempts take a
+    token and successful calls return token_ratio of one. Calls are only
+    retried or hedged while more than half of max_tokens are left, so
+    retries stop once the server is mostly failing instead of adding to
+    its load.
+    """
+
+    def __init__(self, max_tokens, token_ratio):
+        if max_tokens <= 0 or token_ratio <= 0:
+            raise ValueError("retry throttling needs positive tokens and ratio")
+
+        self.max_tokens = max_tokens
+        self.token_ratio = token_ratio
+        self.tokens = max_tokens
+
+        self._lock = threading.Lock()
+
+    def allows_retry(self):
+        return self.tokens > self.max_tokens / 2
+
+    def record_success(self):
+        with self._lock:
+            self.tokens = min(self.tokens + self.token_ratio, self.max_tokens)
+
+    def record_failure(self):
+        with self._lock:
+            self.tokens = max(self.tokens - 1, 0)
+
+
+def _method_config(method_config):
+    retry = method_config.get("retryPolicy")
+    hedging = method_config.get("hedgingPolicy")
+
+    if retry is not None and hedging is not None:
+        raise ValueError("a method can't have both a retry and a hedging policy")
+
+    if retry is not None:
+        retry = RetryPolicy(
+            retry["maxAttempts"],
+            _duration(retry["initialBackoff"]),
+            _duration(retry["maxBackoff"]),
+            retry["backoffMultiplier"],
+            [_status_code(code) for code in retry["retryableStatusCodes"]],
+        )
+
+    if hedging is not None:
+        hedging = HedgingPolicy(
+            hedging["maxAttempts"],
+            _duration(hedging.get("hedgingDelay", "0s")),
+            [_status_code(code) for code in hedging.get("nonFatalStatusCodes", ())],
+        )
+
+    timeout = method_config.get("timeout")
+    if timeout is not None:
+        timeout = _duration(timeout)
+
+    return MethodConfig(timeout, retry, hedging)
+
+
+def _duration(value):
+    # Durations are encoded as in protobuf's JSON mapping, e.g. "1.5s".
+    if not isinstance(value, str) or not value.endswith("s"):
+        raise ValueError(f"invalid duration: {value!r}")
+
+    return float(value[:-1])
+
+
+def _status_code(value):
+    if isinstance(value, int):
+        return _CODES_BY_VALUE[value]
+
+    return grpc.StatusCode[value.upper()]
@@ -0,0 +1,175 @@
+from collections import namedtuple
+
+_HandlerCallDetails = namedtuple(
+    "_HandlerCallDetails", ("method", "invocation_metadata")
+)
+
+_MISSING = object()
+
+
+class RpcRouter:
+    """
+    Maps request paths to RpcMethodHandlers.
+
+    Handlers created by grpc.method_handlers_generic_handler (which is what the
+    generated add_*Servicer_to_server functions use) and handlers added via
+    add_registered_method_handlers expose their full method table, so we copy
+    them into a single path -> handler dict when they are registered.
+
+    Any other GenericRpcHandler can only be asked one path at a time so we
+    fall back to scanning those in registration order and remember the result.
+
+    Server interceptors run through intercept or intercept_async. By
+    default they run once per path, with an empty invocation_metadata, and
+    the handler they build is reused for the later calls. With
+    intercept_per_method=False they run for every call instead and see the
+    invocation_metadata of the call, the way grpc's server runs them.
+    """
+
+    def __init__(self, cache_size=1024, interceptors=None, intercept_per_method=True):
+        self._registered = {}
+        self._routes = {}
+        self._dynamic = []
+        self._cache = {}
+        self._cache_size = cache_size
+        self._interceptors = tuple(interceptors or ())
+        self._intercept_per_method = intercept_per_method
+        self._intercepted = {}
+        self.intercepts_calls = bool(self._interceptors)
+        self.intercepts_each_call = self.intercepts_calls and not intercept_per_method
+
+    def add_generic_rpc_handlers(self, handlers):
+        for handler in handlers:
+            method_handlers = getattr(handler, "_method_handlers", None)
+
+            # Once a dynamic handler has been added it has to keep precedence
+            # over anything registered after it, so those go in the scan too.
+            if isinstance(method_handlers, dict) and not self._dynamic:
+                for path, method_handler in method_handlers.items():
+                    self._routes.setdefault(path, method_handler)
+            else:
+                self._dynamic.append(handler)
+
+        self._cache.clear()
+        self._intercepted.clear()
+
+    def add_registered_method_handlers(self, service_name, method_handlers):
+        for method, method_handler in method_handlers.items():
+            self._registered[f"/{service_name}/{method}"] = method_handler
+
+        self._cache.clear()
+        self._intercepted.clear()
+
+    def get(self, path):
+        rpc_handler = self._registered.get(path) or self._routes.get(path)
+
+        if rpc_handler is not None or not self._dynamic:
+            return rpc_handler
+
+        rpc_handler = self._cache.get(path, _MISSING)
+
+        if rpc_handler is _MISSING:
+            rpc_handler = self._scan(path)
+            _remember(self._cache, self._cache_size, path, rpc_handler)
+
+        return rpc_handler
+
+    def _scan(self, path):
+        handler_call_details = _HandlerCallDetails(path, None)
+
+        for handler in self._dynamic:
+            rpc_handler = handler.service(handler_call_details)
+            if rpc_handler:
+                return rpc_handler
+
+        return None
+
+    def intercept(self, path, rpc_handler, invocation_metadata):
+        """
+        Run grpc.ServerInterceptors for a call to path. invocation_metadata
+        is called for the metadata of the call if the interceptors see it.
+        Returns the handler for the call, or None if an interceptor turned
+        it down.
+        """
+        if not self._intercept_per_method:
+            return _apply_interceptors(
+                self._interceptors,
+                _HandlerCallDetails(path, invocation_metadata()),
+                rpc_handler,
+            )
+
+        intercepted = self._intercepted.get(path, _MISSING)
+
+        if intercepted is _MISSING:
+            intercepted = _apply_interceptors(
+                self._interceptors, _HandlerCallDetails(path, ()), rpc_handler
+            )
+            _remember(self._intercepted, self._cache_size, path, intercepted)
+
+        return intercepted
+
+    async def intercept_async(self, path, rpc_handler, invocation_metadata):
+        """
+        Like intercept, for grpc.aio.ServerInterceptors.
+        """
+        if not self._intercept_per_method:
+            return await _apply_async_interceptors(
+                self._interceptors,
+                _HandlerCallDetails(path, invocation_metadata()),
+                rpc_handler,
+            )
+
+        intercepted = self._intercepted.get(path, _MISSING)
+
+        if intercepted is _MISSING:
+            intercepted = await _apply_async_interceptors(
+                self._interceptors, _HandlerCallDetails(path, ()), rpc_handler
+            )
+            _remember(self._intercepted, self._cache_size, path, intercepted)
+
+        return intercepted
+
+
+def _remember(cache, cache_size, path, rpc_handler):
+    if len(cache) >= cache_size:
+        cache.clear()
+
+    cache[path] = rpc_handler
+
+
+def _apply_interceptors(interceptors, handler_call_details, rpc_handler):
+    """
+    Run handler_call_details through the interceptors, the first one
+    outermost, the way grpc's server does for every call.
+    """
+    interceptor, *rest = interceptors
+
+    if rest:
+
+        def continuation(handler_call_details):
+            return _apply_interceptors(rest, handler_call_details, rpc_handler)
+
+    else:
+
+        def continuation(handler_call_details):
+            return rpc_handler
+
+    return interceptor.intercept_service(continuation, handler_call_details)
+
+
+async def _apply_async_interceptors(interceptors, handler_call_details, rpc_handler):
+    """
+    Like _apply_interceptors, the continuation grpc.aio interceptors get is
+    a coroutine.
+    """
+    interceptor, *rest = interceptors
+
+    async def continuation(handler_call_details):
+        if rest:
+            return await _apply_async_interceptors(
+                rest, handler_call_details, rpc_handler
+            )
+
+        return rpc_handler
+
+    return await interceptor.intercept_service(continuation, handler_call_details)
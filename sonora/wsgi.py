@@ -1,16 +1,35 @@
 import base64
-from collections import namedtuple
+import concurrent.futures
+import contextvars
+import functools
+import itertools
+import queue
+import threading
 import time
-from urllib.parse import quote
+from typing import Dict
 
 import grpc
 
 from sonora import protocol
+import sonora.compression
+import sonora.cors
+import sonora.metrics
+from sonora.routing import RpcRouter
 
+# The most we read from wsgi.input in one go when streaming a request body.
+_READ_SIZE = 64 * 1024
 
-_HandlerCallDetails = namedtuple(
-    "_HandlerCallDetails", ("method", "invocation_metadata")
-)
+# Metadata keys translated from environ names, the same few headers arrive on
+# every request. Clients can send any header so the cache is bounded.
+_metadata_keys: Dict[str, str] = {}
+_MAX_METADATA_KEYS = 1024
+
+# How many messages the handler of a coalesced stream can get ahead of the
+# writes before it has to wait.
+_COALESCE_BUFFER = 16
+
+# Marks the end of a coalesced stream's messages.
+_END_OF_STREAM = object()
 
 
 class grpcWSGI(grpc.Server):
@@ -19,15 +38,55 @@ class grpcWSGI(grpc.Server):
 
     This is called by the WSGI server that's handling our actual HTTP
     connections. That means we can't use the normal gRPC I/O loop etc.
+
+    Handlers run on the WSGI server's thread unless an executor is passed,
+    so without one a unary call that overruns its deadline is only answered
+    once its handler returns. With an executor, unary handlers called with a
+    deadline run on it and the call is answered with DEADLINE_EXCEEDED as
+    soon as the deadline passes. Coalescing streaming responses needs the
+    executor too.
     """
 
-    def __init__(self, application=None, enable_cors=True):
+    def __init__(
+        self,
+        application=None,
+        enable_cors=True,
+        compression=None,
+        compression_threshold=sonora.compression.DEFAULT_THRESHOLD,
+        coalesce=False,
+        coalesce_max_bytes=64 * 1024,
+        coalesce_max_delay=0.005,
+        max_receive_message_length=4 * 1024 * 1024,
+        cors=None,
+        executor=None,
+        metrics=None,
+        metrics_path="/metrics",
+        interceptors=None,
+        intercept_per_method=True,
+    ):
+        if coalesce and executor is None:
+            raise ValueError("coalesce=True requires an executor")
+
         self._application = application
-        self._handlers = []
-        self._enable_cors = enable_cors
+        self._router = RpcRouter(
+            interceptors=interceptors, intercept_per_method=intercept_per_method
+        )
+        self._cors = sonora.cors.resolve(enable_cors, cors)
+        self._compression = sonora.compression.resolve(compression)
+        self._compression_threshold = compression_threshold
+        self._coalesce = coalesce
+        self._coalesce_max_bytes = coalesce_max_bytes
+        self._coalesce_max_delay = coalesce_max_delay
+        self._max_receive_message_length = max_receive_message_length
+        self._executor = executor
+        self._metrics = metrics
+        self._metrics_path = metrics_path if metrics is not None else None
 
     def add_generic_rpc_handlers(self, handlers):
-        self._handlers.extend(handlers)
+        self._router.add_generic_rpc_handlers(handlers)
+
+    def add_registered_method_handlers(self, service_name, method_handlers):
+        self._router.add_registered_method_handlers(service_name, method_handlers)
 
     def add_insecure_port(self, port):
         raise NotImplementedError()
@@ -42,64 +101,115 @@ class grpcWSGI(grpc.Server):
         raise NotImplementedError()
 
     def _get_rpc_handler(self, environ):
-        path = environ["PATH_INFO"]
-
-        handler_call_details = _HandlerCallDetails(path, None)
-
-        rpc_handler = None
-        for handler in self._handlers:
-            rpc_handler = handler.service(handler_call_details)
-            if rpc_handler:
-                return rpc_handler
-
-        return None
+        return self._router.get(environ["PATH_INFO"])
 
     def _create_context(self, environ):
-        try:
-            timeout = protocol.parse_timeout(environ["HTTP_GRPC_TIMEOUT"])
-        except KeyError:
-            timeout = None
+        timeout = environ.get("HTTP_GRPC_TIMEOUT")
+        malformed_timeout = False
 
-        metadata = []
-        for key, value in environ.items():
-            if key.startswith("HTTP_"):
-                header = key[5:].lower().replace("_", "-")
+        if timeout is not None:
+            try:
+                timeout = protocol.parse_timeout(timeout.encode("ascii"))
+            except (KeyError, ValueError):
+                timeout = None
+                malformed_timeout = True
+
+        context = ServicerContext(
+            timeout,
+            environ=environ,
+            compression=self._compression,
+            request_encoding=environ.get("HTTP_GRPC_ENCODING"),
+            accept_encoding=environ.get("HTTP_GRPC_ACCEPT_ENCODING"),
+        )
 
-                if header.endswith("-bin"):
-                    value = base64.b64decode(value)
+        if malformed_timeout:
+            context.code = grpc.StatusCode.INTERNAL
+            context.details = "Malformed grpc-timeout header"
 
-                metadata.append((header, value))
+        return context
 
-        return ServicerContext(timeout, metadata)
+    def _do_grpc_request(self, rpc_method, context, environ, start_response, call=None):
+        if call is not None:
+            call.context = context
 
-    def _do_grpc_request(self, rpc_method, environ, start_response):
-        request_data = self._read_request(environ)
+        resp = None
 
-        context = self._create_context(environ)
+        try:
+            if context.code is not grpc.StatusCode.OK:
+                raise grpc.RpcError()
 
-        if environ["CONTENT_TYPE"] == "application/grpc-web-text":
-            _, _, message = protocol.b64_unwrap_message(request_data)
-        else:
-            _, _, message = protocol.unwrap_message(request_data)
+            if not context.is_active():
+                _deadline_exceeded(context)
 
-        request_proto = rpc_method.request_deserializer(message)
+            messages = self._read_messages(environ, context, call)
 
-        resp = None
+            if context._deadline is not None:
+                messages = _timeout_generator(context, messages)
+
+            if rpc_method.request_streaming:
+                request_proto_iterator = (
+                    rpc_method.request_deserializer(message) for message in messages
+                )
+            else:
+                request_proto = rpc_method.request_deserializer(next(messages, b""))
 
-        try:
             if not rpc_method.request_streaming and not rpc_method.response_streaming:
-                resp = rpc_method.unary_unary(request_proto, context)
+                if context._deadline is not None and self._executor is not None:
+                    resp = self._run_with_deadline(
+                        rpc_method.unary_unary, request_proto, context
+                    )
+                else:
+                    resp = rpc_method.unary_unary(request_proto, context)
             elif not rpc_method.request_streaming and rpc_method.response_streaming:
                 resp = rpc_method.unary_stream(request_proto, context)
-                if context.time_remaining() is not None:
-                    resp = _timeout_generator(context, resp)
+            elif rpc_method.request_streaming and not rpc_method.response_streaming:
+                resp = rpc_method.stream_unary(request_proto_iterator, context)
             else:
-                raise NotImplementedError()
+                resp = rpc_method.stream_stream(request_proto_iterator, context)
+
+            if context._deadline is not None:
+                if rpc_method.response_streaming:
+                    resp = _timeout_generator(context, resp)
+                elif not context.is_active():
+                    # Nothing the handler set after its deadline is sent.
+                    context._trailing_metadata = None
+                    _deadline_exceeded(context)
         except grpc.RpcError:
-            pass
+            resp = None
         except NotImplementedError:
             context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        except _HandlerOverran:
+            # The handler is still running and owns its context, answer from
+            # a fresh one.
+            context = ServicerContext()
+            context.code = grpc.StatusCode.DEADLINE_EXCEEDED
+            context.details = "request timed out at the server"
+            resp = None
+
+            if call is not None:
+                call.context = context
+
+        headers, wrap_message = self._response_format(environ)
 
+        if context._unsupported_encoding:
+            headers.append(
+                ("grpc-accept-encoding", sonora.compression.accept_encoding())
+            )
+
+        if rpc_method.response_streaming and resp is not None:
+            yield from self._do_streaming_response(
+                rpc_method, start_response, wrap_message, context, headers, resp
+            )
+
+        else:
+            yield from self._do_unary_response(
+                rpc_method, start_response, wrap_message, context, headers, resp
+            )
+
+    def _response_format(self, environ):
+        """
+        The response headers and the message framing the request asked for.
+        """
         response_content_type = (
             environ.get("HTTP_ACCEPT", "application/grpc-web+proto")
             .split(",")[0]
@@ -109,29 +219,81 @@ class grpcWSGI(grpc.Server):
         headers = [
             ("Content-Type", response_content_type),
         ]
-        if self._enable_cors:
-            headers.append(
-                (
-                    "Access-Control-Allow-Origin",
-                    environ.get("HTTP_HOST") or environ["SERVER_NAME"],
-                ),
-            )
-            headers.append(("Access-Control-Expose-Headers", "*"))
+        if self._cors is not None:
+            headers += self._match_cors(environ).wsgi_response
 
         if response_content_type == "application/grpc-web-text":
             wrap_message = protocol.b64_wrap_message
         else:
             wrap_message = protocol.wrap_message
 
-        if rpc_method.response_streaming:
-            yield from self._do_streaming_response(
-                rpc_method, start_response, wrap_message, context, headers, resp
-            )
+        return headers, wrap_message
 
-        else:
-            yield from self._do_unary_response(
-                rpc_method, start_response, wrap_message, context, headers, resp
-            )
+    def _do_unimplemented(self, context, environ, start_response):
+        context.code = grpc.StatusCode.UNIMPLEMENTED
+        context.details = "Method not found!"
+        headers, wrap_message = self._response_format(environ)
+
+        return self._do_unary_response(
+            None, start_response, wrap_message, context, headers, None
+        )
+
+    def _do_instrumented_request(self, rpc_method, context, environ, start_response):
+        """
+        Run the request with its messages, body bytes and latency recorded in
+        the metrics registry.
+        """
+        call = self._metrics.start_call(environ["PATH_INFO"], rpc_method)
+        code = None
+
+        try:
+            for data in self._do_grpc_request(
+                call.handler, context, environ, start_response, call
+            ):
+                call.bytes_sent += len(data)
+                yield data
+        except GeneratorExit:
+            code = grpc.StatusCode.CANCELLED
+            raise
+        except Exception:
+            code = grpc.StatusCode.UNKNOWN
+            raise
+        finally:
+            call.finish(code)
+
+    def _do_metrics(self, start_response):
+        body = self._metrics.exposition().encode("utf-8")
+
+        start_response(
+            "200 OK",
+            [
+                ("Content-Type", sonora.metrics.CONTENT_TYPE),
+                ("Content-Length", str(len(body))),
+            ],
+        )
+        return [body]
+
+    def _run_with_deadline(self, method, request, context):
+        """
+        Run a unary handler on the executor passed to grpcWSGI and wait for
+        it until the deadline, raising _HandlerOverran if it overruns.
+        An overrunning handler can't be stopped, it carries on in the
+        background until it notices that context.is_active() is false, but
+        the worker serving the request is free to answer straight away.
+        Without an executor handlers run on the server's own thread and an
+        overrunning one is answered once it returns.
+        """
+        future = self._executor.submit(
+            contextvars.copy_context().run, _call_if_active, method, request, context
+        )
+
+        try:
+            return future.result(context.time_remaining())
+        except concurrent.futures.TimeoutError:
+            if future.done():
+                raise
+
+            raise _HandlerOverran() from None
 
     def _do_streaming_response(
         self, rpc_method, start_response, wrap_message, context, headers, resp
@@ -144,56 +306,124 @@ class grpcWSGI(grpc.Server):
         if context._initial_metadata:
             headers.extend(context._initial_metadata)
 
+        if context._codec is not None:
+            headers.append(("grpc-encoding", context._codec.name))
+
+        context._codec_fixed = True
+
         start_response("200 OK", headers)
 
         if first_message is not None:
-            yield wrap_message(
-                False, False, rpc_method.response_serializer(first_message)
+            resp = itertools.chain((first_message,), resp)
+
+        if self._coalesce:
+            pending = yield from self._coalesce_messages(
+                rpc_method, wrap_message, context, resp
             )
+        else:
+            pending = None
+
+            try:
+                for message in resp:
+                    yield self._wrap_response(
+                        context, wrap_message, rpc_method.response_serializer(message)
+                    )
+            except grpc.RpcError:
+                pass
+
+        trailer_data = protocol.pack_status_frame(
+            wrap_message, context.code, context.details, context._trailing_metadata
+        )
+
+        if pending:
+            pending.append(trailer_data)
+            trailer_data = b"".join(pending)
+
+        yield trailer_data
+
+    def _coalesce_messages(self, rpc_method, wrap_message, context, resp):
+        """
+        Pack consecutive frames into a single write while the handler is
+        producing messages in a burst.
+
+        The server only writes when we yield, so to see whether the handler
+        is idle it is iterated on the executor passed to grpcWSGI and hands
+        its messages over through a queue.
+        Only messages that are already queued are packed together: held
+        frames are written as soon as the queue runs dry, or once they reach
+        coalesce_max_bytes or have waited coalesce_max_delay. Returns the
+        frames that should go out along with the trailers.
+        """
+        messages = queue.Queue(_COALESCE_BUFFER)
+        stop = threading.Event()
+        produce = functools.partial(
+            contextvars.copy_context().run, _produce, resp, messages, stop
+        )
+
+        self._executor.submit(produce)
+
+        pending = []
+        size = 0
+        started = 0.0
 
         try:
-            for message in resp:
-                yield wrap_message(
-                    False, False, rpc_method.response_serializer(message)
-                )
-        except grpc.RpcError:
-            pass
+            while True:
+                try:
+                    message = messages.get(block=not pending)
+                except queue.Empty:
+                    yield b"".join(pending)
+                    pending = []
+                    continue
+
+                if message is _END_OF_STREAM:
+                    break
+                if isinstance(message, grpc.RpcError):
+                    break
+                if isinstance(message, BaseException):
+                    raise message
 
-        trailers = [("grpc-status", str(context.code.value[0]))]
+                body = self._wrap_response(
+                    context, wrap_message, rpc_method.response_serializer(message)
+                )
 
-        if context.details:
-            trailers.append(("grpc-message", quote(context.details.encode("utf8"))))
+                now = time.monotonic()
+                if not pending:
+                    started = now
+                    size = 0
 
-        if context._trailing_metadata:
-            trailers.extend(context._trailing_metadata)
+                pending.append(body)
+                size += len(body)
 
-        trailer_message = protocol.pack_trailers(trailers)
+                if (
+                    size >= self._coalesce_max_bytes
+                    or now - started >= self._coalesce_max_delay
+                ):
+                    yield b"".join(pending)
+                    pending = []
+        finally:
+            stop.set()
 
-        yield wrap_message(True, False, trailer_message)
+        return pending
 
     def _do_unary_response(
         self, rpc_method, start_response, wrap_message, context, headers, resp
     ):
         if resp:
-            message_data = wrap_message(
-                False, False, rpc_method.response_serializer(resp)
+            message_data = self._wrap_response(
+                context, wrap_message, rpc_method.response_serializer(resp)
             )
+
+            if context._codec is not None:
+                headers.append(("grpc-encoding", context._codec.name))
         else:
             message_data = b""
 
         if context._initial_metadata:
             headers.extend(context._initial_metadata)
 
-        trailers = [("grpc-status", str(context.code.value[0]))]
-
-        if context.details:
-            trailers.append(("grpc-message", quote(context.details.encode("utf8"))))
-
-        if context._trailing_metadata:
-            trailers.extend(context._trailing_metadata)
-
-        trailer_message = protocol.pack_trailers(trailers)
-        trailer_data = wrap_message(True, False, trailer_message)
+        trailer_data = protocol.pack_status_frame(
+            wrap_message, context.code, context.details, context._trailing_metadata
+        )
 
         content_length = len(message_data) + len(trailer_data)
 
@@ -205,25 +435,35 @@ class grpcWSGI(grpc.Server):
 
         yield trailer_data
 
+    def _wrap_response(self, context, wrap_message, data):
+        codec = context._codec
+
+        if (
+            codec is None
+            or len(data) < self._compression_threshold
+            or context._disable_next_compression
+        ):
+            context._disable_next_compression = False
+            return wrap_message(False, False, data)
+
+        return wrap_message(False, True, codec.compress(data))
+
     def _do_cors_preflight(self, environ, start_response):
         headers = [
             ("Content-Type", "text/plain"),
             ("Content-Length", "0"),
         ]
-        if self._enable_cors:
-            headers += [
-                ("Access-Control-Allow-Methods", "POST, OPTIONS"),
-                ("Access-Control-Allow-Headers", "*"),
-                (
-                    "Access-Control-Allow-Origin",
-                    environ.get("HTTP_HOST") or environ["SERVER_NAME"],
-                ),
-                ("Access-Control-Allow-Credentials", "true"),
-                ("Access-Control-Expose-Headers", "*"),
-            ]
+        if self._cors is not None:
+            headers += self._match_cors(environ).wsgi_preflight
         start_response("204 No Content", headers)
         return []
 
+    def _match_cors(self, environ):
+        return self._cors.match(
+            environ.get("HTTP_ORIGIN"),
+            environ.get("HTTP_HOST") or environ["SERVER_NAME"],
+        )
+
     def __call__(self, environ, start_response):
         """
         Our actual WSGI request handler. Will execute the request
@@ -234,62 +474,118 @@ class grpcWSGI(grpc.Server):
         rpc_method = self._get_rpc_handler(environ)
         request_method = environ["REQUEST_METHOD"]
 
+        if rpc_method and request_method == "POST":
+            context = self._create_context(environ)
+
+            if self._router.intercepts_calls:
+                rpc_method = self._router.intercept(
+                    environ["PATH_INFO"], rpc_method, context.invocation_metadata
+                )
+
+                if rpc_method is None and environ.get("CONTENT_TYPE", "").startswith(
+                    "application/grpc"
+                ):
+                    return self._do_unimplemented(context, environ, start_response)
+
         if rpc_method:
             if request_method == "POST":
-                return self._do_grpc_request(rpc_method, environ, start_response)
+                if self._metrics is not None:
+                    return self._do_instrumented_request(
+                        rpc_method, context, environ, start_response
+                    )
+
+                return self._do_grpc_request(
+                    rpc_method, context, environ, start_response
+                )
             elif request_method == "OPTIONS":
                 return self._do_cors_preflight(environ, start_response)
             else:
                 start_response("400 Bad Request", [])
                 return []
 
+        if environ["PATH_INFO"] == self._metrics_path and request_method == "GET":
+            return self._do_metrics(start_response)
+
         if self._application:
             return self._application(environ, start_response)
         else:
             start_response("404 Not Found", [])
             return []
 
-    def _read_request(self, environ):
-        try:
-            content_length = environ.get("CONTENT_LENGTH")
-            if content_length:
-                content_length = int(content_length)
-            else:
-                content_length = None
-        except ValueError:
-            content_length = None
-
-        stream = environ["wsgi.input"]
-
-        transfer_encoding = environ.get("HTTP_TRANSFER_ENCODING")
-
-        if transfer_encoding == "chunked":
-            buffer = []
-            line = stream.readline()
-
-            while line:
-                if not line:
-                    break
+    def _read_messages(self, environ, context, call=None):
+        """
+        Yield the request messages, decompressed, as they are read from
+        wsgi.input. At most one frame is held in memory at a time and frames
+        longer than max_receive_message_length are rejected with
+        RESOURCE_EXHAUSTED before their data is read, compressed messages as
+        soon as they decompress past it. Compressed messages that don't
+        decompress fail the call with INTERNAL.
+        """
+        max_length = self._max_receive_message_length
+        chunks = self._iter_request(environ)
 
-                size = line.split(b";", 1)[0]
+        if call is not None:
+            chunks = call.count_received(chunks)
 
-                if size == "\r\n":
-                    break
+        if environ.get("CONTENT_TYPE") == "application/grpc-web-text":
+            frames = protocol.b64_unwrap_message_wsgi(chunks, max_length=max_length)
+        else:
+            frames = protocol.unwrap_message_wsgi(chunks, max_length=max_length)
 
-                chunk_size = int(size, 16)
+        try:
+            for _, compressed, message in frames:
+                if compressed:
+                    message = context._decompress(message, max_length)
+
+                yield message
+        except protocol.MessageTooLargeError as exc:
+            context.code = grpc.StatusCode.RESOURCE_EXHAUSTED
+            context.details = str(exc)
+            raise grpc.RpcError()
+        except protocol.IncompleteMessageError as exc:
+            context.code = grpc.StatusCode.INTERNAL
+            context.details = str(exc)
+            raise grpc.RpcError()
+        except sonora.compression.DECOMPRESSION_ERRORS:
+            context.code = grpc.StatusCode.INTERNAL
+            context.details = "Could not decompress message"
+            raise grpc.RpcError()
 
-                if chunk_size == 0:
-                    break
+    def _iter_request(self, environ):
+        """
+        Yield the request body from wsgi.input as it arrives, in pieces of at
+        most _READ_SIZE bytes, so request streaming handlers can consume
+        bodies of any size in constant memory.
+
+        Servers that set wsgi.input_terminated have already dealt with the
+        framing of the body and give us an input we can read to the end.
+        Otherwise a body without a Content-Length or chunked
+        Transfer-Encoding is empty.
+        """
+        stream = environ["wsgi.input"]
 
-                buffer.append(stream.read(chunk_size + 2)[:-2])
-                line = stream.readline()
-            return b"".join(buffer)
+        if environ.get("wsgi.input_terminated"):
+            yield from _read_all(stream)
+        elif environ.get("HTTP_TRANSFER_ENCODING") == "chunked":
+            yield from _read_chunked(stream)
         else:
-            return stream.read(content_length or 5)
+            try:
+                content_length = int(environ.get("CONTENT_LENGTH") or 0)
+            except ValueError:
+                content_length = 0
+
+            yield from _read_exactly(stream, content_length)
 
 
 class ServicerContext(grpc.ServicerContext):
-    def __init__(self, timeout=None, metadata=None):
+    def __init__(
+        self,
+        timeout=None,
+        environ=None,
+        compression=None,
+        request_encoding=None,
+        accept_encoding=None,
+    ):
         self.code = grpc.StatusCode.OK
         self.details = None
 
@@ -300,10 +596,35 @@ class ServicerContext(grpc.ServicerContext):
         else:
             self._deadline = None
 
-        self._invocation_metadata = metadata or tuple()
+        # invocation_metadata() builds the metadata from the environ on first
+        # use, most handlers never ask for it.
+        self._environ = environ or {}
+        self._invocation_metadata = None
         self._initial_metadata = None
         self._trailing_metadata = None
 
+        self._accept_encoding = accept_encoding
+        self._codec = sonora.compression.negotiate(compression, accept_encoding)
+        self._disable_next_compression = False
+        self._codec_fixed = False
+        self._unsupported_encoding = None
+
+        try:
+            self._request_codec = sonora.compression.get_codec(request_encoding)
+        except KeyError:
+            self._request_codec = None
+            self._unsupported_encoding = request_encoding
+            self.code = grpc.StatusCode.UNIMPLEMENTED
+            self.details = f"Unsupported grpc-encoding: {request_encoding}"
+
+    def _decompress(self, message, max_length=None):
+        if self._request_codec is None:
+            self.code = grpc.StatusCode.INTERNAL
+            self.details = "Compressed message received without a grpc-encoding"
+            raise grpc.RpcError()
+
+        return self._request_codec.decompress(message, max_length)
+
     def set_code(self, code):
         if isinstance(code, grpc.StatusCode):
             self.code = code
@@ -323,6 +644,17 @@ class ServicerContext(grpc.ServicerContext):
     def set_details(self, details):
         self.details = details
 
+    def set_compression(self, compression):
+        if self._codec_fixed:
+            return
+
+        self._codec = sonora.compression.negotiate(
+            sonora.compression.resolve(compression), self._accept_encoding
+        )
+
+    def disable_next_message_compression(self):
+        self._disable_next_compression = True
+
     def abort(self, code, details):
         if code == grpc.StatusCode.OK:
             raise ValueError()
@@ -347,13 +679,16 @@ class ServicerContext(grpc.ServicerContext):
             return None
 
     def invocation_metadata(self):
+        if self._invocation_metadata is None:
+            self._invocation_metadata = tuple(_environ_metadata(self._environ))
+
         return self._invocation_metadata
 
     def send_initial_metadata(self, initial_metadata):
         self._initial_metadata = protocol.encode_headers(initial_metadata)
 
     def set_trailing_metadata(self, trailing_metadata):
-        self._trailing_metadata = protocol.encode_headers(trailing_metadata)
+        self._trailing_metadata = protocol.pack_trailers(trailing_metadata)
 
     def peer(self):
         raise NotImplementedError()
@@ -374,14 +709,134 @@ class ServicerContext(grpc.ServicerContext):
         raise NotImplementedError()
 
     def is_active(self):
-        raise NotImplementedError()
+        return self._deadline is None or time.monotonic() < self._deadline
+
+
+_HEX_DIGITS = frozenset(b"0123456789abcdefABCDEF")
+
+
+def _read_chunked(stream):
+    """
+    Yield the data of a chunked request body.
+    """
+    while True:
+        size = stream.readline().split(b";", 1)[0].strip()
+
+        if not size or not _HEX_DIGITS.issuperset(size):
+            raise protocol.IncompleteMessageError("Malformed chunked request body")
+
+        chunk_size = int(size, 16)
+
+        if chunk_size == 0:
+            break
+
+        yield from _read_exactly(stream, chunk_size)
+
+        stream.readline()
+
+    # Skip any trailer fields up to the blank line ending the body.
+    line = stream.readline()
+    while line and line.strip():
+        line = stream.readline()
+
+
+def _produce(resp, messages, stop):
+    """
+    Queue the messages of a coalesced stream, followed by _END_OF_STREAM or
+    the exception that ended it, until stop is set.
+    """
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                messages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+
+        return False
+
+    try:
+        for message in resp:
+            if not put(message):
+                break
+        else:
+            put(_END_OF_STREAM)
+    except BaseException as exc:
+        put(exc)
+    finally:
+        close = getattr(resp, "close", None)
+        if close is not None:
+            close()
+
+
+def _read_all(stream):
+    data = stream.read(_READ_SIZE)
+
+    while data:
+        yield data
+        data = stream.read(_READ_SIZE)
+
+
+def _read_exactly(stream, length):
+    while length > 0:
+        data = stream.read(min(length, _READ_SIZE))
+
+        if not data:
+            raise protocol.IncompleteMessageError("Truncated request body")
+
+        length -= len(data)
+
+        yield data
+
+
+def _metadata_key(key):
+    header = _metadata_keys.get(key)
+
+    if header is None:
+        header = key[5:].lower().replace("_", "-")
+
+        if len(_metadata_keys) >= _MAX_METADATA_KEYS:
+            _metadata_keys.clear()
+        _metadata_keys[key] = header
+
+    return header
+
+
+def _environ_metadata(environ):
+    for key, value in environ.items():
+        if key.startswith("HTTP_"):
+            header = _metadata_key(key)
+
+            if header.endswith("-bin"):
+                value = base64.b64decode(value)
+
+            yield header, value
+
+
+class _HandlerOverran(Exception):
+    pass
+
+
+def _call_if_active(method, request, context):
+    # Calls that waited for a thread past their deadline have been answered
+    # already.
+    if context.is_active():
+        return method(request, context)
+
+
+def _deadline_exceeded(context):
+    context.code = grpc.StatusCode.DEADLINE_EXCEEDED
+    context.details = "request timed out at the server"
+    raise grpc.RpcError()
 
 
 def _timeout_generator(context, gen):
     while 1:
         if context.time_remaining() > 0:
-            yield next(gen)
+            try:
+                yield next(gen)
+            except StopIteration:
+                return
         else:
-            context.code = grpc.StatusCode.DEADLINE_EXCEEDED
-            context.details = "request timed out at the server"
-            raise grpc.RpcError()
+            _deadline_exceeded(context)
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: tests/benchmark.proto
+# Protobuf Python Version: 4.25.1
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x15tests/benchmark.proto\x12\tbenchmark\"\x1a\n\tBoolValue\x12\r\n\x05value\x18\x01 \x01(\x08\"=\n\x07Payload\x12$\n\x04type\x18\x01 \x01(\x0e\x32\x16.benchmark.PayloadType\x12\x0c\n\x04\x62ody\x18\x02 \x01(\x0c\"+\n\nEchoStatus\x12\x0c\n\x04\x63ode\x18\x01 \x01(\x05\x12\x0f\n\x07message\x18\x02 \x01(\t\"\xbf\x02\n\rSimpleRequest\x12-\n\rresponse_type\x18\x01 \x01(\x0e\x32\x16.benchmark.PayloadType\x12\x15\n\rresponse_size\x18\x02 \x01(\x05\x12#\n\x07payload\x18\x03 \x01(\x0b\x32\x12.benchmark.Payload\x12\x15\n\rfill_username\x18\x04 \x01(\x08\x12\x18\n\x10\x66ill_oauth_scope\x18\x05 \x01(\x08\x12\x31\n\x13response_compressed\x18\x06 \x01(\x0b\x32\x14.benchmark.BoolValue\x12.\n\x0fresponse_status\x18\x07 \x01(\x0b\x32\x15.benchmark.EchoStatus\x12/\n\x11\x65xpect_compressed\x18\x08 \x01(\x0b\x32\x14.benchmark.BoolValue\"\\\n\x0eSimpleResponse\x12#\n\x07payload\x18\x01 \x01(\x0b\x32\x12.benchmark.Payload\x12\x10\n\x08username\x18\x02 \x01(\t\x12\x13\n\x0boauth_scope\x18\x03 \x01(\t*\x1f\n\x0bPayloadType\x12\x10\n\x0c\x43OMPRESSABLE\x10\x00\x32\x88\x03\n\x10\x42\x65nchmarkService\x12@\n\tUnaryCall\x12\x18.benchmark.SimpleRequest\x1a\x19.benchmark.SimpleResponse\x12H\n\rStreamingCall\x12\x18.benchmark.SimpleRequest\x1a\x19.benchmark.SimpleResponse(\x01\x30\x01\x12L\n\x13StreamingFromClient\x12\x18.benchmark.SimpleRequest\x1a\x19.benchmark.SimpleResponse(\x01\x12L\n\x13StreamingFromServer\x12\x18.benchmark.SimpleRequest\x1a\x19.benchmark.SimpleResponse0\x01\x12L\n\x11StreamingBothWays\x12\x18.benchmark.SimpleRequest\x1a\x19.benchmark.SimpleResponse(\x01\x30\x01\x62\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'tests.benchmark_pb2', _globals)
+if _descriptor._USE_C_DESCRIPTORS == False:
+  DESCRIPTOR._options = None
+  _globals['_PAYLOADTYPE']._serialized_start=588
+  _globals['_PAYLOADTYPE']._serialized_end=619
+  _globals['_BOOLVALUE']._serialized_start=36
+  _globals['_BOOLVALUE']._serialized_end=62
+  _globals['_PAYLOAD']._serialized_start=64
+  _globals['_PAYLOAD']._serialized_end=125
+  _globals['_ECHOSTATUS']._serialized_start=127
+  _globals['_ECHOSTATUS']._serialized_end=170
+  _globals['_SIMPLEREQUEST']._serialized_start=173
+  _globals['_SIMPLEREQUEST']._serialized_end=492
+  _globals['_SIMPLERESPONSE']._serialized_start=494
+  _globals['_SIMPLERESPONSE']._serialized_end=586
+  _globals['_BENCHMARKSERVICE']._serialized_start=622
+  _globals['_BENCHMARKSERVICE']._serialized_end=1014
+# @@protoc_insertion_point(module_scope)
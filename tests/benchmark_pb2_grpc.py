@@ -0,0 +1,209 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+
+from tests import benchmark_pb2 as tests_dot_benchmark__pb2
+
+
+class BenchmarkServiceStub(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.UnaryCall = channel.unary_unary(
+                '/benchmark.BenchmarkService/UnaryCall',
+                request_serializer=tests_dot_benchmark__pb2.SimpleRequest.SerializeToString,
+                response_deserializer=tests_dot_benchmark__pb2.SimpleResponse.FromString,
+                )
+        self.StreamingCall = channel.stream_stream(
+                '/benchmark.BenchmarkService/StreamingCall',
+                request_serializer=tests_dot_benchmark__pb2.SimpleRequest.SerializeToString,
+                response_deserializer=tests_dot_benchmark__pb2.SimpleResponse.FromString,
+                )
+        self.StreamingFromClient = channel.stream_unary(
+                '/benchmark.BenchmarkService/StreamingFromClient',
+                request_serializer=tests_dot_benchmark__pb2.SimpleRequest.SerializeToString,
+                response_deserializer=tests_dot_benchmark__pb2.SimpleResponse.FromString,
+                )
+        self.StreamingFromServer = channel.unary_stream(
+                '/benchmark.BenchmarkService/StreamingFromServer',
+                request_serializer=tests_dot_benchmark__pb2.SimpleRequest.SerializeToString,
+                response_deserializer=tests_dot_benchmark__pb2.SimpleResponse.FromString,
+                )
+        self.StreamingBothWays = channel.stream_stream(
+                '/benchmark.BenchmarkService/StreamingBothWays',
+                request_serializer=tests_dot_benchmark__pb2.SimpleRequest.SerializeToString,
+                response_deserializer=tests_dot_benchmark__pb2.SimpleResponse.FromString,
+                )
+
+
+class BenchmarkServiceServicer(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def UnaryCall(self, request, context):
+        """One request followed by one response.
+        The server returns the client payload as-is.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamingCall(self, request_iterator, context):
+        """Repeated sequence of one request followed by one response.
+        Should be called streaming ping-pong
+        The server returns the client payload as-is on each response
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamingFromClient(self, request_iterator, context):
+        """Single-sided unbounded streaming from client to server
+        The server returns the client payload as-is once the client does WritesDone
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamingFromServer(self, request, context):
+        """Single-sided unbounded streaming from server to client
+        The server repeatedly returns the client payload as-is
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamingBothWays(self, request_iterator, context):
+        """Two-sided unbounded streaming between server to client
+        Both sides send the content of their own choice to the other
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_BenchmarkServiceServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'UnaryCall': grpc.unary_unary_rpc_method_handler(
+                    servicer.UnaryCall,
+                    request_deserializer=tests_dot_benchmark__pb2.SimpleRequest.FromString,
+                    response_serializer=tests_dot_benchmark__pb2.SimpleResponse.SerializeToString,
+            ),
+            'StreamingCall': grpc.stream_stream_rpc_method_handler(
+                    servicer.StreamingCall,
+                    request_deserializer=tests_dot_benchmark__pb2.SimpleRequest.FromString,
+                    response_serializer=tests_dot_benchmark__pb2.SimpleResponse.SerializeToString,
+            ),
+            'StreamingFromClient': grpc.stream_unary_rpc_method_handler(
+                    servicer.StreamingFromClient,
+                    request_deserializer=tests_dot_benchmark__pb2.SimpleRequest.FromString,
+                    response_serializer=tests_dot_benchmark__pb2.SimpleResponse.SerializeToString,
+            ),
+            'StreamingFromServer': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamingFromServer,
+                    request_deserializer=tests_dot_benchmark__pb2.SimpleRequest.FromString,
+                    response_serializer=tests_dot_benchmark__pb2.SimpleResponse.SerializeToString,
+            ),
+            'StreamingBothWays': grpc.stream_stream_rpc_method_handler(
+                    servicer.StreamingBothWays,
+                    request_deserializer=tests_dot_benchmark__pb2.SimpleRequest.FromString,
+                    response_serializer=tests_dot_benchmark__pb2.SimpleResponse.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'benchmark.BenchmarkService', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+
+
+ # This class is part of an EXPERIMENTAL API.
+class BenchmarkService(object):
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def UnaryCall(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/benchmark.BenchmarkService/UnaryCall',
+            tests_dot_benchmark__pb2.SimpleRequest.SerializeToString,
+            tests_dot_benchmark__pb2.SimpleResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def StreamingCall(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(request_iterator, target, '/benchmark.BenchmarkService/StreamingCall',
+            tests_dot_benchmark__pb2.SimpleRequest.SerializeToString,
+            tests_dot_benchmark__pb2.SimpleResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def StreamingFromClient(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(request_iterator, target, '/benchmark.BenchmarkService/StreamingFromClient',
+            tests_dot_benchmark__pb2.SimpleRequest.SerializeToString,
+            tests_dot_benchmark__pb2.SimpleResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def StreamingFromServer(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/benchmark.BenchmarkService/StreamingFromServer',
+            tests_dot_benchmark__pb2.SimpleRequest.SerializeToString,
+            tests_dot_benchmark__pb2.SimpleResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def StreamingBothWays(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(request_iterator, target, '/benchmark.BenchmarkService/StreamingBothWays',
+            tests_dot_benchmark__pb2.SimpleRequest.SerializeToString,
+            tests_dot_benchmark__pb2.SimpleResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
@@ -1,9 +1,14 @@
 import asyncio
 from concurrent import futures
 import contextlib
+import functools
+import io
 import multiprocessing
 import socket
+import socketserver
+import threading
 import time
+from wsgiref import simple_server
 
 import bjoern
 import grpc
@@ -151,11 +156,17 @@ class SyncBenchmark(benchmark_pb2_grpc.BenchmarkServiceServicer):
         response.payload.body = b"\0" * request.response_size
         return response
 
-    def StreamingCall(self, request, context):
-        raise NotImplementedError()
+    def StreamingCall(self, request_iterator, context):
+        for request in request_iterator:
+            response = benchmark_pb2.SimpleResponse()
+            response.payload.body = request.payload.body
+            yield response
 
-    def StreamingFromClient(self, request, context):
-        raise NotImplementedError()
+    def StreamingFromClient(self, request_iterator, context):
+        response = benchmark_pb2.SimpleResponse()
+        for request in request_iterator:
+            response.payload.body = request.payload.body
+        return response
 
     def StreamingFromServer(self, request, context):
         response = benchmark_pb2.SimpleResponse()
@@ -163,8 +174,11 @@ class SyncBenchmark(benchmark_pb2_grpc.BenchmarkServiceServicer):
         while 1:
             yield response
 
-    def StreamingBothWays(self, request, context):
-        raise NotImplementedError()
+    def StreamingBothWays(self, request_iterator, context):
+        for request in request_iterator:
+            response = benchmark_pb2.SimpleResponse()
+            response.payload.body = request.payload.body
+            yield response
 
 
 class AsyncBenchmark(benchmark_pb2_grpc.BenchmarkServiceServicer):
@@ -173,11 +187,17 @@ class AsyncBenchmark(benchmark_pb2_grpc.BenchmarkServiceServicer):
         response.payload.body = b"\0" * request.response_size
         return response
 
-    async def StreamingCall(self, request, context):
-        raise NotImplementedError()
+    async def StreamingCall(self, request_iterator, context):
+        async for request in request_iterator:
+            response = benchmark_pb2.SimpleResponse()
+            response.payload.body = request.payload.body
+            yield response
 
-    async def StreamingFromClient(self, request, context):
-        raise NotImplementedError()
+    async def StreamingFromClient(self, request_iterator, context):
+        response = benchmark_pb2.SimpleResponse()
+        async for request in request_iterator:
+            response.payload.body = request.payload.body
+        return response
 
     async def StreamingFromServer(self, request, context):
         response = benchmark_pb2.SimpleResponse()
@@ -185,8 +205,11 @@ class AsyncBenchmark(benchmark_pb2_grpc.BenchmarkServiceServicer):
         while 1:
             yield response
 
-    async def StreamingBothWays(self, request, context):
-        raise NotImplementedError()
+    async def StreamingBothWays(self, request_iterator, context):
+        async for request in request_iterator:
+            response = benchmark_pb2.SimpleResponse()
+            response.payload.body = request.payload.body
+            yield response
 
 
 def _asgi_helloworld_server(lock, port):
@@ -200,6 +223,28 @@ def _asgi_helloworld_server(lock, port):
     )
 
 
+def _asgi_sync_helloworld_server(lock, port):
+    grpc_asgi_app = sonora.asgi.grpcASGI()
+    helloworld_pb2_grpc.add_GreeterServicer_to_server(SyncGreeter(), grpc_asgi_app)
+
+    lock.release()
+
+    uvicorn.run(
+        grpc_asgi_app, host="127.0.0.1", port=port, log_level="info", access_log=False
+    )
+
+
+def _asgi_gzip_helloworld_server(lock, port):
+    grpc_asgi_app = sonora.asgi.grpcASGI(compression=grpc.Compression.Gzip)
+    helloworld_pb2_grpc.add_GreeterServicer_to_server(AsyncGreeter(), grpc_asgi_app)
+
+    lock.release()
+
+    uvicorn.run(
+        grpc_asgi_app, host="127.0.0.1", port=port, log_level="info", access_log=False
+    )
+
+
 def _asgi_benchmark_server(lock, port):
     grpc_asgi_app = sonora.asgi.grpcASGI()
     benchmark_pb2_grpc.add_BenchmarkServiceServicer_to_server(
@@ -213,6 +258,19 @@ def _asgi_benchmark_server(lock, port):
     )
 
 
+def _asgi_coalescing_benchmark_server(lock, port):
+    grpc_asgi_app = sonora.asgi.grpcASGI(coalesce=True)
+    benchmark_pb2_grpc.add_BenchmarkServiceServicer_to_server(
+        AsyncBenchmark(), grpc_asgi_app
+    )
+
+    lock.release()
+
+    uvicorn.run(
+        grpc_asgi_app, host="127.0.0.1", port=port, log_level="info", access_log=False
+    )
+
+
 def _wsgi_helloworld_server(lock, port):
     grpc_wsgi_app = sonora.wsgi.grpcWSGI(None)
     helloworld_pb2_grpc.add_GreeterServicer_to_server(SyncGreeter(), grpc_wsgi_app)
@@ -223,6 +281,16 @@ def _wsgi_helloworld_server(lock, port):
     bjoern.run()
 
 
+def _wsgi_gzip_helloworld_server(lock, port):
+    grpc_wsgi_app = sonora.wsgi.grpcWSGI(None, compression=grpc.Compression.Gzip)
+    helloworld_pb2_grpc.add_GreeterServicer_to_server(SyncGreeter(), grpc_wsgi_app)
+    bjoern.listen(grpc_wsgi_app, "localhost", port)
+
+    lock.release()
+
+    bjoern.run()
+
+
 def _wsgi_benchmark_server(lock, port):
     grpc_wsgi_app = sonora.wsgi.grpcWSGI(None)
     benchmark_pb2_grpc.add_BenchmarkServiceServicer_to_server(
@@ -235,6 +303,20 @@ def _wsgi_benchmark_server(lock, port):
     bjoern.run()
 
 
+def _wsgi_coalescing_benchmark_server(lock, port):
+    grpc_wsgi_app = sonora.wsgi.grpcWSGI(
+        None, coalesce=True, executor=futures.ThreadPoolExecutor(8)
+    )
+    benchmark_pb2_grpc.add_BenchmarkServiceServicer_to_server(
+        SyncBenchmark(), grpc_wsgi_app
+    )
+    bjoern.listen(grpc_wsgi_app, "localhost", port)
+
+    lock.release()
+
+    bjoern.run()
+
+
 def _grpcio_benchmark_server(lock, port):
     server = grpc.server(futures.ThreadPoolExecutor(max_workers=1))
     benchmark_pb2_grpc.add_BenchmarkServiceServicer_to_server(SyncBenchmark(), server)
@@ -307,6 +389,43 @@ def _async_channel_fixture(server, channel, stub):
     return fixture
 
 
+class _ThreadingWSGIServer(socketserver.ThreadingMixIn, simple_server.WSGIServer):
+    daemon_threads = True
+
+
+class _QuietHandler(simple_server.WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def serve_wsgi():
+    """
+    Serve WSGI apps from threads in the test process until the test is done.
+    Returns a function that starts serving an app and returns its port.
+    """
+    servers = []
+
+    def serve(app):
+        server = simple_server.make_server(
+            "localhost",
+            0,
+            app,
+            server_class=_ThreadingWSGIServer,
+            handler_class=_QuietHandler,
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+
+        return server.server_port
+
+    yield serve
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
 asgi_greeter_server = pytest.fixture(_server_fixture(_asgi_helloworld_server))
 wsgi_greeter_server = pytest.fixture(_server_fixture(_wsgi_helloworld_server))
 
@@ -328,6 +447,31 @@ asgi_greeter = pytest.fixture(
         helloworld_pb2_grpc.GreeterStub,
     )
 )
+asgi_sync_greeter = pytest.fixture(
+    _async_channel_fixture(
+        _asgi_sync_helloworld_server,
+        sonora.aio.insecure_web_channel,
+        helloworld_pb2_grpc.GreeterStub,
+    )
+)
+wsgi_gzip_greeter = pytest.fixture(
+    _sync_channel_fixture(
+        _wsgi_gzip_helloworld_server,
+        functools.partial(
+            sonora.client.insecure_web_channel, compression=grpc.Compression.Gzip
+        ),
+        helloworld_pb2_grpc.GreeterStub,
+    )
+)
+asgi_gzip_greeter = pytest.fixture(
+    _async_channel_fixture(
+        _asgi_gzip_helloworld_server,
+        functools.partial(
+            sonora.aio.insecure_web_channel, compression=grpc.Compression.Gzip
+        ),
+        helloworld_pb2_grpc.GreeterStub,
+    )
+)
 
 asgi_benchmark = pytest.fixture(
     _async_channel_fixture(
@@ -343,6 +487,20 @@ wsgi_benchmark = pytest.fixture(
         benchmark_pb2_grpc.BenchmarkServiceStub,
     )
 )
+asgi_coalescing_benchmark = pytest.fixture(
+    _async_channel_fixture(
+        _asgi_coalescing_benchmark_server,
+        sonora.aio.insecure_web_channel,
+        benchmark_pb2_grpc.BenchmarkServiceStub,
+    )
+)
+wsgi_coalescing_benchmark = pytest.fixture(
+    _sync_channel_fixture(
+        _wsgi_coalescing_benchmark_server,
+        sonora.client.insecure_web_channel,
+        benchmark_pb2_grpc.BenchmarkServiceStub,
+    )
+)
 grpcio_benchmark = pytest.fixture(
     _sync_channel_fixture(
         _grpcio_benchmark_server,
@@ -350,3 +508,123 @@ grpcio_benchmark = pytest.fixture(
         benchmark_pb2_grpc.BenchmarkServiceStub,
     )
 )
+
+
+def make_app(app_class, handler, method=grpc.unary_unary_rpc_method_handler, **kwargs):
+    """
+    Build an app serving handler as /test.Service/Method with bytes messages.
+    """
+    app = app_class(**kwargs)
+    app.add_generic_rpc_handlers(
+        [
+            grpc.method_handlers_generic_handler(
+                "test.Service",
+                {
+                    "Method": method(
+                        handler,
+                        request_deserializer=bytes,
+                        response_serializer=bytes,
+                    )
+                },
+            )
+        ]
+    )
+    return app
+
+
+def wsgi_call(app, body=b"", path="/test.Service/Method", method="POST", environ=None):
+    """
+    Send a request to a WSGI app and return the response status, headers and
+    body. environ adds to or overrides the request's environ.
+    """
+    responses = []
+    environ = {
+        "PATH_INFO": path,
+        "REQUEST_METHOD": method,
+        "CONTENT_TYPE": "application/grpc-web+proto",
+        "CONTENT_LENGTH": str(len(body)),
+        "HTTP_HOST": "localhost",
+        "wsgi.input": io.BytesIO(body),
+        **(environ or {}),
+    }
+
+    data = b"".join(
+        app(environ, lambda status, headers: responses.append((status, headers)))
+    )
+    status, headers = responses[0]
+
+    return status, headers, data
+
+
+async def asgi_call(
+    app,
+    body=b"",
+    path="/test.Service/Method",
+    method="POST",
+    headers=(),
+    send=None,
+    disconnected=None,
+):
+    """
+    Send a request to an ASGI app and return the events it sent, unless send
+    is given to take them instead.
+
+    A list body is sent as one event per chunk. The client stays connected
+    until the disconnected event is set.
+    """
+    if isinstance(body, bytes):
+        body = [body]
+
+    requests = [
+        {"type": "http.request", "body": chunk, "more_body": True} for chunk in body
+    ]
+    requests.append({"type": "http.request", "body": b"", "more_body": False})
+
+    if disconnected is None:
+        disconnected = asyncio.Event()
+
+    events = []
+
+    async def receive():
+        if requests:
+            return requests.pop(0)
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    if send is None:
+
+        async def send(event):
+            events.append(event)
+
+    await app(
+        {
+            "type": "http",
+            "path": path,
+            "method": method,
+            "headers": [
+                (b"host", b"localhost"),
+                (b"content-type", b"application/grpc-web+proto"),
+                *headers,
+            ],
+        },
+        receive,
+        send,
+    )
+
+    return events
+
+
+def asgi_status(events):
+    """
+    The grpc-status an ASGI app sent in its response headers, if any.
+    """
+    return dict(events[0]["headers"]).get(b"grpc-status")
+
+
+def asgi_frames(events):
+    """
+    Decode the frames in the response body an ASGI app sent.
+    """
+    return sonora.protocol.FrameDecoder().feed(
+        b"".join(event.get("body", b"") for event in events)
+    )
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: tests/helloworld.proto
+# Protobuf Python Version: 4.25.1
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+from google.protobuf import empty_pb2 as google_dot_protobuf_dot_empty__pb2
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x16tests/helloworld.proto\x12\nhelloworld\x1a\x1bgoogle/protobuf/empty.proto\"\x1c\n\x0cHelloRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\"\x1d\n\nHelloReply\x12\x0f\n\x07message\x18\x01 \x01(\t\"!\n\x0eTimeoutRequest\x12\x0f\n\x07seconds\x18\x01 \x01(\x02\x32\xed\x03\n\x07Greeter\x12>\n\x08SayHello\x12\x18.helloworld.HelloRequest\x1a\x16.helloworld.HelloReply\"\x00\x12\x43\n\rHelloMetadata\x12\x18.helloworld.HelloRequest\x1a\x16.helloworld.HelloReply\"\x00\x12K\n\x13HelloStreamMetadata\x12\x18.helloworld.HelloRequest\x1a\x16.helloworld.HelloReply\"\x00\x30\x01\x12\x46\n\x0eSayHelloSlowly\x12\x18.helloworld.HelloRequest\x1a\x16.helloworld.HelloReply\"\x00\x30\x01\x12\x39\n\x05\x41\x62ort\x12\x16.google.protobuf.Empty\x1a\x16.google.protobuf.Empty\"\x00\x12\x44\n\x0cUnaryTimeout\x12\x1a.helloworld.TimeoutRequest\x1a\x16.google.protobuf.Empty\"\x00\x12G\n\rStreamTimeout\x12\x1a.helloworld.TimeoutRequest\x1a\x16.google.protobuf.Empty\"\x00\x30\x01\x62\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'tests.helloworld_pb2', _globals)
+if _descriptor._USE_C_DESCRIPTORS == False:
+  DESCRIPTOR._options = None
+  _globals['_HELLOREQUEST']._serialized_start=67
+  _globals['_HELLOREQUEST']._serialized_end=95
+  _globals['_HELLOREPLY']._serialized_start=97
+  _globals['_HELLOREPLY']._serialized_end=126
+  _globals['_TIMEOUTREQUEST']._serialized_start=128
+  _globals['_TIMEOUTREQUEST']._serialized_end=161
+  _globals['_GREETER']._serialized_start=164
+  _globals['_GREETER']._serialized_end=657
+# @@protoc_insertion_point(module_scope)
@@ -0,0 +1,270 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+
+from google.protobuf import empty_pb2 as google_dot_protobuf_dot_empty__pb2
+from tests import helloworld_pb2 as tests_dot_helloworld__pb2
+
+
+class GreeterStub(object):
+    """The greeting service definition.
+    """
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.SayHello = channel.unary_unary(
+                '/helloworld.Greeter/SayHello',
+                request_serializer=tests_dot_helloworld__pb2.HelloRequest.SerializeToString,
+                response_deserializer=tests_dot_helloworld__pb2.HelloReply.FromString,
+                )
+        self.HelloMetadata = channel.unary_unary(
+                '/helloworld.Greeter/HelloMetadata',
+                request_serializer=tests_dot_helloworld__pb2.HelloRequest.SerializeToString,
+                response_deserializer=tests_dot_helloworld__pb2.HelloReply.FromString,
+                )
+        self.HelloStreamMetadata = channel.unary_stream(
+                '/helloworld.Greeter/HelloStreamMetadata',
+                request_serializer=tests_dot_helloworld__pb2.HelloRequest.SerializeToString,
+                response_deserializer=tests_dot_helloworld__pb2.HelloReply.FromString,
+                )
+        self.SayHelloSlowly = channel.unary_stream(
+                '/helloworld.Greeter/SayHelloSlowly',
+                request_serializer=tests_dot_helloworld__pb2.HelloRequest.SerializeToString,
+                response_deserializer=tests_dot_helloworld__pb2.HelloReply.FromString,
+                )
+        self.Abort = channel.unary_unary(
+                '/helloworld.Greeter/Abort',
+                request_serializer=google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
+                response_deserializer=google_dot_protobuf_dot_empty__pb2.Empty.FromString,
+                )
+        self.UnaryTimeout = channel.unary_unary(
+                '/helloworld.Greeter/UnaryTimeout',
+                request_serializer=tests_dot_helloworld__pb2.TimeoutRequest.SerializeToString,
+                response_deserializer=google_dot_protobuf_dot_empty__pb2.Empty.FromString,
+                )
+        self.StreamTimeout = channel.unary_stream(
+                '/helloworld.Greeter/StreamTimeout',
+                request_serializer=tests_dot_helloworld__pb2.TimeoutRequest.SerializeToString,
+                response_deserializer=google_dot_protobuf_dot_empty__pb2.Empty.FromString,
+                )
+
+
+class GreeterServicer(object):
+    """The greeting service definition.
+    """
+
+    def SayHello(self, request, context):
+        """Sends a greeting
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def HelloMetadata(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def HelloStreamMetadata(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SayHelloSlowly(self, request, context):
+        """Sends a greeting 1 byte a time
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Abort(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def UnaryTimeout(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamTimeout(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_GreeterServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'SayHello': grpc.unary_unary_rpc_method_handler(
+                    servicer.SayHello,
+                    request_deserializer=tests_dot_helloworld__pb2.HelloRequest.FromString,
+                    response_serializer=tests_dot_helloworld__pb2.HelloReply.SerializeToString,
+            ),
+            'HelloMetadata': grpc.unary_unary_rpc_method_handler(
+                    servicer.HelloMetadata,
+                    request_deserializer=tests_dot_helloworld__pb2.HelloRequest.FromString,
+                    response_serializer=tests_dot_helloworld__pb2.HelloReply.SerializeToString,
+            ),
+            'HelloStreamMetadata': grpc.unary_stream_rpc_method_handler(
+                    servicer.HelloStreamMetadata,
+                    request_deserializer=tests_dot_helloworld__pb2.HelloRequest.FromString,
+                    response_serializer=tests_dot_helloworld__pb2.HelloReply.SerializeToString,
+            ),
+            'SayHelloSlowly': grpc.unary_stream_rpc_method_handler(
+                    servicer.SayHelloSlowly,
+                    request_deserializer=tests_dot_helloworld__pb2.HelloRequest.FromString,
+                    response_serializer=tests_dot_helloworld__pb2.HelloReply.SerializeToString,
+            ),
+            'Abort': grpc.unary_unary_rpc_method_handler(
+                    servicer.Abort,
+                    request_deserializer=google_dot_protobuf_dot_empty__pb2.Empty.FromString,
+                    response_serializer=google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
+            ),
+            'UnaryTimeout': grpc.unary_unary_rpc_method_handler(
+                    servicer.UnaryTimeout,
+                    request_deserializer=tests_dot_helloworld__pb2.TimeoutRequest.FromString,
+                    response_serializer=google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
+            ),
+            'StreamTimeout': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamTimeout,
+                    request_deserializer=tests_dot_helloworld__pb2.TimeoutRequest.FromString,
+                    response_serializer=google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'helloworld.Greeter', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+
+
+ # This class is part of an EXPERIMENTAL API.
+class Greeter(object):
+    """The greeting service definition.
+    """
+
+    @staticmethod
+    def SayHello(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/helloworld.Greeter/SayHello',
+            tests_dot_helloworld__pb2.HelloRequest.SerializeToString,
+            tests_dot_helloworld__pb2.HelloReply.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def HelloMetadata(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/helloworld.Greeter/HelloMetadata',
+            tests_dot_helloworld__pb2.HelloRequest.SerializeToString,
+            tests_dot_helloworld__pb2.HelloReply.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def HelloStreamMetadata(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/helloworld.Greeter/HelloStreamMetadata',
+            tests_dot_helloworld__pb2.HelloRequest.SerializeToString,
+            tests_dot_helloworld__pb2.HelloReply.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def SayHelloSlowly(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/helloworld.Greeter/SayHelloSlowly',
+            tests_dot_helloworld__pb2.HelloRequest.SerializeToString,
+            tests_dot_helloworld__pb2.HelloReply.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def Abort(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/helloworld.Greeter/Abort',
+            google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
+            google_dot_protobuf_dot_empty__pb2.Empty.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def UnaryTimeout(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/helloworld.Greeter/UnaryTimeout',
+            tests_dot_helloworld__pb2.TimeoutRequest.SerializeToString,
+            google_dot_protobuf_dot_empty__pb2.Empty.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def StreamTimeout(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/helloworld.Greeter/StreamTimeout',
+            tests_dot_helloworld__pb2.TimeoutRequest.SerializeToString,
+            google_dot_protobuf_dot_empty__pb2.Empty.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
@@ -0,0 +1,147 @@
+import asyncio
+
+import grpc
+import pytest
+
+import sonora.asgi
+from sonora import protocol
+from sonora.admission import ConcurrencyLimit
+from tests.conftest import asgi_call, asgi_status, make_app
+
+
+@pytest.mark.asyncio
+async def test_limit_queue_and_shed():
+    limit = ConcurrencyLimit(1, max_queued=1, max_wait=1)
+
+    assert await limit.acquire()
+
+    queued = asyncio.ensure_future(limit.acquire())
+    await asyncio.sleep(0)
+
+    assert not await limit.acquire()
+    assert limit.stats() == {
+        "in_flight": 1,
+        "waiting": 1,
+        "admitted": 1,
+        "queued": 1,
+        "shed": 1,
+    }
+
+    limit.release()
+
+    assert await queued
+    assert limit.in_flight == 1
+    assert limit.admitted == 2
+
+    limit.release()
+
+    assert limit.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_limit_wait_timeout():
+    limit = ConcurrencyLimit(1, max_queued=1, max_wait=0.01)
+
+    assert await limit.acquire()
+    assert not await limit.acquire()
+    assert limit.waiting == 0
+    assert limit.shed == 1
+
+    limit.release()
+
+    assert limit.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_limit_cancelled_while_queued():
+    limit = ConcurrencyLimit(1, max_queued=1, max_wait=1)
+
+    assert await limit.acquire()
+
+    queued = asyncio.ensure_future(limit.acquire())
+    await asyncio.sleep(0)
+    queued.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+
+    limit.release()
+
+    assert limit.in_flight == 0
+    assert limit.waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_limit_slot_handed_over_at_timeout(monkeypatch):
+    async def late_timeout(future, timeout):
+        # The slot arrives in the same loop iteration as the timeout.
+        await future
+        raise asyncio.TimeoutError()
+
+    limit = ConcurrencyLimit(1, max_queued=2, max_wait=1)
+
+    assert await limit.acquire()
+
+    monkeypatch.setattr(asyncio, "wait_for", late_timeout)
+    timed_out = asyncio.ensure_future(limit.acquire())
+    await asyncio.sleep(0)
+    monkeypatch.undo()
+
+    queued = asyncio.ensure_future(limit.acquire())
+    await asyncio.sleep(0)
+
+    limit.release()
+
+    assert not await timed_out
+    assert await queued
+    assert limit.in_flight == 1
+
+    limit.release()
+
+    assert limit.in_flight == 0
+
+
+@pytest.mark.parametrize("per_method", [False, True])
+@pytest.mark.asyncio
+async def test_asgi_sheds_excess_calls(per_method):
+    release = asyncio.Event()
+
+    async def handler(request, context):
+        await release.wait()
+        return b"done"
+
+    limit = ConcurrencyLimit(2, max_queued=1, max_wait=1)
+
+    if per_method:
+        kwargs = {"method_concurrency_limits": {"/test.Service/Method": limit}}
+    else:
+        kwargs = {"concurrency_limit": limit}
+
+    app = make_app(sonora.asgi.grpcASGI, handler, **kwargs)
+    request = protocol.wrap_message(False, False, b"")
+
+    calls = [asyncio.ensure_future(asgi_call(app, request)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+
+    events = await asgi_call(app, request)
+
+    assert asgi_status(events) == b"8"
+    assert events[-1]["more_body"] is False
+    assert limit.stats() == {
+        "in_flight": 2,
+        "waiting": 1,
+        "admitted": 2,
+        "queued": 1,
+        "shed": 1,
+    }
+
+    release.set()
+
+    for events in await asyncio.gather(*calls):
+        assert asgi_status(events) is None
+        assert events[-1]["body"] == protocol.pack_status_frame(
+            protocol.wrap_message, grpc.StatusCode.OK
+        )
+
+    assert limit.in_flight == 0
+    assert limit.admitted == 3
@@ -2,7 +2,7 @@ import grpc
 import pytest
 
 import sonora.aio
-from tests import helloworld_pb2, helloworld_pb2_grpc
+from tests import benchmark_pb2, helloworld_pb2, helloworld_pb2_grpc
 
 
 @pytest.mark.asyncio
@@ -49,3 +49,37 @@ async def test_helloworld_unarytimeout(asgi_greeter):
     with pytest.raises(grpc.RpcError) as exc:
         await asgi_greeter.UnaryTimeout(request, timeout=0)
     assert exc.value.code() == grpc.StatusCode.DEADLINE_EXCEEDED
+
+
+@pytest.mark.asyncio
+async def test_benchmark_streamingfromclient(asgi_benchmark):
+    async def requests():
+        for n in range(100):
+            yield benchmark_pb2.SimpleRequest(
+                payload=benchmark_pb2.Payload(body=b"%d" % n)
+            )
+
+    response = await asgi_benchmark.StreamingFromClient(requests())
+    assert response.payload.body == b"99"
+
+    response = await asgi_benchmark.StreamingFromClient(iter([]))
+    assert response.payload.body == b""
+
+
+@pytest.mark.asyncio
+async def test_benchmark_streamingbothways_read(asgi_benchmark):
+    requests = [
+        benchmark_pb2.SimpleRequest(payload=benchmark_pb2.Payload(body=b"%d" % n))
+        for n in range(10)
+    ]
+
+    buffer = []
+
+    with asgi_benchmark.StreamingBothWays(iter(requests)) as call:
+        response = await call.read()
+
+        while response:
+            buffer.append(response.payload.body)
+            response = await call.read()
+
+    assert buffer == [b"%d" % n for n in range(10)]
@@ -0,0 +1,89 @@
+import base64
+
+import grpc
+import pytest
+
+import sonora.asgi
+from sonora import protocol
+from sonora.asgi import ServicerContext
+from tests.conftest import asgi_call, asgi_status, make_app
+
+
+def test_invocation_metadata():
+    context = ServicerContext.from_headers(
+        [
+            (b"host", b"localhost"),
+            (b"grpc-timeout", b"1S"),
+            (b"content-type", b"application/grpc-web-text"),
+            (b"accept", b"application/grpc-web-text, */*"),
+            (b"x-token", b"honk"),
+            (b"x-token-bin", base64.b64encode(b"\0\1")),
+        ]
+    )
+
+    assert context.code is grpc.StatusCode.OK
+    assert 0 < context.time_remaining() <= 1
+    assert context._wrap_message is protocol.b64_wrap_message
+    assert context._response_headers == [
+        (b"Content-Type", b"application/grpc-web-text")
+    ]
+
+    metadata = context.invocation_metadata()
+
+    assert metadata == (
+        ("host", "localhost"),
+        ("content-type", "application/grpc-web-text"),
+        ("accept", "application/grpc-web-text, */*"),
+        ("x-token", "honk"),
+        ("x-token-bin", b"\0\1"),
+    )
+    assert context.invocation_metadata() is metadata
+
+
+def test_unsupported_encoding():
+    context = ServicerContext.from_headers(
+        [(b"host", b"localhost"), (b"grpc-encoding", b"br")]
+    )
+
+    assert context.code is grpc.StatusCode.UNIMPLEMENTED
+    assert context.time_remaining() is None
+
+
+def test_metadata_constructor():
+    metadata = (
+        ("host", "localhost"),
+        ("accept", "application/grpc-web-text"),
+        ("x-token", "honk"),
+    )
+    context = ServicerContext(1, metadata)
+
+    assert 0 < context.time_remaining() <= 1
+    assert context.invocation_metadata() == metadata
+    assert context._response_headers[0] == (
+        b"Content-Type",
+        b"application/grpc-web-text",
+    )
+    assert (b"Access-Control-Allow-Origin", b"localhost") in context._response_headers
+
+
+@pytest.mark.parametrize(
+    "timeout", [b"", b"10", b"10x", b"abcS", "1\u00e9S".encode("utf8")]
+)
+@pytest.mark.asyncio
+async def test_malformed_timeout(timeout):
+    calls = []
+
+    async def handler(request, context):
+        calls.append(request)
+        return b"a"
+
+    events = await asgi_call(
+        make_app(sonora.asgi.grpcASGI, handler),
+        protocol.wrap_message(False, False, b""),
+        headers=[(b"grpc-timeout", timeout)],
+    )
+
+    headers = dict(events[0]["headers"])
+    assert asgi_status(events) == b"13"
+    assert headers[b"grpc-message"] == b"Malformed%20grpc-timeout%20header"
+    assert calls == []
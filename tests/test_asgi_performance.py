@@ -3,7 +3,10 @@ import asyncio
 import pytest
 
 import sonora.aio
+import sonora.asgi
+from sonora import protocol
 from tests import benchmark_pb2, benchmark_pb2_grpc
+from tests.conftest import AsyncBenchmark, SyncBenchmark
 
 
 @pytest.mark.parametrize("size", [1, 100, 10000, 1000000])
@@ -21,6 +24,67 @@ def test_asgi_unarycall(asgi_benchmark, benchmark, event_loop, size):
     benchmark(perf)
 
 
+# Roughly what a browser sends along with a grpc-web call.
+_BROWSER_HEADERS = [
+    (b"connection", b"keep-alive"),
+    (b"content-length", b"7"),
+    (b"sec-ch-ua", b'"Chromium";v="118", "Not=A?Brand";v="99"'),
+    (b"x-grpc-web", b"1"),
+    (b"sec-ch-ua-mobile", b"?0"),
+    (b"authorization", b"Bearer " + b"x" * 300),
+    (b"user-agent", b"Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36"),
+    (b"x-user-agent", b"grpc-web-javascript/0.1"),
+    (b"accept", b"application/grpc-web+proto"),
+    (b"sec-ch-ua-platform", b'"Linux"'),
+    (b"origin", b"http://localhost:3000"),
+    (b"sec-fetch-site", b"same-site"),
+    (b"sec-fetch-mode", b"cors"),
+    (b"sec-fetch-dest", b"empty"),
+    (b"referer", b"http://localhost:3000/"),
+    (b"accept-encoding", b"gzip, deflate, br"),
+    (b"accept-language", b"en-US,en;q=0.9"),
+    (b"x-trace-bin", b"AAECAwQFBgcICQoLDA0ODw=="),
+]
+
+
+@pytest.mark.parametrize("servicer", [AsyncBenchmark, SyncBenchmark])
+@pytest.mark.parametrize("headers", ["minimal", "browser"])
+def test_asgi_unarycall_in_process(event_loop, benchmark, headers, servicer):
+    app = sonora.asgi.grpcASGI()
+    benchmark_pb2_grpc.add_BenchmarkServiceServicer_to_server(servicer(), app)
+
+    request = benchmark_pb2.SimpleRequest(response_size=1)
+    body = protocol.wrap_message(False, False, request.SerializeToString())
+
+    scope = {
+        "type": "http",
+        "path": "/benchmark.BenchmarkService/UnaryCall",
+        "method": "POST",
+        "headers": [
+            (b"host", b"localhost"),
+            (b"content-type", b"application/grpc-web+proto"),
+        ],
+    }
+
+    if headers == "browser":
+        scope["headers"] += _BROWSER_HEADERS
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(event):
+        pass
+
+    async def run():
+        for _ in range(1000):
+            await app(scope, receive, send)
+
+    def perf():
+        event_loop.run_until_complete(run())
+
+    benchmark(perf)
+
+
 @pytest.mark.parametrize("size", [1, 100, 10000, 1000000])
 def test_asgi_streamingfromserver(asgi_benchmark, event_loop, benchmark, size):
 
@@ -46,3 +110,133 @@ def test_asgi_streamingfromserver(asgi_benchmark, event_loop, benchmark, size):
         event_loop.run_until_complete(run())
 
     benchmark(perf)
+
+
+@pytest.mark.parametrize("coalesce", [False, True])
+def test_asgi_streamingfromserver_ticks(
+    asgi_benchmark, asgi_coalescing_benchmark, event_loop, benchmark, coalesce
+):
+    stub = asgi_coalescing_benchmark if coalesce else asgi_benchmark
+    chunk_count = 10000
+
+    request = benchmark_pb2.SimpleRequest(response_size=1)
+    request.payload.body = b"\0"
+
+    async def run():
+        n = 0
+
+        with stub.StreamingFromServer(request) as stream:
+            async for message in stream:
+                n += 1
+                if n >= chunk_count:
+                    break
+
+    def perf():
+        event_loop.run_until_complete(run())
+
+    benchmark(perf)
+
+
+@pytest.mark.parametrize("coalesce", [False, True])
+def test_asgi_streamingfromserver_ticks_in_process(event_loop, benchmark, coalesce):
+    app = sonora.asgi.grpcASGI(coalesce=coalesce)
+    benchmark_pb2_grpc.add_BenchmarkServiceServicer_to_server(AsyncBenchmark(), app)
+
+    chunk_count = 10000
+
+    request = benchmark_pb2.SimpleRequest(response_size=1)
+    request.payload.body = b"\0"
+
+    scope = {
+        "type": "http",
+        "path": "/benchmark.BenchmarkService/StreamingFromServer",
+        "method": "POST",
+        "headers": [
+            (b"host", b"localhost"),
+            (b"content-type", b"application/grpc-web+proto"),
+        ],
+    }
+
+    async def run():
+        body = [
+            {
+                "type": "http.request",
+                "body": protocol.wrap_message(
+                    False, False, request.SerializeToString()
+                ),
+                "more_body": False,
+            }
+        ]
+        frames = protocol.FrameDecoder()
+        disconnected = asyncio.Event()
+        received = 0
+
+        async def receive():
+            if body:
+                return body.pop(0)
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(event):
+            nonlocal received
+
+            received += len(frames.feed(event.get("body", b"")))
+            if received >= chunk_count:
+                disconnected.set()
+
+            # Let the disconnect watcher run, like a real server would when
+            # writing to the socket.
+            await asyncio.sleep(0)
+
+        await app(scope, receive, send)
+
+        assert received >= chunk_count
+
+    def perf():
+        event_loop.run_until_complete(run())
+
+    benchmark(perf)
+
+
+@pytest.mark.parametrize("size", [1, 100, 10000, 1000000])
+def test_asgi_streamingfromclient(asgi_benchmark, event_loop, benchmark, size):
+    chunk_count = max(10, 100000 // size)
+
+    request = benchmark_pb2.SimpleRequest()
+    request.payload.body = b"\0" * size
+
+    async def requests():
+        for _ in range(chunk_count):
+            yield request
+
+    async def run():
+        message = await asgi_benchmark.StreamingFromClient(requests())
+        assert len(message.payload.body) == size
+
+    def perf():
+        event_loop.run_until_complete(run())
+
+    benchmark(perf)
+
+
+@pytest.mark.parametrize("size", [1, 100, 10000, 1000000])
+def test_asgi_streamingbothways(asgi_benchmark, event_loop, benchmark, size):
+    chunk_count = max(10, 100000 // size)
+
+    request = benchmark_pb2.SimpleRequest()
+    request.payload.body = b"\0" * size
+
+    async def run():
+        recv_bytes = 0
+
+        async for message in asgi_benchmark.StreamingBothWays(
+            request for _ in range(chunk_count)
+        ):
+            recv_bytes += len(message.payload.body)
+
+        assert recv_bytes == size * chunk_count
+
+    def perf():
+        event_loop.run_until_complete(run())
+
+    benchmark(perf)
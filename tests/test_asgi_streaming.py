@@ -0,0 +1,226 @@
+import asyncio
+
+import grpc
+import pytest
+
+import sonora.asgi
+from sonora import protocol
+from tests.conftest import asgi_call, asgi_status, make_app
+
+
+async def _call(app, disconnect_after=None):
+    sent = []
+    disconnected = asyncio.Event()
+
+    async def send(event):
+        sent.append(event)
+        if disconnect_after is not None and len(sent) > disconnect_after:
+            disconnected.set()
+
+    await asgi_call(
+        app,
+        protocol.wrap_message(False, False, b""),
+        send=send,
+        disconnected=disconnected,
+    )
+
+    bodies = [event["body"] for event in sent if event["type"] == "http.response.body"]
+    frames = protocol.FrameDecoder().feed(b"".join(bodies))
+
+    return bodies, frames
+
+
+@pytest.mark.asyncio
+async def test_coalesced_burst():
+    async def burst(request, context):
+        for n in range(100):
+            yield b"%d" % n
+
+    bodies, frames = await _call(
+        make_app(
+            sonora.asgi.grpcASGI,
+            burst,
+            grpc.unary_stream_rpc_method_handler,
+            coalesce=True,
+            coalesce_max_delay=1,
+        )
+    )
+
+    assert [message for _, _, message in frames[:-1]] == [b"%d" % n for n in range(100)]
+    assert frames[-1][0]
+    assert len(bodies) == 1
+
+
+@pytest.mark.asyncio
+async def test_coalesced_sparse():
+    loop = asyncio.get_running_loop()
+    yielded = []
+    sent = []
+
+    async def sparse(request, context):
+        for n in range(3):
+            yielded.append(loop.time())
+            yield b"%d" % n
+            await asyncio.sleep(0.01)
+
+    async def send(event):
+        if event["type"] == "http.response.body":
+            sent.append(loop.time())
+
+    await asgi_call(
+        make_app(
+            sonora.asgi.grpcASGI,
+            sparse,
+            grpc.unary_stream_rpc_method_handler,
+            coalesce=True,
+            coalesce_max_delay=1,
+        ),
+        protocol.wrap_message(False, False, b""),
+        send=send,
+    )
+
+    # Each message goes out as soon as the handler waits, long before
+    # coalesce_max_delay.
+    assert len(sent) == 4
+    assert all(at - start < 0.5 for start, at in zip(yielded, sent))
+
+
+@pytest.mark.asyncio
+async def test_coalesced_max_bytes():
+    async def burst(request, context):
+        for n in range(100):
+            yield b"\0" * 100
+
+    bodies, frames = await _call(
+        make_app(
+            sonora.asgi.grpcASGI,
+            burst,
+            grpc.unary_stream_rpc_method_handler,
+            coalesce=True,
+            coalesce_max_bytes=1000,
+        )
+    )
+
+    assert len(frames) == 101
+    assert len(bodies) == 11
+
+
+@pytest.mark.parametrize("coalesce", [False, True])
+@pytest.mark.asyncio
+async def test_disconnect_closes_handler(coalesce):
+    closed = asyncio.Event()
+
+    async def forever(request, context):
+        try:
+            while True:
+                yield b"tick"
+                await asyncio.sleep(0.001)
+        finally:
+            closed.set()
+
+    app = make_app(
+        sonora.asgi.grpcASGI,
+        forever,
+        grpc.unary_stream_rpc_method_handler,
+        coalesce=coalesce,
+    )
+
+    bodies, frames = await asyncio.wait_for(_call(app, disconnect_after=5), 1)
+
+    assert closed.is_set()
+    assert all(not trailers for trailers, _, _ in frames)
+
+
+@pytest.mark.asyncio
+async def test_disconnect_while_handler_is_blocked():
+    closed = asyncio.Event()
+
+    async def stalled(request, context):
+        try:
+            yield b"tick"
+            await asyncio.sleep(3600)
+        finally:
+            closed.set()
+
+    app = make_app(sonora.asgi.grpcASGI, stalled, grpc.unary_stream_rpc_method_handler)
+
+    await asyncio.wait_for(_call(app, disconnect_after=1), 1)
+
+    assert closed.is_set()
+
+
+@pytest.mark.asyncio
+async def test_disconnect_mid_request_cancels_call():
+    received = []
+    finished = []
+
+    async def join(request_iterator, context):
+        async for request in request_iterator:
+            received.append(request)
+
+        finished.append(True)
+        return b"".join(received)
+
+    events = [
+        {
+            "type": "http.request",
+            "body": protocol.wrap_message(False, False, b"a"),
+            "more_body": True,
+        },
+        {"type": "http.disconnect"},
+    ]
+
+    async def receive():
+        return events.pop(0)
+
+    sent = []
+
+    async def send(event):
+        sent.append(event)
+
+    app = make_app(sonora.asgi.grpcASGI, join, grpc.stream_unary_rpc_method_handler)
+
+    await app(
+        {
+            "type": "http",
+            "path": "/test.Service/Method",
+            "method": "POST",
+            "headers": [
+                (b"host", b"localhost"),
+                (b"content-type", b"application/grpc-web+proto"),
+            ],
+        },
+        receive,
+        send,
+    )
+
+    assert received == [b"a"]
+    assert not finished
+    assert asgi_status(sent) == b"1"
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_unary_handler():
+    cancelled = asyncio.Event()
+
+    async def stalled(request, context):
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    disconnected = asyncio.Event()
+    asyncio.get_running_loop().call_later(0.05, disconnected.set)
+
+    events = await asyncio.wait_for(
+        asgi_call(
+            make_app(sonora.asgi.grpcASGI, stalled),
+            protocol.wrap_message(False, False, b""),
+            disconnected=disconnected,
+        ),
+        1,
+    )
+
+    assert cancelled.is_set()
+    assert events == []
@@ -0,0 +1,266 @@
+import asyncio
+import functools
+import threading
+import time
+
+import grpc
+import pytest
+
+import sonora.asgi
+from sonora import protocol
+from tests import helloworld_pb2
+from tests.conftest import asgi_call, asgi_frames, make_app
+
+
+@pytest.mark.asyncio
+async def test_sayhello(asgi_sync_greeter):
+    request = helloworld_pb2.HelloRequest(name="world")
+    response = await asgi_sync_greeter.SayHello(request)
+    assert response.message == "Hello, world!"
+
+
+@pytest.mark.asyncio
+async def test_sayhelloslowly(asgi_sync_greeter):
+    request = helloworld_pb2.HelloRequest(name="world")
+    response = asgi_sync_greeter.SayHelloSlowly(request)
+    message = "".join([r.message async for r in response])
+    assert message == "Hello, world!"
+
+
+@pytest.mark.asyncio
+async def test_abort(asgi_sync_greeter):
+    request = helloworld_pb2.HelloRequest(name="world")
+    with pytest.raises(grpc.RpcError) as exc:
+        await asgi_sync_greeter.Abort(request)
+    assert exc.value.code() == grpc.StatusCode.ABORTED
+    assert exc.value.details() == "test aborting"
+
+
+@pytest.mark.asyncio
+async def test_unary_metadata(asgi_sync_greeter):
+    request = helloworld_pb2.HelloRequest(name="metadata-key")
+    call = asgi_sync_greeter.HelloMetadata(request, metadata=[("metadata-key", "honk")])
+    result = await call
+    assert result.message == repr("honk")
+
+    initial_metadata = await call.initial_metadata()
+    trailing_metadata = await call.trailing_metadata()
+
+    assert dict(initial_metadata)["initial-metadata-key"] == repr("honk")
+    assert dict(trailing_metadata)["trailing-metadata-key"] == repr("honk")
+
+
+@pytest.mark.asyncio
+async def test_streamtimeout(asgi_sync_greeter):
+    request = helloworld_pb2.TimeoutRequest(seconds=0.1)
+    response = asgi_sync_greeter.StreamTimeout(request, timeout=0.001)
+
+    with pytest.raises(grpc.RpcError) as exc:
+        async for r in response:
+            pass
+    assert exc.value.code() == grpc.StatusCode.DEADLINE_EXCEEDED
+
+
+@pytest.mark.asyncio
+async def test_sync_stream_stream():
+    threads = set()
+
+    def echo(request_iterator, context):
+        for request in request_iterator:
+            threads.add(threading.current_thread())
+            yield request
+
+    app = make_app(sonora.asgi.grpcASGI, echo, grpc.stream_stream_rpc_method_handler)
+    body = [protocol.wrap_message(False, False, m) for m in (b"a", b"b", b"c")]
+
+    frames = asgi_frames(await asgi_call(app, body))
+
+    assert [message for _, _, message in frames[:-1]] == [b"a", b"b", b"c"]
+    assert frames[-1] == (True, False, b"grpc-status: 0\r\n")
+    assert threading.main_thread() not in threads
+
+
+@pytest.mark.asyncio
+async def test_sync_stream_unary():
+    def join(request_iterator, context):
+        return b"".join(request_iterator)
+
+    app = make_app(sonora.asgi.grpcASGI, join, grpc.stream_unary_rpc_method_handler)
+    body = [protocol.wrap_message(False, False, m) for m in (b"a", b"b", b"c")]
+
+    frames = asgi_frames(await asgi_call(app, body))
+
+    assert frames == [(False, False, b"abc"), (True, False, b"grpc-status: 0\r\n")]
+
+
+@pytest.mark.asyncio
+async def test_context_class_per_route():
+    contexts = []
+
+    def echo(request, context):
+        contexts.append(type(context))
+        return request
+
+    app = make_app(sonora.asgi.grpcASGI, echo)
+
+    for _ in range(2):
+        await asgi_call(app, protocol.wrap_message(False, False, b"a"))
+
+    assert contexts == [sonora.asgi.SyncServicerContext] * 2
+    assert app._context_classes == {
+        "/test.Service/Method": sonora.asgi.SyncServicerContext
+    }
+
+
+@pytest.mark.asyncio
+async def test_sync_stream_backpressure():
+    produced = 0
+    closed = threading.Event()
+
+    def count(request, context):
+        nonlocal produced
+
+        try:
+            while True:
+                produced += 1
+                yield b"x"
+        finally:
+            closed.set()
+
+    app = make_app(
+        sonora.asgi.grpcASGI,
+        count,
+        grpc.unary_stream_rpc_method_handler,
+        sync_stream_buffer=4,
+    )
+
+    disconnected = asyncio.Event()
+    received = 0
+
+    async def send(event):
+        nonlocal received
+
+        if event["type"] == "http.response.body":
+            received += 1
+            assert produced - received <= 6
+
+        if received == 100:
+            disconnected.set()
+
+        await asyncio.sleep(0.001)
+
+    await asgi_call(
+        app,
+        protocol.wrap_message(False, False, b""),
+        send=send,
+        disconnected=disconnected,
+    )
+
+    assert await asyncio.get_running_loop().run_in_executor(None, closed.wait, 1)
+
+
+@pytest.mark.asyncio
+async def test_sync_unary_disconnect():
+    stopped = threading.Event()
+    active = []
+
+    def wait(request, context):
+        give_up = time.monotonic() + 1
+
+        while context.is_active() and time.monotonic() < give_up:
+            time.sleep(0.01)
+
+        active.append(context.is_active())
+        stopped.set()
+        return b""
+
+    disconnected = asyncio.Event()
+    asyncio.get_running_loop().call_later(0.05, disconnected.set)
+
+    events = await asyncio.wait_for(
+        asgi_call(
+            make_app(sonora.asgi.grpcASGI, wait),
+            protocol.wrap_message(False, False, b""),
+            disconnected=disconnected,
+        ),
+        1,
+    )
+
+    assert events == []
+    assert await asyncio.get_running_loop().run_in_executor(None, stopped.wait, 2)
+    assert active == [False]
+
+
+@pytest.mark.asyncio
+async def test_sync_unary_deadline():
+    events = []
+
+    def slow(request, context):
+        time.sleep(0.2)
+        events.append(context.is_active())
+        return b""
+
+    app = make_app(sonora.asgi.grpcASGI, slow)
+
+    sent = await asgi_call(
+        app,
+        protocol.wrap_message(False, False, b""),
+        headers=[(b"grpc-timeout", b"50m")],
+    )
+
+    assert (b"grpc-status", b"4") in sent[0]["headers"]
+
+    await asyncio.sleep(0.3)
+
+    assert events == [False]
+
+
+def _logged(handler):
+    @functools.wraps(handler)
+    def wrapper(request, context):
+        return handler(request, context)
+
+    return wrapper
+
+
+def _unwrapped(handler):
+    def wrapper(request, context):
+        return handler(request, context)
+
+    return wrapper
+
+
+@pytest.mark.parametrize("decorator", [_logged, _unwrapped])
+@pytest.mark.asyncio
+async def test_decorated_async_unary(decorator):
+    @decorator
+    async def echo(request, context):
+        await context.send_initial_metadata([("x-async", "yes")])
+        return request
+
+    app = make_app(sonora.asgi.grpcASGI, echo)
+
+    frames = asgi_frames(
+        await asgi_call(app, protocol.wrap_message(False, False, b"a"))
+    )
+
+    assert frames == [(False, False, b"a"), (True, False, b"grpc-status: 0\r\n")]
+
+
+@pytest.mark.parametrize("decorator", [_logged, _unwrapped])
+@pytest.mark.asyncio
+async def test_decorated_async_stream(decorator):
+    @decorator
+    async def repeat(request, context):
+        for _ in range(3):
+            await asyncio.sleep(0)
+            yield request
+
+    app = make_app(sonora.asgi.grpcASGI, repeat, grpc.unary_stream_rpc_method_handler)
+
+    frames = asgi_frames(
+        await asgi_call(app, protocol.wrap_message(False, False, b"a"))
+    )
+
+    assert [message for _, _, message in frames[:-1]] == [b"a", b"a", b"a"]
+    assert frames[-1] == (True, False, b"grpc-status: 0\r\n")
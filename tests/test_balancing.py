@@ -0,0 +1,233 @@
+import collections
+import socketserver
+
+import grpc
+import pytest
+
+import sonora.aio
+import sonora.client
+import sonora.protocol
+import sonora.wsgi
+from sonora.balancing import CONSISTENT_HASH, LEAST_OUTSTANDING, Balancer
+
+
+def test_round_robin():
+    balancer = Balancer(["a:1", "http://b:2", "c:3"])
+
+    assert balancer.endpoints == ["http://a:1", "http://b:2", "http://c:3"]
+
+    picked = [balancer.choose().url for _ in range(6)]
+    assert sorted(picked) == sorted(balancer.endpoints * 2)
+    assert picked[:3] == picked[3:]
+
+
+def test_least_outstanding():
+    balancer = Balancer(["a:1", "b:2"], policy=LEAST_OUTSTANDING)
+
+    first = balancer.pick()
+    second = balancer.pick()
+    assert first is not second
+
+    balancer.done(first)
+    assert balancer.pick() is first
+    assert balancer.pick().outstanding == 2
+
+
+def test_consistent_hash():
+    urls = [f"host{i}:80" for i in range(5)]
+    balancer = Balancer(urls, policy=CONSISTENT_HASH, hash_key="user")
+
+    picked = {
+        user: balancer.choose([("user", user)]).url for user in map(str, range(50))
+    }
+    assert len(set(picked.values())) > 1
+
+    for user, url in picked.items():
+        assert balancer.choose([("user", user)]).url == url
+
+    # Only the keys of the endpoint that went away move.
+    gone = picked["0"]
+    balancer._update([url for url in urls if f"http://{url}" != gone])
+
+    for user, url in picked.items():
+        moved = balancer.choose([("user", user)]).url
+        assert moved == url or url == gone
+
+    with pytest.raises(ValueError):
+        Balancer(urls, policy=CONSISTENT_HASH)
+
+
+def _error(code):
+    return sonora.protocol.WebRpcError(code, "")
+
+
+def test_ejection():
+    balancer = Balancer(["a:1", "b:2"], max_failures=2, ejection_time=60)
+    a, b = balancer._endpoints
+
+    for _ in range(2):
+        balancer.done(a, _error(grpc.StatusCode.UNAVAILABLE))
+
+    assert {balancer.choose().url for _ in range(4)} == {b.url}
+
+    # Other errors are the server answering or the client's own doing, they
+    # neither count nor reset the count.
+    balancer.done(b, _error(grpc.StatusCode.DEADLINE_EXCEEDED))
+    balancer.done(b, _error(grpc.StatusCode.NOT_FOUND))
+    balancer.done(b, ValueError())
+    assert b.failures == 1
+
+    balancer.done(b, None)
+    assert b.failures == 0
+
+    balancer.done(b, _error(grpc.StatusCode.DEADLINE_EXCEEDED))
+    balancer.done(b, _error(grpc.StatusCode.UNAVAILABLE))
+
+    # With every endpoint ejected they are all used anyway.
+    assert {balancer.choose().url for _ in range(4)} == {a.url, b.url}
+
+
+def test_abandon():
+    balancer = Balancer(["a:1"], max_failures=2)
+    (a,) = balancer._endpoints
+
+    balancer.done(balancer.pick(), _error(grpc.StatusCode.UNAVAILABLE))
+    balancer.abandon(balancer.pick())
+
+    # A call without an outcome isn't a success that resets the count.
+    assert a.outstanding == 0
+    assert a.failures == 1
+
+
+def test_resolver():
+    results = [["a:1"], ["a:1", "b:2"]]
+
+    def resolve():
+        if not results:
+            raise OSError("DNS is down")
+        return results.pop(0)
+
+    balancer = Balancer(resolver=resolve, resolve_interval=60)
+
+    assert balancer.choose().url == "http://a:1"
+    first = balancer._endpoints[0]
+
+    balancer._next_resolve = 0
+    assert {balancer.choose().url for _ in range(2)} == {"http://a:1", "http://b:2"}
+    assert balancer._endpoints[0] is first
+
+    # A failing resolver leaves the endpoints as they were.
+    balancer._next_resolve = 0
+    balancer.choose()
+    assert balancer.endpoints == ["http://a:1", "http://b:2"]
+
+    with pytest.raises(ValueError):
+        Balancer()
+
+
+def _app(name, calls):
+    def echo(request, context):
+        calls[name] += 1
+        return name.encode()
+
+    app = sonora.wsgi.grpcWSGI()
+    app.add_generic_rpc_handlers(
+        [
+            grpc.method_handlers_generic_handler(
+                "test.Balanced",
+                {
+                    "Unary": grpc.unary_unary_rpc_method_handler(
+                        echo, request_deserializer=bytes, response_serializer=bytes
+                    ),
+                    "Stream": grpc.unary_stream_rpc_method_handler(
+                        lambda request, context: iter([echo(request, context)]),
+                        request_deserializer=bytes,
+                        response_serializer=bytes,
+                    ),
+                },
+            )
+        ]
+    )
+
+    return app
+
+
+@pytest.fixture
+def backends(serve_wsgi):
+    """
+    Two test.Balanced servers that answer with their name, along with a
+    count of the calls each got.
+    """
+    calls = collections.Counter()
+    ports = [serve_wsgi(_app(name, calls)) for name in ("a", "b")]
+
+    return [f"localhost:{port}" for port in ports], calls
+
+
+def _unused_port():
+    with socketserver.TCPServer(("localhost", 0), None) as server:
+        return server.server_address[1]
+
+
+def test_sync_balancing(backends):
+    urls, calls = backends
+
+    with sonora.client.WebChannel(urls) as channel:
+        unary = channel.unary_unary("/test.Balanced/Unary", bytes, bytes)
+        stream = channel.unary_stream("/test.Balanced/Stream", bytes, bytes)
+
+        assert {unary(b"") for _ in range(4)} == {b"a", b"b"}
+        assert {next(iter(stream(b""))) for _ in range(2)} == {b"a", b"b"}
+
+    assert calls == {"a": 3, "b": 3}
+
+
+def test_sync_ejection(backends):
+    urls, calls = backends
+    balancer = Balancer(urls + [f"localhost:{_unused_port()}"], max_failures=1)
+
+    with sonora.client.WebChannel(balancer) as channel:
+        unary = channel.unary_unary("/test.Balanced/Unary", bytes, bytes)
+
+        failed = 0
+        for _ in range(6):
+            try:
+                unary(b"")
+            except Exception:
+                failed += 1
+
+    assert failed == 1
+    assert sum(calls.values()) == 5
+
+
+@pytest.mark.asyncio
+async def test_async_balancing(backends):
+    urls, calls = backends
+    balancer = Balancer(urls, policy=LEAST_OUTSTANDING)
+
+    async with sonora.aio.WebChannel(balancer) as channel:
+        unary = channel.unary_unary("/test.Balanced/Unary", bytes, bytes)
+
+        assert {await unary(b"") for _ in range(4)} == {b"a", b"b"}
+        assert [endpoint.outstanding for endpoint in balancer._endpoints] == [0, 0]
+
+    assert calls == {"a": 2, "b": 2}
+
+
+@pytest.mark.asyncio
+async def test_async_ejection(backends):
+    urls, calls = backends
+    balancer = Balancer(urls + [f"localhost:{_unused_port()}"], max_failures=1)
+
+    async with sonora.aio.WebChannel(balancer) as channel:
+        unary = channel.unary_unary("/test.Balanced/Unary", bytes, bytes)
+
+        failed = 0
+        for _ in range(6):
+            try:
+                await unary(b"")
+            except Exception:
+                failed += 1
+
+    assert failed == 1
+    assert sum(calls.values()) == 5
@@ -0,0 +1,107 @@
+import concurrent.futures
+import time
+
+import grpc
+import pytest
+
+import sonora.client
+from tests import helloworld_pb2, helloworld_pb2_grpc
+
+
+def test_future_result(asgi_greeter_server):
+    with sonora.client.insecure_web_channel(
+        f"localhost:{asgi_greeter_server}"
+    ) as channel:
+        stub = helloworld_pb2_grpc.GreeterStub(channel)
+
+        done = []
+        future = stub.SayHello.future(helloworld_pb2.HelloRequest(name="future"))
+        future.add_done_callback(done.append)
+
+        assert future.result(timeout=5).message == "Hello, future!"
+        assert future.code() == grpc.StatusCode.OK
+        assert future.exception() is None
+        assert future.done() and not future.cancelled()
+        assert done == [future]
+
+
+def test_futures_run_concurrently(asgi_greeter_server):
+    with sonora.client.WebChannel(
+        f"localhost:{asgi_greeter_server}", max_workers=4
+    ) as channel:
+        stub = helloworld_pb2_grpc.GreeterStub(channel)
+        request = helloworld_pb2.TimeoutRequest(seconds=0.01)
+
+        start = time.perf_counter()
+        futures = [stub.UnaryTimeout.future(request, timeout=0.3) for _ in range(4)]
+
+        for future in futures:
+            assert future.code() == grpc.StatusCode.DEADLINE_EXCEEDED
+
+        assert time.perf_counter() - start < 0.9
+
+
+def test_future_deadline_while_queued(asgi_greeter_server):
+    with sonora.client.WebChannel(
+        f"localhost:{asgi_greeter_server}", max_workers=1
+    ) as channel:
+        stub = helloworld_pb2_grpc.GreeterStub(channel)
+        request = helloworld_pb2.TimeoutRequest(seconds=0.01)
+
+        running = stub.UnaryTimeout.future(request, timeout=0.5)
+        queued = stub.UnaryTimeout.future(request, timeout=0.1)
+
+        with pytest.raises(grpc.RpcError) as exc:
+            queued.result()
+
+        assert exc.value.code() == grpc.StatusCode.DEADLINE_EXCEEDED
+        assert not queued.cancelled()
+        assert running.running()
+
+        assert running.exception().code() == grpc.StatusCode.DEADLINE_EXCEEDED
+
+
+def test_future_cancel(asgi_greeter_server):
+    with sonora.client.WebChannel(
+        f"localhost:{asgi_greeter_server}", max_workers=1
+    ) as channel:
+        stub = helloworld_pb2_grpc.GreeterStub(channel)
+
+        running = stub.UnaryTimeout.future(
+            helloworld_pb2.TimeoutRequest(seconds=0.01), timeout=0.2
+        )
+        queued = stub.SayHello.future(helloworld_pb2.HelloRequest(name="never"))
+
+        done = []
+        queued.add_done_callback(done.append)
+
+        assert queued.cancel()
+        assert queued.cancelled()
+        assert queued.code() == grpc.StatusCode.CANCELLED
+        assert done == [queued]
+
+        with pytest.raises(grpc.FutureCancelledError):
+            queued.result()
+
+        with pytest.raises(grpc.FutureTimeoutError):
+            running.result(timeout=0.01)
+
+        assert not running.cancel()
+        assert running.code() == grpc.StatusCode.DEADLINE_EXCEEDED
+
+
+def test_future_running_past_deadline():
+    future = concurrent.futures.Future()
+    assert future.set_running_or_notify_cancel()
+
+    call = sonora.client._CallFuture(future, time.monotonic() - 1)
+
+    with pytest.raises(grpc.FutureTimeoutError):
+        call.result(timeout=0.01)
+
+    assert call._expired is None
+
+    future.set_result((b"late", None))
+
+    assert call.result() == b"late"
+    assert call.code() == grpc.StatusCode.OK
@@ -0,0 +1,175 @@
+import time
+
+import grpc
+import grpc.aio
+import pytest
+
+import sonora.aio
+import sonora.client
+from tests import helloworld_pb2, helloworld_pb2_grpc
+
+
+class _MetadataInterceptor(
+    grpc.UnaryUnaryClientInterceptor, grpc.UnaryStreamClientInterceptor
+):
+    """
+    Adds a header to every call and records how each one went.
+    """
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout
+        self.calls = []
+
+    def _details(self, client_call_details):
+        return sonora.client._ClientCallDetails(
+            client_call_details.method,
+            self.timeout or client_call_details.timeout,
+            [*(client_call_details.metadata or ()), ("metadata-key", "honk")],
+            None,
+            None,
+            None,
+        )
+
+    def intercept_unary_unary(self, continuation, client_call_details, request):
+        start = time.perf_counter()
+        outcome = continuation(self._details(client_call_details), request)
+        self.calls.append(
+            (client_call_details.method, outcome.code(), time.perf_counter() - start)
+        )
+        return outcome
+
+    def intercept_unary_stream(self, continuation, client_call_details, request):
+        for response in continuation(self._details(client_call_details), request):
+            self.calls.append((client_call_details.method, response.message))
+            yield response
+
+
+class _AsyncMetadataInterceptor(
+    grpc.aio.UnaryUnaryClientInterceptor, grpc.aio.UnaryStreamClientInterceptor
+):
+    def __init__(self, timeout=None):
+        self.timeout = timeout
+        self.calls = []
+
+    def _details(self, client_call_details):
+        client_call_details.metadata.add("metadata-key", "honk")
+
+        return client_call_details._replace(
+            timeout=self.timeout or client_call_details.timeout
+        )
+
+    async def intercept_unary_unary(self, continuation, client_call_details, request):
+        call = await continuation(self._details(client_call_details), request)
+
+        try:
+            await call
+        except grpc.RpcError as exc:
+            self.calls.append((client_call_details.method, exc.code()))
+        else:
+            self.calls.append((client_call_details.method, grpc.StatusCode.OK))
+
+        return call
+
+    async def intercept_unary_stream(self, continuation, client_call_details, request):
+        call = await continuation(self._details(client_call_details), request)
+
+        async for response in call:
+            self.calls.append((client_call_details.method, response.message))
+            yield response
+
+
+def test_sync_interceptors(wsgi_greeter_server):
+    interceptor = _MetadataInterceptor()
+
+    with sonora.client.insecure_web_channel(
+        f"localhost:{wsgi_greeter_server}", interceptors=[interceptor]
+    ) as channel:
+        stub = helloworld_pb2_grpc.GreeterStub(channel)
+
+        request = helloworld_pb2.HelloRequest(name="metadata-key")
+        result, call = stub.HelloMetadata.with_call(request)
+        assert result.message == repr("honk")
+        assert dict(call.trailing_metadata())["trailing-metadata-key"] == repr("honk")
+
+        message = "".join(
+            response.message
+            for response in stub.SayHelloSlowly(helloworld_pb2.HelloRequest(name="a"))
+        )
+        assert message == "Hello, a!"
+
+    method, code, _ = interceptor.calls[0]
+    assert (method, code) == ("/helloworld.Greeter/HelloMetadata", grpc.StatusCode.OK)
+    assert "".join(message for _, message in interceptor.calls[1:]) == message
+
+
+def test_sync_interceptor_deadline(wsgi_greeter_server):
+    interceptor = _MetadataInterceptor(timeout=0.001)
+
+    with sonora.client.insecure_web_channel(
+        f"localhost:{wsgi_greeter_server}", interceptors=[interceptor]
+    ) as channel:
+        stub = helloworld_pb2_grpc.GreeterStub(channel)
+
+        with pytest.raises(grpc.RpcError) as exc:
+            stub.UnaryTimeout(helloworld_pb2.TimeoutRequest(seconds=0.1))
+
+    assert exc.value.code() == grpc.StatusCode.DEADLINE_EXCEEDED
+    assert interceptor.calls[0][1] == grpc.StatusCode.DEADLINE_EXCEEDED
+
+
+def test_interceptors_only_apply_to_their_calls():
+    class StreamOnly(grpc.UnaryStreamClientInterceptor):
+        def intercept_unary_stream(self, continuation, client_call_details, request):
+            return continuation(client_call_details, request)
+
+    channel = sonora.client.WebChannel("localhost:1", interceptors=[StreamOnly()])
+
+    assert channel.unary_unary("/a/b", None, None)._intercepted is None
+    assert channel.unary_stream("/a/b", None, None)._intercepted is not None
+
+
+@pytest.mark.asyncio
+async def test_async_interceptors(asgi_greeter_server):
+    interceptor = _AsyncMetadataInterceptor()
+
+    async with sonora.aio.insecure_web_channel(
+        f"localhost:{asgi_greeter_server}", interceptors=[interceptor]
+    ) as channel:
+        stub = helloworld_pb2_grpc.GreeterStub(channel)
+
+        request = helloworld_pb2.HelloRequest(name="metadata-key")
+        call = stub.HelloMetadata(request)
+        result = await call
+        assert result.message == repr("honk")
+        assert dict(await call.trailing_metadata())["trailing-metadata-key"] == repr(
+            "honk"
+        )
+
+        with stub.SayHelloSlowly(helloworld_pb2.HelloRequest(name="a")) as call:
+            message = "".join([response.message async for response in call])
+        assert message == "Hello, a!"
+
+        call = stub.SayHelloSlowly(helloworld_pb2.HelloRequest(name="b"))
+        assert (await call.read()).message == "H"
+
+    assert interceptor.calls[0] == (
+        "/helloworld.Greeter/HelloMetadata",
+        grpc.StatusCode.OK,
+    )
+    assert "".join(message for _, message in interceptor.calls[1:10]) == message
+
+
+@pytest.mark.asyncio
+async def test_async_interceptor_deadline(asgi_greeter_server):
+    interceptor = _AsyncMetadataInterceptor(timeout=0.001)
+
+    async with sonora.aio.insecure_web_channel(
+        f"localhost:{asgi_greeter_server}", interceptors=[interceptor]
+    ) as channel:
+        stub = helloworld_pb2_grpc.GreeterStub(channel)
+
+        with pytest.raises(grpc.RpcError) as exc:
+            await stub.UnaryTimeout(helloworld_pb2.TimeoutRequest(seconds=0.1))
+
+    assert exc.value.code() == grpc.StatusCode.DEADLINE_EXCEEDED
+    assert interceptor.calls[0][1] == grpc.StatusCode.DEADLINE_EXCEEDED
@@ -0,0 +1,162 @@
+import asyncio
+import time
+
+import grpc
+import pytest
+
+import sonora.aio
+import sonora.client
+from tests import helloworld_pb2, helloworld_pb2_grpc
+
+
+def _say_hello(stub, name="pool"):
+    return stub.SayHello(helloworld_pb2.HelloRequest(name=name)).message
+
+
+def test_sync_pool_stats(wsgi_greeter_server):
+    with sonora.client.WebChannel(f"localhost:{wsgi_greeter_server}") as channel:
+        stub = helloworld_pb2_grpc.GreeterStub(channel)
+
+        for _ in range(3):
+            assert _say_hello(stub) == "Hello, pool!"
+
+        assert channel.stats() == {
+            "open": 1,
+            "idle": 1,
+            "in_use": 0,
+            "created": 1,
+            "reused": 2,
+        }
+
+
+def test_sync_idle_timeout(wsgi_greeter_server):
+    with sonora.client.WebChannel(
+        f"localhost:{wsgi_greeter_server}", idle_timeout=0.05
+    ) as channel:
+        stub = helloworld_pb2_grpc.GreeterStub(channel)
+
+        _say_hello(stub)
+        _say_hello(stub)
+        time.sleep(0.1)
+        _say_hello(stub)
+
+        stats = channel.stats()
+
+    assert (stats["created"], stats["reused"], stats["open"]) == (2, 1, 1)
+
+
+def test_sync_shared_pool_manager(wsgi_greeter_server):
+    pool_manager = sonora.client.PoolManager(maxsize=2)
+    url = f"localhost:{wsgi_greeter_server}"
+
+    with sonora.client.WebChannel(url, pool_manager=pool_manager) as channel:
+        _say_hello(helloworld_pb2_grpc.GreeterStub(channel))
+
+    with sonora.client.WebChannel(url, pool_manager=pool_manager) as channel:
+        _say_hello(helloworld_pb2_grpc.GreeterStub(channel))
+
+        assert channel.stats() == pool_manager.stats()
+
+    assert pool_manager.stats()["created"] == 1
+    assert pool_manager.stats()["reused"] == 1
+
+    pool_manager.clear()
+
+
+def test_sync_blocking_pool(asgi_greeter_server):
+    with sonora.client.WebChannel(
+        f"localhost:{asgi_greeter_server}",
+        max_workers=2,
+        pool_maxsize=1,
+        pool_block=True,
+    ) as channel:
+        stub = helloworld_pb2_grpc.GreeterStub(channel)
+
+        slow = stub.UnaryTimeout.future(
+            helloworld_pb2.TimeoutRequest(seconds=0.01), timeout=0.5
+        )
+        time.sleep(0.05)
+
+        with pytest.raises(grpc.RpcError) as exc:
+            stub.SayHello(helloworld_pb2.HelloRequest(name="pool"), timeout=0.1)
+
+        assert exc.value.code() == grpc.StatusCode.DEADLINE_EXCEEDED
+        assert slow.code() == grpc.StatusCode.DEADLINE_EXCEEDED
+
+        futures = [
+            stub.SayHello.future(helloworld_pb2.HelloRequest(name="pool"))
+            for _ in range(4)
+        ]
+        for future in futures:
+            assert future.result().message == "Hello, pool!"
+
+        assert channel.stats()["open"] == 1
+
+
+def test_sync_in_use_stats(asgi_greeter_server):
+    with sonora.client.WebChannel(f"localhost:{asgi_greeter_server}") as channel:
+        stub = helloworld_pb2_grpc.GreeterStub(channel)
+
+        slow = stub.UnaryTimeout.future(
+            helloworld_pb2.TimeoutRequest(seconds=0.01), timeout=0.3
+        )
+        time.sleep(0.1)
+
+        assert (channel.stats()["open"], channel.stats()["in_use"]) == (1, 1)
+        assert slow.code() == grpc.StatusCode.DEADLINE_EXCEEDED
+        assert channel.stats()["in_use"] == 0
+
+
+@pytest.mark.asyncio
+async def test_async_pool_stats(asgi_greeter_server):
+    async with sonora.aio.WebChannel(f"localhost:{asgi_greeter_server}") as channel:
+        stub = helloworld_pb2_grpc.GreeterStub(channel)
+
+        for _ in range(3):
+            await stub.SayHello(helloworld_pb2.HelloRequest(name="pool"))
+
+        assert channel.stats() == {
+            "open": 1,
+            "idle": 1,
+            "in_use": 0,
+            "created": 1,
+            "reused": 2,
+        }
+
+
+@pytest.mark.asyncio
+async def test_async_shared_connector(asgi_greeter_server):
+    connector = sonora.aio.Connector(limit=1)
+    url = f"localhost:{asgi_greeter_server}"
+
+    async with sonora.aio.WebChannel(url, connector=connector) as channel:
+        stub = helloworld_pb2_grpc.GreeterStub(channel)
+        await stub.SayHello(helloworld_pb2.HelloRequest(name="pool"))
+
+    async with sonora.aio.WebChannel(url, connector=connector) as channel:
+        stub = helloworld_pb2_grpc.GreeterStub(channel)
+        await stub.SayHello(helloworld_pb2.HelloRequest(name="pool"))
+
+        stats = channel.stats()
+
+    assert (stats["open"], stats["created"], stats["reused"]) == (1, 1, 1)
+
+    await connector.close()
+
+
+@pytest.mark.asyncio
+async def test_async_in_use_stats(asgi_greeter_server):
+    async with sonora.aio.WebChannel(f"localhost:{asgi_greeter_server}") as channel:
+        stub = helloworld_pb2_grpc.GreeterStub(channel)
+
+        slow = asyncio.ensure_future(
+            stub.UnaryTimeout(helloworld_pb2.TimeoutRequest(seconds=0.01), timeout=0.3)
+        )
+        await asyncio.sleep(0.1)
+
+        assert (channel.stats()["open"], channel.stats()["in_use"]) == (1, 1)
+
+        with pytest.raises(grpc.RpcError):
+            await slow
+
+        assert channel.stats()["in_use"] == 0
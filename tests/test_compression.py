@@ -0,0 +1,270 @@
+import concurrent.futures
+import types
+
+import grpc
+import pytest
+
+import sonora.asgi
+import sonora.client
+import sonora.compression
+import sonora.protocol
+import sonora.wsgi
+from tests import helloworld_pb2
+from tests.conftest import asgi_call, asgi_status, make_app, wsgi_call
+
+
+@pytest.mark.parametrize("name", ["gzip", "deflate", "zstd"])
+def test_codec_roundtrip(name):
+    try:
+        codec = sonora.compression.get_codec(name)
+    except KeyError:
+        pytest.skip(f"{name} is not available")
+
+    data = b"Tyger Tyger, burning bright," * 100
+    compressed = codec.compress(data)
+
+    assert len(compressed) < len(data)
+    assert codec.decompress(compressed) == data
+
+
+@pytest.mark.parametrize("name", ["gzip", "deflate", "zstd"])
+def test_codec_max_length(name):
+    try:
+        codec = sonora.compression.get_codec(name)
+    except KeyError:
+        pytest.skip(f"{name} is not available")
+
+    data = b"\0" * 1024 * 1024
+    compressed = codec.compress(data)
+
+    assert codec.decompress(compressed, max_length=len(data)) == data
+
+    with pytest.raises(sonora.protocol.MessageTooLargeError):
+        codec.decompress(compressed, max_length=1024)
+
+
+def test_zstd_codec_threads():
+    try:
+        codec = sonora.compression.get_codec("zstd")
+    except KeyError:
+        pytest.skip("zstd is not available")
+
+    def roundtrip(i):
+        data = str(i).encode() * 10000
+        return codec.decompress(codec.compress(data)) == data
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        assert all(executor.map(roundtrip, range(200)))
+
+
+def test_resolve():
+    assert sonora.compression.resolve(None) is None
+    assert sonora.compression.resolve(grpc.Compression.NoCompression) is None
+    assert sonora.compression.resolve(grpc.Compression.Gzip).name == "gzip"
+    assert sonora.compression.resolve("deflate").name == "deflate"
+
+    with pytest.raises(KeyError):
+        sonora.compression.resolve("lzma")
+
+
+def test_negotiate():
+    gzip = sonora.compression.get_codec("gzip")
+
+    assert sonora.compression.negotiate(gzip, "identity, gzip") is gzip
+    assert sonora.compression.negotiate(gzip, "identity,deflate") is None
+    assert sonora.compression.negotiate(gzip, None) is None
+    assert sonora.compression.negotiate(None, "gzip") is None
+
+
+def test_wsgi_compressed_unary(wsgi_gzip_greeter):
+    name = "world" * 1000
+    request = helloworld_pb2.HelloRequest(name=name)
+
+    result, call = wsgi_gzip_greeter.SayHello.with_call(request)
+
+    assert name in result.message
+    assert dict(call.initial_metadata())["grpc-encoding"] == "gzip"
+
+
+def test_wsgi_compressed_stream(wsgi_gzip_greeter):
+    name = "world" * 1000
+    request = helloworld_pb2.HelloRequest(name=name)
+
+    response = wsgi_gzip_greeter.SayHelloSlowly(request)
+    message = "".join(r.message for r in response)
+
+    assert name in message
+
+
+def test_wsgi_small_messages_are_not_compressed(wsgi_gzip_greeter):
+    request = helloworld_pb2.HelloRequest(name="world")
+    result = wsgi_gzip_greeter.SayHello(request)
+
+    assert "world" in result.message
+
+
+@pytest.mark.asyncio
+async def test_asgi_compressed_unary(asgi_gzip_greeter):
+    name = "world" * 1000
+    request = helloworld_pb2.HelloRequest(name=name)
+
+    call = asgi_gzip_greeter.SayHello(request)
+    result = await call
+
+    assert name in result.message
+    assert dict(await call.initial_metadata())["grpc-encoding"] == "gzip"
+
+
+@pytest.mark.asyncio
+async def test_asgi_compressed_stream(asgi_gzip_greeter):
+    name = "world" * 1000
+    request = helloworld_pb2.HelloRequest(name=name)
+
+    response = asgi_gzip_greeter.SayHelloSlowly(request)
+    message = "".join([r.message async for r in response])
+
+    assert name in message
+
+
+@pytest.mark.asyncio
+async def test_asgi_unsupported_request_encoding():
+    app = sonora.asgi.grpcASGI()
+    app.add_generic_rpc_handlers(
+        [
+            grpc.method_handlers_generic_handler(
+                "test.Service",
+                {
+                    "Method": grpc.unary_unary_rpc_method_handler(
+                        lambda request, context: request
+                    )
+                },
+            )
+        ]
+    )
+
+    body = [{"type": "http.request", "body": b"", "more_body": False}]
+    sent = []
+
+    async def receive():
+        return body.pop(0)
+
+    async def send(event):
+        sent.append(event)
+
+    await app(
+        {
+            "type": "http",
+            "path": "/test.Service/Method",
+            "method": "POST",
+            "headers": [
+                (b"host", b"localhost"),
+                (b"content-type", b"application/grpc-web+proto"),
+                (b"grpc-encoding", b"lzma"),
+            ],
+        },
+        receive,
+        send,
+    )
+
+    headers = dict(sent[0]["headers"])
+    assert (
+        headers[b"grpc-status"] == str(grpc.StatusCode.UNIMPLEMENTED.value[0]).encode()
+    )
+    assert b"gzip" in headers[b"grpc-accept-encoding"]
+
+
+def _compressed_bomb():
+    message = sonora.compression.get_codec("gzip").compress(b"\0" * 10 * 1024 * 1024)
+    return sonora.protocol.wrap_message(False, True, message)
+
+
+def test_wsgi_decompressed_size_limit():
+    app = make_app(
+        sonora.wsgi.grpcWSGI,
+        lambda request, context: b"",
+        max_receive_message_length=1024,
+    )
+
+    _, _, data = wsgi_call(
+        app, _compressed_bomb(), environ={"HTTP_GRPC_ENCODING": "gzip"}
+    )
+    frames = sonora.protocol.FrameDecoder().feed(data)
+
+    assert b"grpc-status: 8\r\n" in frames[-1][2]
+
+
+@pytest.mark.asyncio
+async def test_asgi_decompressed_size_limit():
+    app = make_app(
+        sonora.asgi.grpcASGI,
+        lambda request, context: b"",
+        max_receive_message_length=1024,
+    )
+
+    events = await asgi_call(
+        app, _compressed_bomb(), headers=[(b"grpc-encoding", b"gzip")]
+    )
+
+    assert asgi_status(events) == b"8"
+
+
+def _corrupt(name):
+    try:
+        codec = sonora.compression.get_codec(name)
+    except KeyError:
+        pytest.skip(f"{name} is not available")
+
+    message = codec.compress(b"x" * 1024)
+    return sonora.protocol.wrap_message(False, True, message[:4] + b"\xff" * 16)
+
+
+@pytest.mark.parametrize("name", ["gzip", "deflate", "zstd"])
+def test_wsgi_corrupt_message(name):
+    app = make_app(sonora.wsgi.grpcWSGI, lambda request, context: b"")
+
+    status, _, data = wsgi_call(
+        app, _corrupt(name), environ={"HTTP_GRPC_ENCODING": name}
+    )
+    frames = sonora.protocol.FrameDecoder().feed(data)
+
+    assert status == "200 OK"
+    assert b"grpc-status: 13\r\n" in frames[-1][2]
+    assert b"Could%20not%20decompress%20message" in frames[-1][2]
+
+
+@pytest.mark.parametrize("name", ["gzip", "deflate", "zstd"])
+@pytest.mark.asyncio
+async def test_asgi_corrupt_message(name):
+    app = make_app(sonora.asgi.grpcASGI, lambda request, context: b"")
+
+    events = await asgi_call(
+        app, _corrupt(name), headers=[(b"grpc-encoding", name.encode())]
+    )
+
+    assert asgi_status(events) == b"13"
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+def test_client_received_size_limit(compressed):
+    call = sonora.client.Call(
+        None,
+        None,
+        [],
+        "http://localhost/test.Service/Method",
+        None,
+        None,
+        bytes,
+        max_receive_message_length=1024,
+    )
+    call._response = types.SimpleNamespace(headers={"grpc-encoding": "gzip"})
+    codec = sonora.compression.get_codec("gzip")
+
+    def message(data):
+        return codec.compress(data) if compressed else data
+
+    assert call._deserialize(compressed, message(b"x" * 1024)) == b"x" * 1024
+
+    with pytest.raises(sonora.protocol.WebRpcError) as exc_info:
+        call._deserialize(compressed, message(b"\0" * 10 * 1024 * 1024))
+
+    assert exc_info.value.code() == grpc.StatusCode.RESOURCE_EXHAUSTED
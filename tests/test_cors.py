@@ -0,0 +1,136 @@
+import pytest
+
+import sonora.asgi
+import sonora.wsgi
+from sonora.cors import CORSPolicy
+from tests.conftest import asgi_call, make_app, wsgi_call
+
+
+def _headers(headers):
+    return {name.lower(): value for name, value in headers}
+
+
+def test_default_policy_echoes_host():
+    headers = CORSPolicy().match("https://elsewhere.example", "localhost:8080")
+
+    assert _headers(headers.wsgi_response) == {
+        "access-control-allow-origin": "localhost:8080",
+        "access-control-expose-headers": "*",
+    }
+    assert _headers(headers.preflight)[b"access-control-max-age"] == b"7200"
+
+
+@pytest.mark.parametrize(
+    "origin, allowed",
+    [
+        ("https://app.example.com", True),
+        ("https://api.example.com", True),
+        ("https://example.com", False),
+        ("https://evil-example.com", False),
+        ("http://localhost:3000", True),
+        ("http://localhost:3000.evil.com", False),
+        ("https://other.org", True),
+        ("https://sub.other.org", False),
+        (None, False),
+    ],
+)
+def test_origin_matching(origin, allowed):
+    policy = CORSPolicy(
+        origins=["https://other.org"],
+        origin_suffixes=[".example.com"],
+        origin_regex=r"http://localhost:\d+",
+    )
+
+    headers = _headers(policy.match(origin, "localhost").response)
+
+    if allowed:
+        assert headers[b"access-control-allow-origin"] == origin.encode()
+        assert headers[b"vary"] == b"Origin"
+    else:
+        assert headers == {}
+
+
+def test_match_is_cached():
+    policy = CORSPolicy(origins=["https://a.example"], max_age=None)
+
+    headers = policy.match("https://a.example", None)
+
+    assert policy.match("https://a.example", None) is headers
+    assert b"access-control-allow-credentials" not in _headers(headers.preflight)
+    assert b"access-control-max-age" not in _headers(headers.preflight)
+
+
+def test_any_origin():
+    policy = CORSPolicy(origins=["*"])
+
+    headers = policy.match("https://a.example", None)
+
+    assert policy.match("https://b.example", None) is headers
+    assert _headers(headers.response) == {
+        b"access-control-allow-origin": b"*",
+        b"access-control-expose-headers": b"*",
+    }
+
+    with pytest.raises(ValueError):
+        CORSPolicy(origins=["*"], allow_credentials=True)
+
+
+def test_allow_credentials():
+    policy = CORSPolicy(origins=["https://a.example"], allow_credentials=True)
+
+    headers = policy.match("https://a.example", None)
+
+    assert _headers(headers.response)[b"access-control-allow-credentials"] == b"true"
+    assert _headers(headers.preflight)[b"access-control-allow-credentials"] == b"true"
+
+
+def _echo(request, context):
+    return request
+
+
+async def _async_echo(request, context):
+    return request
+
+
+@pytest.mark.parametrize("method", ["OPTIONS", "POST"])
+def test_wsgi_cors(method):
+    app = make_app(
+        sonora.wsgi.grpcWSGI, _echo, cors=CORSPolicy(origins=["https://a.example"])
+    )
+
+    _, headers, _ = wsgi_call(
+        app, method=method, environ={"HTTP_ORIGIN": "https://a.example"}
+    )
+
+    headers = _headers(headers)
+    assert headers["access-control-allow-origin"] == "https://a.example"
+    assert ("access-control-max-age" in headers) == (method == "OPTIONS")
+
+
+@pytest.mark.parametrize("method", ["OPTIONS", "POST"])
+def test_enable_cors_allows_credentials(method):
+    app = make_app(sonora.wsgi.grpcWSGI, _echo)
+
+    _, headers, _ = wsgi_call(app, method=method)
+
+    headers = _headers(headers)
+    assert headers["access-control-allow-origin"] == "localhost"
+    assert headers["access-control-allow-credentials"] == "true"
+
+
+@pytest.mark.parametrize("method", ["OPTIONS", "POST"])
+@pytest.mark.asyncio
+async def test_asgi_cors(method):
+    app = make_app(
+        sonora.asgi.grpcASGI,
+        _async_echo,
+        cors=CORSPolicy(origins=["https://a.example"]),
+    )
+
+    events = await asgi_call(
+        app, method=method, headers=[(b"origin", b"https://a.example")]
+    )
+
+    headers = _headers(events[0]["headers"])
+    assert headers[b"access-control-allow-origin"] == b"https://a.example"
+    assert (b"access-control-max-age" in headers) == (method == "OPTIONS")
@@ -0,0 +1,234 @@
+import asyncio
+
+import grpc
+import pytest
+
+import sonora.asgi
+import sonora.wsgi
+from sonora import protocol
+from tests.conftest import asgi_call, asgi_status, wsgi_call
+
+
+class _AuthInterceptor(grpc.ServerInterceptor):
+    """
+    Requires an x-token header on the methods of test.Private.
+    """
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+
+        if not handler_call_details.method.startswith("/test.Private/"):
+            return handler
+
+        behaviour = handler.unary_unary
+
+        def check(request, context):
+            if dict(context.invocation_metadata()).get("x-token") != "honk":
+                context.abort(grpc.StatusCode.UNAUTHENTICATED, "no token")
+
+            return behaviour(request, context)
+
+        return grpc.unary_unary_rpc_method_handler(
+            check,
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer,
+        )
+
+
+class _AsyncAuthInterceptor(grpc.aio.ServerInterceptor):
+    async def intercept_service(self, continuation, handler_call_details):
+        handler = await continuation(handler_call_details)
+
+        if not handler_call_details.method.startswith("/test.Private/"):
+            return handler
+
+        behaviour = handler.unary_unary
+
+        async def check(request, context):
+            if dict(context.invocation_metadata()).get("x-token") != "honk":
+                await context.abort(grpc.StatusCode.UNAUTHENTICATED, "no token")
+
+            return await behaviour(request, context)
+
+        return grpc.unary_unary_rpc_method_handler(
+            check,
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer,
+        )
+
+
+def _deny(request, context):
+    context.abort(grpc.StatusCode.UNAUTHENTICATED, "no token")
+
+
+_DENIED = grpc.unary_unary_rpc_method_handler(
+    _deny, request_deserializer=bytes, response_serializer=bytes
+)
+
+
+class _HeaderValidatorInterceptor(grpc.ServerInterceptor):
+    """
+    Turns away calls without an x-token header, going by the handler call
+    details alone.
+    """
+
+    def intercept_service(self, continuation, handler_call_details):
+        if ("x-token", "honk") in handler_call_details.invocation_metadata:
+            return continuation(handler_call_details)
+
+        return _DENIED
+
+
+class _AsyncHeaderValidatorInterceptor(grpc.aio.ServerInterceptor):
+    async def intercept_service(self, continuation, handler_call_details):
+        # A token lookup, say.
+        await asyncio.sleep(0)
+
+        if ("x-token", "honk") in handler_call_details.invocation_metadata:
+            return await continuation(handler_call_details)
+
+        return _DENIED
+
+
+class _RejectingInterceptor(grpc.ServerInterceptor):
+    def intercept_service(self, continuation, handler_call_details):
+        if handler_call_details.method.startswith("/test.Private/"):
+            return None
+
+        return continuation(handler_call_details)
+
+
+class _AsyncRejectingInterceptor(grpc.aio.ServerInterceptor):
+    async def intercept_service(self, continuation, handler_call_details):
+        if handler_call_details.method.startswith("/test.Private/"):
+            return None
+
+        return await continuation(handler_call_details)
+
+
+_REQUEST = protocol.wrap_message(False, False, b"hi")
+
+
+def _handlers(echo):
+    return [
+        grpc.method_handlers_generic_handler(
+            service,
+            {
+                "Method": grpc.unary_unary_rpc_method_handler(
+                    echo, request_deserializer=bytes, response_serializer=bytes
+                )
+            },
+        )
+        for service in ("test.Public", "test.Private")
+    ]
+
+
+def _wsgi_call(app, path, token=None):
+    environ = {} if token is None else {"HTTP_X_TOKEN": token}
+    _, _, data = wsgi_call(app, _REQUEST, path, environ=environ)
+
+    return protocol.FrameDecoder().feed(data)
+
+
+def test_wsgi_interceptors():
+    app = sonora.wsgi.grpcWSGI(interceptors=[_AuthInterceptor()])
+    app.add_generic_rpc_handlers(_handlers(lambda request, context: request))
+
+    assert _wsgi_call(app, "/test.Public/Method")[0] == (False, False, b"hi")
+    assert _wsgi_call(app, "/test.Private/Method", "honk")[0] == (False, False, b"hi")
+
+    frames = _wsgi_call(app, "/test.Private/Method")
+    assert frames == [(True, False, b"grpc-status: 16\r\ngrpc-message: no%20token\r\n")]
+
+
+def test_wsgi_interceptors_see_metadata():
+    app = sonora.wsgi.grpcWSGI(
+        interceptors=[_HeaderValidatorInterceptor()], intercept_per_method=False
+    )
+    app.add_generic_rpc_handlers(_handlers(lambda request, context: request))
+
+    assert _wsgi_call(app, "/test.Public/Method", "honk")[0] == (False, False, b"hi")
+
+    for token in (None, "goose"):
+        frames = _wsgi_call(app, "/test.Public/Method", token)
+        assert frames == [
+            (True, False, b"grpc-status: 16\r\ngrpc-message: no%20token\r\n")
+        ]
+
+
+def test_wsgi_rejected_calls():
+    app = sonora.wsgi.grpcWSGI(interceptors=[_RejectingInterceptor()])
+    app.add_generic_rpc_handlers(_handlers(lambda request, context: request))
+
+    assert _wsgi_call(app, "/test.Public/Method")[0] == (False, False, b"hi")
+
+    frames = _wsgi_call(app, "/test.Private/Method")
+    assert frames == [
+        (True, False, b"grpc-status: 12\r\ngrpc-message: Method%20not%20found%21\r\n")
+    ]
+
+
+async def _asgi_call(app, path, token=None):
+    headers = [] if token is None else [(b"x-token", token)]
+    events = await asgi_call(app, _REQUEST, path, headers=headers)
+
+    return asgi_status(events), events
+
+
+@pytest.mark.asyncio
+async def test_asgi_interceptors():
+    async def echo(request, context):
+        return request
+
+    app = sonora.asgi.grpcASGI(interceptors=[_AsyncAuthInterceptor()])
+    app.add_generic_rpc_handlers(_handlers(echo))
+
+    status, events = await _asgi_call(app, "/test.Public/Method")
+    assert status is None
+    assert events[1]["body"] == protocol.wrap_message(False, False, b"hi")
+
+    status, _ = await _asgi_call(app, "/test.Private/Method", b"honk")
+    assert status is None
+
+    status, _ = await _asgi_call(app, "/test.Private/Method")
+    assert status == b"16"
+
+
+@pytest.mark.asyncio
+async def test_asgi_interceptors_see_metadata():
+    async def echo(request, context):
+        return request
+
+    app = sonora.asgi.grpcASGI(
+        interceptors=[_AsyncHeaderValidatorInterceptor()], intercept_per_method=False
+    )
+    app.add_generic_rpc_handlers(_handlers(echo))
+
+    status, events = await _asgi_call(app, "/test.Public/Method", b"honk")
+    assert status is None
+    assert events[1]["body"] == protocol.wrap_message(False, False, b"hi")
+
+    for token in (None, b"goose"):
+        status, _ = await _asgi_call(app, "/test.Public/Method", token)
+        assert status == b"16"
+
+
+@pytest.mark.asyncio
+async def test_asgi_rejected_calls():
+    async def echo(request, context):
+        return request
+
+    app = sonora.asgi.grpcASGI(interceptors=[_AsyncRejectingInterceptor()])
+    app.add_generic_rpc_handlers(_handlers(echo))
+
+    status, _ = await _asgi_call(app, "/test.Public/Method")
+    assert status is None
+
+    status, events = await _asgi_call(app, "/test.Private/Method")
+    assert status == b"12"
+    assert events[1]["body"] == b""
+
+
+def test_asgi_sync_interceptors():
+    with pytest.raises(TypeError):
+        sonora.asgi.grpcASGI(interceptors=[_AsyncAuthInterceptor(), _AuthInterceptor()])
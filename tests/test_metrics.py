@@ -0,0 +1,170 @@
+import threading
+
+import grpc
+import pytest
+
+import sonora.asgi
+import sonora.wsgi
+from sonora import protocol
+from sonora.metrics import MetricsRegistry
+from tests.conftest import asgi_call, wsgi_call
+
+
+def _samples(registry):
+    samples = {}
+
+    for line in registry.exposition().splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = value
+
+    return samples
+
+
+_UNARY = 'grpc_type="unary",grpc_service="test.Service",grpc_method="Method"'
+_STREAM = 'grpc_type="server_stream",grpc_service="test.Service",grpc_method="Stream"'
+
+
+def test_registry_merges_threads():
+    registry = MetricsRegistry(buckets=(0.1, 1))
+    rpc_method = grpc.unary_unary_rpc_method_handler(lambda request, context: None)
+
+    def record():
+        call = registry.start_call("/test.Service/Method", rpc_method)
+        call.handler.request_deserializer(b"ab")
+        call.bytes_received += 7
+        call.finish(grpc.StatusCode.OK)
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    registry.start_call("/test.Service/Method", rpc_method).finish(
+        grpc.StatusCode.INTERNAL
+    )
+
+    samples = _samples(registry)
+    ok = f'{_UNARY},grpc_code="OK"'
+
+    assert samples[f"grpc_server_started_total{{{_UNARY}}}"] == "5"
+    assert samples[f"grpc_server_handled_total{{{ok}}}"] == "4"
+    assert samples[f'grpc_server_handled_total{{{_UNARY},grpc_code="INTERNAL"}}'] == "1"
+    assert samples[f'grpc_server_handling_seconds_bucket{{{ok},le="0.1"}}'] == "4"
+    assert samples[f'grpc_server_handling_seconds_bucket{{{ok},le="1.0"}}'] == "4"
+    assert samples[f'grpc_server_handling_seconds_bucket{{{ok},le="+Inf"}}'] == "4"
+    assert samples[f"grpc_server_handling_seconds_count{{{ok}}}"] == "4"
+    assert samples[f"grpc_server_msg_received_total{{{ok}}}"] == "4"
+    assert samples[f"grpc_server_msg_sent_total{{{ok}}}"] == "0"
+    assert samples[f"grpc_server_received_bytes_total{{{ok}}}"] == "28"
+
+
+def _handlers(unary, stream):
+    return [
+        grpc.method_handlers_generic_handler(
+            "test.Service",
+            {
+                "Method": grpc.unary_unary_rpc_method_handler(
+                    unary, request_deserializer=bytes, response_serializer=bytes
+                ),
+                "Stream": grpc.unary_stream_rpc_method_handler(
+                    stream, request_deserializer=bytes, response_serializer=bytes
+                ),
+            },
+        )
+    ]
+
+
+def test_wsgi_metrics():
+    def unary(request, context):
+        context.abort(grpc.StatusCode.NOT_FOUND, "missing")
+
+    def stream(request, context):
+        yield b"a"
+        yield b"bc"
+
+    registry = MetricsRegistry()
+    app = sonora.wsgi.grpcWSGI(metrics=registry)
+    app.add_generic_rpc_handlers(_handlers(unary, stream))
+
+    request = protocol.wrap_message(False, False, b"hello")
+
+    wsgi_call(app, request)
+    _, _, body = wsgi_call(app, request, "/test.Service/Stream")
+
+    status, headers, exposition = wsgi_call(app, path="/metrics", method="GET")
+
+    assert status == "200 OK"
+    assert dict(headers)["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert exposition.decode() == registry.exposition()
+
+    samples = _samples(registry)
+    not_found = f'{_UNARY},grpc_code="NOT_FOUND"'
+    ok = f'{_STREAM},grpc_code="OK"'
+
+    assert samples[f"grpc_server_handled_total{{{not_found}}}"] == "1"
+    assert samples[f"grpc_server_msg_received_total{{{not_found}}}"] == "1"
+    assert samples[f"grpc_server_msg_sent_total{{{not_found}}}"] == "0"
+    assert samples[f"grpc_server_started_total{{{_STREAM}}}"] == "1"
+    assert samples[f"grpc_server_msg_sent_total{{{ok}}}"] == "2"
+    assert samples[f"grpc_server_received_bytes_total{{{ok}}}"] == str(len(request))
+    assert samples[f"grpc_server_sent_bytes_total{{{ok}}}"] == str(len(body))
+
+
+def test_wsgi_metrics_disabled():
+    app = sonora.wsgi.grpcWSGI()
+
+    status, _, _ = wsgi_call(app, path="/metrics", method="GET")
+
+    assert status == "404 Not Found"
+
+
+@pytest.mark.parametrize("sync", [False, True])
+@pytest.mark.asyncio
+async def test_asgi_metrics(sync):
+    if sync:
+
+        def unary(request, context):
+            return request
+
+        def stream(request, context):
+            yield b"a"
+            yield b"bc"
+
+    else:
+
+        async def unary(request, context):
+            return request
+
+        async def stream(request, context):
+            yield b"a"
+            yield b"bc"
+
+    registry = MetricsRegistry()
+    app = sonora.asgi.grpcASGI(metrics=registry)
+    app.add_generic_rpc_handlers(_handlers(unary, stream))
+
+    request = protocol.wrap_message(False, False, b"hello")
+
+    await asgi_call(app, request)
+    events = await asgi_call(app, request, "/test.Service/Stream")
+    sent = sum(len(event.get("body", b"")) for event in events)
+
+    start, body = await asgi_call(app, path="/metrics", method="GET")
+
+    assert dict(start["headers"])[b"content-type"].startswith(b"text/plain")
+    assert body["body"].decode() == registry.exposition()
+
+    samples = _samples(registry)
+    unary_ok = f'{_UNARY},grpc_code="OK"'
+    stream_ok = f'{_STREAM},grpc_code="OK"'
+
+    assert samples[f"grpc_server_handled_total{{{unary_ok}}}"] == "1"
+    assert samples[f"grpc_server_msg_received_total{{{unary_ok}}}"] == "1"
+    assert samples[f"grpc_server_msg_sent_total{{{unary_ok}}}"] == "1"
+    assert samples[f"grpc_server_received_bytes_total{{{unary_ok}}}"] == str(
+        len(request)
+    )
+    assert samples[f"grpc_server_msg_sent_total{{{stream_ok}}}"] == "2"
+    assert samples[f"grpc_server_sent_bytes_total{{{stream_ok}}}"] == str(sent)
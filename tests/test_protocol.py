@@ -1,5 +1,6 @@
 import io
 
+import grpc
 from hypothesis import given, strategies as st
 import pytest
 
@@ -58,6 +59,249 @@ async def test_unwrapping_asgi():
     assert resp_messages == messages
 
 
+@pytest.mark.asyncio
+async def test_unwrapping_asgi_multiple_frames_per_event():
+    messages = [b"a", b"", b"bc" * 100, b"d"]
+
+    body = b"".join(protocol.wrap_message(False, False, m) for m in messages)
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    resp_messages = [resp async for _, _, resp in protocol.unwrap_message_asgi(receive)]
+
+    assert resp_messages == messages
+
+
+@pytest.mark.asyncio
+async def test_unwrapping_asgi_truncated():
+    body = protocol.wrap_message(False, False, b"a") + protocol.wrap_message(
+        False, False, b"bcd"
+    )
+
+    async def receive():
+        return {"type": "http.request", "body": body[:-1], "more_body": False}
+
+    frames = protocol.unwrap_message_asgi(receive)
+
+    assert await frames.__anext__() == (False, False, b"a")
+
+    with pytest.raises(protocol.IncompleteMessageError):
+        await frames.__anext__()
+
+
+@pytest.mark.asyncio
+async def test_unwrapping_asgi_disconnect():
+    events = [
+        {
+            "type": "http.request",
+            "body": protocol.wrap_message(False, False, b"a"),
+            "more_body": True,
+        },
+        {"type": "http.disconnect"},
+    ]
+
+    async def receive():
+        return events.pop(0)
+
+    frames = protocol.unwrap_message_asgi(receive)
+
+    assert await frames.__anext__() == (False, False, b"a")
+
+    with pytest.raises(protocol.DisconnectedError):
+        await frames.__anext__()
+
+
+@given(
+    st.lists(st.binary(max_size=300), max_size=10),
+    st.integers(min_value=1, max_value=50),
+)
+def test_frame_decoder_chunking(messages, chunk_size):
+    body = b"".join(protocol.wrap_message(False, False, m) for m in messages)
+
+    decoder = protocol.FrameDecoder()
+    frames = []
+    for i in range(0, len(body), chunk_size):
+        frames.extend(decoder.feed(body[i : i + chunk_size]))
+
+    assert [message for _, _, message in frames] == messages
+    assert not decoder.pending()
+
+
+def test_frame_decoder_preallocated_frame():
+    large = bytes(range(256)) * 1024
+    body = protocol.wrap_message(False, False, large) + protocol.wrap_message(
+        True, False, b"grpc-status: 0\r\n"
+    )
+
+    decoder = protocol.FrameDecoder()
+    frames = []
+    for i in range(0, len(body), 1000):
+        frames.extend(decoder.feed(body[i : i + 1000]))
+
+    assert frames == [
+        (False, False, large),
+        (True, False, b"grpc-status: 0\r\n"),
+    ]
+    assert type(frames[0][2]) is bytes
+
+
+def test_frame_decoder_max_length():
+    decoder = protocol.FrameDecoder(max_length=10)
+
+    assert decoder.feed(protocol.wrap_message(False, False, b"\0" * 10)) == [
+        (False, False, b"\0" * 10)
+    ]
+
+    with pytest.raises(protocol.MessageTooLargeError):
+        decoder.feed(protocol.wrap_message(False, False, b"\0" * 11)[:5])
+
+
+def test_unwrapping_stream_large_frame():
+    large = b"\1" * 1000000
+    buffer = io.BufferedReader(
+        io.BytesIO(protocol.wrap_message(False, False, large)), buffer_size=16384
+    )
+
+    frames = list(protocol.unwrap_message_stream(buffer))
+
+    assert frames == [(False, False, large)]
+    assert type(frames[0][2]) is bytes
+
+
+def test_unwrapping_stream_truncated():
+    wrapped = protocol.wrap_message(False, False, b"foobar")
+
+    with pytest.raises(ValueError):
+        list(protocol.unwrap_message_stream(io.BytesIO(wrapped[:-1])))
+
+
+@given(
+    st.lists(st.binary(max_size=100), max_size=10),
+    st.integers(min_value=1, max_value=20),
+)
+def test_base64_decoder_chunking(messages, chunk_size):
+    body = b"".join(protocol.b64_wrap_message(False, False, m) for m in messages)
+
+    decoder = protocol.Base64Decoder()
+    frames = protocol.FrameDecoder()
+    resp_messages = []
+    for i in range(0, len(body), chunk_size):
+        for _, _, message in frames.feed(decoder.decode(body[i : i + chunk_size])):
+            resp_messages.append(message)
+
+    assert resp_messages == messages
+    assert not decoder.pending()
+    assert not frames.pending()
+
+
+@pytest.mark.asyncio
+async def test_b64_unwrapping_asgi_unaligned_chunks():
+    messages = [b"Tyger Tyger, burning bright,", b"In the forests of the night;"]
+
+    body = b"".join(protocol.b64_wrap_message(False, False, m) for m in messages)
+    chunks = [body[i : i + 7] for i in range(0, len(body), 7)]
+
+    async def receive():
+        return {
+            "type": "http.request",
+            "body": chunks.pop(0),
+            "more_body": bool(chunks),
+        }
+
+    resp_messages = [
+        resp async for _, _, resp in protocol.b64_unwrap_message_asgi(receive)
+    ]
+
+    assert resp_messages == messages
+
+
+@pytest.mark.asyncio
+async def test_b64_unwrapping_asgi_truncated_quantum():
+    body = protocol.b64_wrap_message(False, False, b"abc") + b"QUJ"
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    frames = protocol.b64_unwrap_message_asgi(receive)
+
+    assert await frames.__anext__() == (False, False, b"abc")
+
+    with pytest.raises(protocol.IncompleteMessageError):
+        await frames.__anext__()
+
+
+def test_b64_unwrapping_wsgi_truncated_quantum():
+    body = protocol.b64_wrap_message(False, False, b"abc") + b"QUJ"
+
+    frames = protocol.b64_unwrap_message_wsgi([body])
+
+    assert next(frames) == (False, False, b"abc")
+
+    with pytest.raises(protocol.IncompleteMessageError):
+        next(frames)
+
+
+def test_trailers_roundtrip():
+    message = protocol.pack_trailers(
+        [("x-a", "1"), (b"X-B", "2"), ("x-c-bin", b"\0\1"), ("x-d", 4)]
+    )
+
+    assert message == b"x-a: 1\r\nx-b: 2\r\nx-c-bin: AAE=\r\nx-d: 4\r\n"
+    assert protocol.unpack_trailers(message) == [
+        ("x-a", "1"),
+        ("x-b", "2"),
+        ("x-c-bin", "AAE="),
+        ("x-d", "4"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "trailers",
+    [
+        [("x a", "1")],
+        [("x:a", "1")],
+        [("", "1")],
+        [("x-a", b"binary")],
+        [("x-a", "1\r\nx-b: 2")],
+        [("x-a", "\u2603")],
+    ],
+)
+def test_pack_trailers_invalid(trailers):
+    with pytest.raises(ValueError):
+        protocol.pack_trailers(trailers)
+
+
+@pytest.mark.parametrize("wrap", [protocol.wrap_message, protocol.b64_wrap_message])
+@pytest.mark.parametrize("code", list(grpc.StatusCode))
+def test_pack_status_frame(wrap, code):
+    frame = protocol.pack_status_frame(wrap, code)
+
+    assert frame == wrap(
+        True, False, protocol.pack_trailers([("grpc-status", code.value[0])])
+    )
+    assert frame is protocol.pack_status_frame(wrap, code)
+
+
+def test_pack_status_frame_details_and_metadata():
+    frame = protocol.pack_status_frame(
+        protocol.wrap_message,
+        grpc.StatusCode.NOT_FOUND,
+        "nö such thing",
+        [("x-a", "1"), ("X-B", "2")],
+    )
+
+    ((trailers, compressed, message),) = protocol.FrameDecoder().feed(frame)
+
+    assert trailers and not compressed
+    assert protocol.unpack_trailers(message) == [
+        ("grpc-status", "5"),
+        ("grpc-message", "n%C3%B6%20such%20thing"),
+        ("x-a", "1"),
+        ("x-b", "2"),
+    ]
+
+
 @given(st.floats(allow_nan=False, allow_infinity=False))
 def test_timeout_serdes(timeout):
     ser = protocol.serialize_timeout(timeout).encode("ascii")
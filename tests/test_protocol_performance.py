@@ -0,0 +1,96 @@
+import io
+
+import grpc
+import pytest
+
+from sonora import protocol
+
+
+def _body(size, count):
+    return protocol.wrap_message(False, False, b"\0" * size) * count
+
+
+@pytest.mark.parametrize("size", [1, 100, 10000, 1000000])
+def test_frame_decoder_single_chunk(benchmark, size):
+    count = max(1, 100000 // size)
+    body = _body(size, count)
+
+    def perf():
+        frames = protocol.FrameDecoder().feed(body)
+        assert len(frames) == count
+
+    benchmark(perf)
+
+
+@pytest.mark.parametrize("size", [1, 100, 10000, 1000000])
+def test_frame_decoder_small_chunks(benchmark, size):
+    count = max(1, 100000 // size)
+    body = _body(size, count)
+    chunks = [body[i : i + 16384] for i in range(0, len(body), 16384)]
+
+    def perf():
+        decoder = protocol.FrameDecoder()
+        n = 0
+        for chunk in chunks:
+            n += len(decoder.feed(chunk))
+        assert n == count
+
+    benchmark(perf)
+
+
+@pytest.mark.parametrize("size", [1, 100, 10000, 1000000])
+def test_unwrap_message_stream(benchmark, size):
+    count = max(1, 100000 // size)
+    body = _body(size, count)
+
+    def perf():
+        stream = io.BufferedReader(io.BytesIO(body), buffer_size=16384)
+        n = sum(1 for _ in protocol.unwrap_message_stream(stream))
+        assert n == count
+
+    benchmark(perf)
+
+
+@pytest.mark.parametrize("size", [1, 100, 10000, 1000000])
+def test_base64_decoder_small_chunks(benchmark, size):
+    count = max(1, 100000 // size)
+    body = protocol.b64_wrap_message(False, False, b"\0" * size) * count
+    chunks = [body[i : i + 16383] for i in range(0, len(body), 16383)]
+
+    def perf():
+        decoder = protocol.Base64Decoder()
+        frames = protocol.FrameDecoder()
+        n = 0
+        for chunk in chunks:
+            n += len(frames.feed(decoder.decode(chunk)))
+        assert n == count
+
+    benchmark(perf)
+
+
+@pytest.mark.parametrize("count", [0, 5, 50])
+def test_pack_status_frame(benchmark, count):
+    metadata = [(f"x-metadata-{i}", "value") for i in range(count)]
+
+    def perf():
+        for _ in range(1000):
+            protocol.pack_status_frame(
+                protocol.wrap_message,
+                grpc.StatusCode.OK,
+                trailing_metadata=metadata,
+            )
+
+    benchmark(perf)
+
+
+@pytest.mark.parametrize("count", [0, 5, 50])
+def test_unpack_trailers(benchmark, count):
+    message = protocol.pack_trailers(
+        [("grpc-status", "0")] + [(f"x-metadata-{i}", "value") for i in range(count)]
+    )
+
+    def perf():
+        for _ in range(1000):
+            protocol.unpack_trailers(message)
+
+    benchmark(perf)
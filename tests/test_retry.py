@@ -0,0 +1,300 @@
+import json
+import socketserver
+import threading
+import time
+
+import grpc
+import pytest
+
+import sonora.aio
+import sonora.client
+import sonora.wsgi
+from sonora.retry import RetryThrottle, ServiceConfig
+
+
+def _service_config(method, policy=None, throttling=None, timeout=None):
+    method_config = {"name": [{"service": "test.Flaky", "method": method}]}
+
+    if policy is not None:
+        method_config.update(policy)
+    if timeout is not None:
+        method_config["timeout"] = timeout
+
+    config = {"methodConfig": [method_config]}
+    if throttling is not None:
+        config["retryThrottling"] = throttling
+
+    return json.dumps(config)
+
+
+_RETRY = {
+    "retryPolicy": {
+        "maxAttempts": 3,
+        "initialBackoff": "0.01s",
+        "maxBackoff": "0.05s",
+        "backoffMultiplier": 2,
+        "retryableStatusCodes": ["UNAVAILABLE"],
+    }
+}
+
+_HEDGING = {
+    "hedgingPolicy": {
+        "maxAttempts": 3,
+        "hedgingDelay": "0.05s",
+        "nonFatalStatusCodes": ["UNAVAILABLE"],
+    }
+}
+
+
+def test_service_config_matching():
+    config = ServiceConfig(
+        {
+            "methodConfig": [
+                {"name": [{}], "timeout": "2s"},
+                {"name": [{"service": "a.S"}], **_HEDGING},
+                {
+                    "name": [{"service": "a.S", "method": "M"}],
+                    "retryPolicy": {**_RETRY["retryPolicy"], "maxAttempts": 10},
+                },
+            ],
+            "retryThrottling": {"maxTokens": 10, "tokenRatio": 0.5},
+        }
+    )
+
+    method = config.method_config("/a.S/M")
+    assert method.retry_policy.max_attempts == 5
+    assert method.retry_policy.retryable_status_codes == {grpc.StatusCode.UNAVAILABLE}
+    assert method.retry_policy.initial_backoff == 0.01
+
+    service = config.method_config("/a.S/Other")
+    assert service.hedging_policy.hedging_delay == 0.05
+    assert service.retry_policy is None
+
+    assert config.method_config("/b.S/M") == (2.0, None, None)
+    assert config.throttle.max_tokens == 10
+
+    with pytest.raises(ValueError):
+        ServiceConfig(
+            {"methodConfig": [{"name": [{"service": "a.S"}], **_RETRY, **_HEDGING}]}
+        )
+
+    assert ServiceConfig("{}").method_config("/a.S/M") is None
+
+
+def test_retry_throttle():
+    throttle = RetryThrottle(4, 0.5)
+
+    throttle.record_failure()
+    assert throttle.allows_retry()
+
+    throttle.record_failure()
+    assert not throttle.allows_retry()
+
+    throttle.record_success()
+    assert throttle.allows_retry()
+    assert throttle.tokens == 2.5
+
+
+@pytest.fixture
+def flaky_server(serve_wsgi):
+    """
+    Serves test.Flaky: Method fails with UNAVAILABLE state["failures"] times
+    before it succeeds and the first call to Slow takes half a second.
+    """
+    state = {"failures": 0, "attempts": 0}
+    lock = threading.Lock()
+
+    def method(request, context):
+        with lock:
+            state["attempts"] += 1
+            fail = state["attempts"] <= state["failures"]
+
+        if fail:
+            context.abort(grpc.StatusCode.UNAVAILABLE, "try again")
+
+        return request
+
+    def slow(request, context):
+        with lock:
+            state["attempts"] += 1
+            first = state["attempts"] == 1
+
+        if first:
+            time.sleep(0.5)
+            return b"slow"
+
+        return b"fast"
+
+    app = sonora.wsgi.grpcWSGI()
+    app.add_generic_rpc_handlers(
+        [
+            grpc.method_handlers_generic_handler(
+                "test.Flaky",
+                {
+                    name: grpc.unary_unary_rpc_method_handler(
+                        behaviour, request_deserializer=bytes, response_serializer=bytes
+                    )
+                    for name, behaviour in (("Method", method), ("Slow", slow))
+                },
+            )
+        ]
+    )
+
+    return serve_wsgi(app), state
+
+
+def _method(channel, name):
+    return channel.unary_unary(f"/test.Flaky/{name}", bytes, bytes)
+
+
+def test_sync_retry(flaky_server):
+    port, state = flaky_server
+    state["failures"] = 2
+
+    with sonora.client.WebChannel(
+        f"localhost:{port}", service_config=_service_config("Method", _RETRY)
+    ) as channel:
+        assert _method(channel, "Method")(b"hi") == b"hi"
+
+    assert state["attempts"] == 3
+
+
+def test_sync_retry_gives_up(flaky_server):
+    port, state = flaky_server
+    state["failures"] = 5
+
+    with sonora.client.WebChannel(
+        f"localhost:{port}", service_config=_service_config("Method", _RETRY)
+    ) as channel:
+        with pytest.raises(grpc.RpcError) as exc:
+            _method(channel, "Method")(b"hi")
+
+    assert exc.value.code() == grpc.StatusCode.UNAVAILABLE
+    assert state["attempts"] == 3
+
+
+def test_sync_retry_throttled(flaky_server):
+    port, state = flaky_server
+    state["failures"] = 5
+
+    service_config = _service_config(
+        "Method", _RETRY, throttling={"maxTokens": 2, "tokenRatio": 0.1}
+    )
+
+    with sonora.client.WebChannel(
+        f"localhost:{port}", service_config=service_config
+    ) as channel:
+        with pytest.raises(grpc.RpcError):
+            _method(channel, "Method")(b"hi")
+
+    assert state["attempts"] == 1
+
+
+def test_sync_retry_deadline(flaky_server):
+    port, state = flaky_server
+    state["failures"] = 5
+
+    policy = {"retryPolicy": {**_RETRY["retryPolicy"], "initialBackoff": "1s"}}
+    policy["retryPolicy"]["maxBackoff"] = "1s"
+
+    with sonora.client.WebChannel(
+        f"localhost:{port}",
+        service_config=_service_config("Method", policy, timeout="0.05s"),
+    ) as channel:
+        start = time.perf_counter()
+
+        with pytest.raises(grpc.RpcError):
+            _method(channel, "Method")(b"hi")
+
+    # Whatever the backoff, the call can't outlast its deadline.
+    assert time.perf_counter() - start < 0.5
+
+
+def test_sync_hedging(flaky_server):
+    port, state = flaky_server
+
+    with sonora.client.WebChannel(
+        f"localhost:{port}", service_config=_service_config("Slow", _HEDGING)
+    ) as channel:
+        start = time.perf_counter()
+        assert _method(channel, "Slow")(b"") == b"fast"
+
+    assert time.perf_counter() - start < 0.4
+    assert state["attempts"] == 2
+
+
+@pytest.mark.asyncio
+async def test_async_retry(flaky_server):
+    port, state = flaky_server
+    state["failures"] = 2
+
+    async with sonora.aio.WebChannel(
+        f"localhost:{port}", service_config=_service_config("Method", _RETRY)
+    ) as channel:
+        call = _method(channel, "Method")(b"hi")
+
+        assert await call == b"hi"
+        assert await call.trailing_metadata() is not None
+
+    assert state["attempts"] == 3
+
+
+@pytest.mark.asyncio
+async def test_async_hedging(flaky_server):
+    port, state = flaky_server
+
+    async with sonora.aio.WebChannel(
+        f"localhost:{port}", service_config=_service_config("Slow", _HEDGING)
+    ) as channel:
+        start = time.perf_counter()
+        assert await _method(channel, "Slow")(b"") == b"fast"
+
+    assert time.perf_counter() - start < 0.4
+    assert state["attempts"] == 2
+
+
+def _closed_port():
+    with socketserver.TCPServer(("localhost", 0), None) as server:
+        return server.server_address[1]
+
+
+def test_sync_retry_unreachable(monkeypatch):
+    attempts = []
+    connect = sonora.client._HTTPConnection.connect
+
+    def counted(self):
+        attempts.append(self)
+        return connect(self)
+
+    # Counting connection attempts also catches urllib3 retrying on its own.
+    monkeypatch.setattr(sonora.client._HTTPConnection, "connect", counted)
+
+    with sonora.client.WebChannel(
+        f"localhost:{_closed_port()}", service_config=_service_config("Method", _RETRY)
+    ) as channel:
+        with pytest.raises(grpc.RpcError) as exc:
+            _method(channel, "Method")(b"hi")
+
+    assert exc.value.code() == grpc.StatusCode.UNAVAILABLE
+    assert len(attempts) == 3
+
+
+@pytest.mark.asyncio
+async def test_async_retry_unreachable(monkeypatch):
+    attempts = []
+    attempt = sonora.aio.PolicyCall._attempt
+
+    def counted(self):
+        attempts.append(self)
+        return attempt(self)
+
+    monkeypatch.setattr(sonora.aio.PolicyCall, "_attempt", counted)
+
+    async with sonora.aio.WebChannel(
+        f"localhost:{_closed_port()}", service_config=_service_config("Method", _RETRY)
+    ) as channel:
+        with pytest.raises(grpc.RpcError) as exc:
+            await _method(channel, "Method")(b"hi")
+
+    assert exc.value.code() == grpc.StatusCode.UNAVAILABLE
+    assert len(attempts) == 3
@@ -0,0 +1,235 @@
+import asyncio
+
+import grpc
+import pytest
+
+from sonora.routing import RpcRouter
+
+
+def _method_handler():
+    return grpc.unary_unary_rpc_method_handler(lambda request, context: request)
+
+
+def _services(count):
+    return [
+        grpc.method_handlers_generic_handler(
+            f"test.Service{n}", {"Method": _method_handler()}
+        )
+        for n in range(count)
+    ]
+
+
+class _Details:
+    def __init__(self, method):
+        self.method = method
+        self.invocation_metadata = None
+
+
+class _DynamicHandler(grpc.GenericRpcHandler):
+    def __init__(self, path, method_handler):
+        self.path = path
+        self.method_handler = method_handler
+        self.calls = 0
+
+    def service(self, handler_call_details):
+        self.calls += 1
+        if handler_call_details.method == self.path:
+            return self.method_handler
+        return None
+
+
+def test_generic_handlers():
+    router = RpcRouter()
+    handlers = _services(3)
+    router.add_generic_rpc_handlers(handlers)
+
+    for n, handler in enumerate(handlers):
+        path = f"/test.Service{n}/Method"
+        assert router.get(path) is handler.service(_Details(path))
+
+    assert router.get("/test.Service3/Method") is None
+
+
+def test_registered_handlers_take_precedence():
+    router = RpcRouter()
+    generic = _method_handler()
+    registered = _method_handler()
+
+    router.add_generic_rpc_handlers(
+        [grpc.method_handlers_generic_handler("test.Service", {"Method": generic})]
+    )
+    router.add_registered_method_handlers("test.Service", {"Method": registered})
+
+    assert router.get("/test.Service/Method") is registered
+
+
+def test_dynamic_handlers_are_cached():
+    router = RpcRouter()
+    method_handler = _method_handler()
+    dynamic = _DynamicHandler("/test.Dynamic/Method", method_handler)
+    router.add_generic_rpc_handlers([dynamic])
+
+    assert router.get("/test.Dynamic/Method") is method_handler
+    assert router.get("/test.Dynamic/Method") is method_handler
+    assert router.get("/not/grpc") is None
+    assert router.get("/not/grpc") is None
+
+    assert dynamic.calls == 2
+
+
+def test_dynamic_handlers_keep_registration_order():
+    router = RpcRouter()
+    dynamic_handler = _method_handler()
+    static_handler = _method_handler()
+
+    router.add_generic_rpc_handlers(
+        [
+            _DynamicHandler("/test.Service/Method", dynamic_handler),
+            grpc.method_handlers_generic_handler(
+                "test.Service", {"Method": static_handler}
+            ),
+        ]
+    )
+
+    assert router.get("/test.Service/Method") is dynamic_handler
+
+
+def test_cache_is_bounded():
+    router = RpcRouter(cache_size=4)
+    router.add_generic_rpc_handlers([_DynamicHandler("/a/b", _method_handler())])
+
+    for n in range(10):
+        router.get(f"/missing/{n}")
+
+    assert len(router._cache) <= 4
+
+
+class _TaggingInterceptor(grpc.ServerInterceptor):
+    """
+    Wraps the handlers of one service, recording the handler call details
+    it was asked about.
+    """
+
+    def __init__(self, tag, service="test.Service0"):
+        self.tag = tag
+        self.service = service
+        self.calls = []
+
+    def intercept_service(self, continuation, handler_call_details):
+        self.calls.append(handler_call_details)
+        handler = continuation(handler_call_details)
+
+        if not handler_call_details.method.startswith(f"/{self.service}/"):
+            return handler
+
+        return _tag(handler, self.tag)
+
+
+class _AsyncTaggingInterceptor(grpc.aio.ServerInterceptor):
+    def __init__(self, tag):
+        self.tag = tag
+
+    async def intercept_service(self, continuation, handler_call_details):
+        # Interceptors can wait, on an auth lookup say.
+        await asyncio.sleep(0)
+        return _tag(await continuation(handler_call_details), self.tag)
+
+
+def _tag(handler, tag):
+    behaviour = handler.unary_unary
+
+    def tagged(request, context):
+        return behaviour(request, context) + tag
+
+    return grpc.unary_unary_rpc_method_handler(tagged)
+
+
+def _metadata(token):
+    return lambda: (("x-token", token),)
+
+
+def test_interceptors_run_per_call():
+    first = _TaggingInterceptor(b"1")
+    second = _TaggingInterceptor(b"2")
+    router = RpcRouter(interceptors=[first, second], intercept_per_method=False)
+    router.add_generic_rpc_handlers(_services(2))
+
+    path = "/test.Service0/Method"
+    handler = router.get(path)
+
+    assert router.intercepts_calls
+    assert handler.unary_unary(b"", None) == b""
+
+    for token in ("a", "b"):
+        intercepted = router.intercept(path, handler, _metadata(token))
+        assert intercepted.unary_unary(b"", None) == b"21"
+
+    assert [call.invocation_metadata for call in first.calls] == [
+        (("x-token", "a"),),
+        (("x-token", "b"),),
+    ]
+
+    path = "/test.Service1/Method"
+    handler = router.get(path)
+    assert router.intercept(path, handler, _metadata("a")) is handler
+
+
+def test_interceptors_per_method():
+    interceptor = _TaggingInterceptor(b"1", service="test.Dynamic")
+    router = RpcRouter(interceptors=[interceptor])
+    router.add_generic_rpc_handlers(
+        [_DynamicHandler("/test.Dynamic/Method", _method_handler())]
+    )
+
+    def unused():
+        raise AssertionError("the metadata was decoded")
+
+    path = "/test.Dynamic/Method"
+    handler = router.intercept(path, router.get(path), unused)
+
+    assert handler.unary_unary(b"a", None) == b"a1"
+    assert router.intercept(path, router.get(path), unused) is handler
+    assert [(call.method, call.invocation_metadata) for call in interceptor.calls] == [
+        (path, ())
+    ]
+
+    # Adding handlers forgets what the interceptors built.
+    router.add_generic_rpc_handlers(_services(1))
+    assert router.intercept(path, router.get(path), unused) is not handler
+
+
+@pytest.mark.asyncio
+async def test_async_interceptors():
+    router = RpcRouter(
+        interceptors=[_AsyncTaggingInterceptor(b"1")], intercept_per_method=False
+    )
+    router.add_generic_rpc_handlers(_services(1))
+
+    path = "/test.Service0/Method"
+    handler = await router.intercept_async(path, router.get(path), _metadata("a"))
+
+    assert handler.unary_unary(b"", None) == b"1"
+
+    router = RpcRouter(
+        interceptors=[_AsyncTaggingInterceptor(b"1"), _AsyncTaggingInterceptor(b"2")]
+    )
+    router.add_generic_rpc_handlers(_services(1))
+
+    handler = await router.intercept_async(path, router.get(path), _metadata("a"))
+
+    assert handler.unary_unary(b"", None) == b"21"
+    assert await router.intercept_async(path, router.get(path), None) is handler
+
+
+@pytest.mark.parametrize("services", [1, 10, 100, 1000])
+def test_routing_lookup(benchmark, services):
+    router = RpcRouter()
+    router.add_generic_rpc_handlers(_services(services))
+
+    path = f"/test.Service{services - 1}/Method"
+
+    def perf():
+        for _ in range(1000):
+            router.get(path)
+
+    benchmark(perf)
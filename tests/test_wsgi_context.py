@@ -0,0 +1,189 @@
+import base64
+import concurrent.futures
+import io
+import threading
+import time
+
+import grpc
+import pytest
+
+from sonora import protocol
+import sonora.wsgi
+from sonora.wsgi import ServicerContext
+from tests.conftest import make_app, wsgi_call
+
+
+def test_invocation_metadata():
+    context = ServicerContext(
+        environ={
+            "CONTENT_TYPE": "application/grpc-web+proto",
+            "HTTP_HOST": "localhost",
+            "HTTP_X_TOKEN": "honk",
+            "HTTP_X_TOKEN_BIN": base64.b64encode(b"\0\1").decode("ascii"),
+            "wsgi.input": io.BytesIO(),
+        }
+    )
+
+    metadata = context.invocation_metadata()
+
+    assert metadata == (
+        ("host", "localhost"),
+        ("x-token", "honk"),
+        ("x-token-bin", b"\0\1"),
+    )
+    assert context.invocation_metadata() is metadata
+
+
+def test_grpc_timeout():
+    def slow(request, context):
+        yield b"a"
+        time.sleep(0.2)
+        yield b"b"
+
+    app = sonora.wsgi.grpcWSGI(None)
+    app.add_generic_rpc_handlers(
+        [
+            grpc.method_handlers_generic_handler(
+                "test.Service",
+                {
+                    "Method": grpc.unary_stream_rpc_method_handler(
+                        slow, request_deserializer=bytes, response_serializer=bytes
+                    )
+                },
+            )
+        ]
+    )
+
+    body = b"".join(
+        app(
+            {
+                "PATH_INFO": "/test.Service/Method",
+                "REQUEST_METHOD": "POST",
+                "CONTENT_TYPE": "application/grpc-web+proto",
+                "CONTENT_LENGTH": "0",
+                "HTTP_HOST": "localhost",
+                "HTTP_GRPC_TIMEOUT": "100m",
+                "wsgi.input": io.BytesIO(),
+            },
+            lambda status, headers: None,
+        )
+    )
+
+    frames = protocol.FrameDecoder().feed(body)
+
+    assert frames[0] == (False, False, b"a")
+    assert frames[-1][0]
+    assert b"grpc-status: 4\r\n" in frames[-1][2]
+
+
+def _unary_call(app, timeout=None):
+    environ = {} if timeout is None else {"HTTP_GRPC_TIMEOUT": timeout}
+    _, _, data = wsgi_call(app, environ=environ)
+
+    return protocol.FrameDecoder().feed(data)
+
+
+@pytest.mark.parametrize("executor", [False, True])
+def test_unary_deadline(executor):
+    stopped = threading.Event()
+
+    def slow(request, context):
+        while context.is_active():
+            time.sleep(0.01)
+
+        stopped.set()
+        context.set_trailing_metadata([("x-late", "1")])
+        return b"late"
+
+    if executor:
+        app = make_app(
+            sonora.wsgi.grpcWSGI,
+            slow,
+            executor=concurrent.futures.ThreadPoolExecutor(1),
+        )
+    else:
+        app = make_app(sonora.wsgi.grpcWSGI, slow)
+
+    start = time.monotonic()
+    frames = _unary_call(app, "100m")
+
+    assert time.monotonic() - start < 1
+    assert frames == [
+        (
+            True,
+            False,
+            b"grpc-status: 4\r\ngrpc-message: request%20timed%20out%20at%20the%20server\r\n",
+        )
+    ]
+    assert stopped.wait(1)
+
+
+def test_unary_deadline_expired():
+    calls = []
+
+    def handler(request, context):
+        calls.append(request)
+        return b"a"
+
+    frames = _unary_call(make_app(sonora.wsgi.grpcWSGI, handler), "0m")
+
+    assert frames[-1][2].startswith(b"grpc-status: 4\r\n")
+    assert calls == []
+
+
+@pytest.mark.parametrize("timeout", ["", "10", "10x", "abcS", "1\u00e9S"])
+def test_malformed_timeout(timeout):
+    calls = []
+
+    def handler(request, context):
+        calls.append(request)
+        return b"a"
+
+    frames = _unary_call(make_app(sonora.wsgi.grpcWSGI, handler), timeout)
+
+    assert frames == [
+        (
+            True,
+            False,
+            b"grpc-status: 13\r\ngrpc-message: Malformed%20grpc-timeout%20header\r\n",
+        )
+    ]
+    assert calls == []
+
+
+def test_unary_without_deadline():
+    def handler(request, context):
+        assert context.is_active()
+        assert context.time_remaining() is None
+        return threading.current_thread().name.encode()
+
+    frames = _unary_call(make_app(sonora.wsgi.grpcWSGI, handler))
+
+    assert frames[0] == (False, False, threading.current_thread().name.encode())
+    assert frames[-1] == (True, False, b"grpc-status: 0\r\n")
+
+
+def test_unary_within_deadline():
+    def handler(request, context):
+        assert context.is_active()
+        assert 0 < context.time_remaining() <= 5
+        return b"a"
+
+    frames = _unary_call(make_app(sonora.wsgi.grpcWSGI, handler), "5S")
+
+    assert frames[0] == (False, False, b"a")
+    assert frames[-1] == (True, False, b"grpc-status: 0\r\n")
+
+
+def test_unary_deadline_runs_on_server_thread():
+    def handler(request, context):
+        time.sleep(0.2)
+        return threading.current_thread().name.encode()
+
+    app = make_app(sonora.wsgi.grpcWSGI, handler)
+
+    with concurrent.futures.ThreadPoolExecutor(20) as server:
+        calls = [server.submit(_unary_call, app, "2S") for _ in range(20)]
+        threads = {frames[0][2] for frames in (call.result() for call in calls)}
+
+    assert len(threads) == 20
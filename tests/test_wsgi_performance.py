@@ -1,7 +1,12 @@
+import io
+
 import pytest
 
 import sonora.client
+import sonora.wsgi
+from sonora import protocol
 from tests import benchmark_pb2, benchmark_pb2_grpc
+from tests.conftest import SyncBenchmark
 
 
 @pytest.mark.parametrize("size", [1, 100, 10000, 1000000])
@@ -16,6 +21,58 @@ def test_wsgi_unarycall(wsgi_benchmark, benchmark, size):
     benchmark(perf)
 
 
+# Roughly what a WSGI server puts in the environ for a browser's grpc-web call.
+_BROWSER_ENVIRON = {
+    "HTTP_CONNECTION": "keep-alive",
+    "HTTP_SEC_CH_UA": '"Chromium";v="118", "Not=A?Brand";v="99"',
+    "HTTP_X_GRPC_WEB": "1",
+    "HTTP_SEC_CH_UA_MOBILE": "?0",
+    "HTTP_AUTHORIZATION": "Bearer " + "x" * 300,
+    "HTTP_USER_AGENT": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36",
+    "HTTP_X_USER_AGENT": "grpc-web-javascript/0.1",
+    "HTTP_ACCEPT": "application/grpc-web+proto",
+    "HTTP_SEC_CH_UA_PLATFORM": '"Linux"',
+    "HTTP_ORIGIN": "http://localhost:3000",
+    "HTTP_SEC_FETCH_SITE": "same-site",
+    "HTTP_SEC_FETCH_MODE": "cors",
+    "HTTP_SEC_FETCH_DEST": "empty",
+    "HTTP_REFERER": "http://localhost:3000/",
+    "HTTP_ACCEPT_ENCODING": "gzip, deflate, br",
+    "HTTP_ACCEPT_LANGUAGE": "en-US,en;q=0.9",
+    "HTTP_X_TRACE_BIN": "AAECAwQFBgcICQoLDA0ODw==",
+}
+
+
+@pytest.mark.parametrize("headers", ["minimal", "browser"])
+def test_wsgi_unarycall_in_process(benchmark, headers):
+    app = sonora.wsgi.grpcWSGI(None)
+    benchmark_pb2_grpc.add_BenchmarkServiceServicer_to_server(SyncBenchmark(), app)
+
+    request = benchmark_pb2.SimpleRequest(response_size=1)
+    body = protocol.wrap_message(False, False, request.SerializeToString())
+
+    extra_environ = _BROWSER_ENVIRON if headers == "browser" else {}
+
+    def start_response(status, headers):
+        pass
+
+    def perf():
+        for _ in range(1000):
+            environ = {
+                "PATH_INFO": "/benchmark.BenchmarkService/UnaryCall",
+                "REQUEST_METHOD": "POST",
+                "CONTENT_TYPE": "application/grpc-web+proto",
+                "CONTENT_LENGTH": str(len(body)),
+                "HTTP_HOST": "localhost",
+                "wsgi.input": io.BytesIO(body),
+                **extra_environ,
+            }
+            for _ in app(environ, start_response):
+                pass
+
+    benchmark(perf)
+
+
 @pytest.mark.parametrize("size", [1, 100, 10000, 1000000])
 def test_wsgi_streamingfromserver(wsgi_benchmark, benchmark, size):
     chunk_count = 10
@@ -36,3 +93,60 @@ def test_wsgi_streamingfromserver(wsgi_benchmark, benchmark, size):
         assert recv_bytes == size * chunk_count
 
     benchmark(perf)
+
+
+@pytest.mark.parametrize("coalesce", [False, True])
+def test_wsgi_streamingfromserver_ticks(
+    wsgi_benchmark, wsgi_coalescing_benchmark, benchmark, coalesce
+):
+    stub = wsgi_coalescing_benchmark if coalesce else wsgi_benchmark
+    chunk_count = 10000
+
+    request = benchmark_pb2.SimpleRequest(response_size=1)
+    request.payload.body = b"\0"
+
+    def perf():
+        n = 0
+
+        for message in stub.StreamingFromServer(request):
+            n += 1
+            if n >= chunk_count:
+                break
+
+    benchmark(perf)
+
+
+@pytest.mark.parametrize("size", [1, 100, 10000, 1000000])
+def test_wsgi_streamingfromclient(wsgi_benchmark, benchmark, size):
+    chunk_count = max(10, 100000 // size)
+
+    request = benchmark_pb2.SimpleRequest()
+    request.payload.body = b"\0" * size
+
+    def perf():
+        message = wsgi_benchmark.StreamingFromClient(
+            request for _ in range(chunk_count)
+        )
+        assert len(message.payload.body) == size
+
+    benchmark(perf)
+
+
+@pytest.mark.parametrize("size", [1, 100, 10000, 1000000])
+def test_wsgi_streamingbothways(wsgi_benchmark, benchmark, size):
+    chunk_count = max(10, 100000 // size)
+
+    request = benchmark_pb2.SimpleRequest()
+    request.payload.body = b"\0" * size
+
+    def perf():
+        recv_bytes = 0
+
+        for message in wsgi_benchmark.StreamingBothWays(
+            request for _ in range(chunk_count)
+        ):
+            recv_bytes += len(message.payload.body)
+
+        assert recv_bytes == size * chunk_count
+
+    benchmark(perf)
@@ -0,0 +1,372 @@
+import base64
+import concurrent.futures
+import io
+import threading
+import time
+
+import grpc
+import pytest
+
+import sonora.wsgi
+from sonora import protocol
+from tests.conftest import make_app
+
+
+def _chunked(body, chunk_size):
+    chunks = [
+        b"%x\r\n%s\r\n" % (len(body[i : i + chunk_size]), body[i : i + chunk_size])
+        for i in range(0, len(body), chunk_size)
+    ]
+    return b"".join(chunks) + b"0\r\n\r\n"
+
+
+def _call(app, body, content_type="application/grpc-web+proto", chunk_size=None):
+    environ = {
+        "PATH_INFO": "/test.Service/Method",
+        "REQUEST_METHOD": "POST",
+        "CONTENT_TYPE": content_type,
+        "HTTP_ACCEPT": content_type,
+        "HTTP_HOST": "localhost",
+    }
+
+    if chunk_size is None:
+        environ["CONTENT_LENGTH"] = str(len(body))
+        environ["wsgi.input"] = io.BytesIO(body)
+    else:
+        environ["HTTP_TRANSFER_ENCODING"] = "chunked"
+        environ["wsgi.input"] = io.BytesIO(_chunked(body, chunk_size))
+
+    response = b"".join(app(environ, lambda status, headers: None))
+
+    if content_type == "application/grpc-web-text":
+        decoder = protocol.Base64Decoder()
+        response = decoder.decode(response)
+
+    return protocol.FrameDecoder().feed(response)
+
+
+def _body(messages):
+    return b"".join(protocol.wrap_message(False, False, m) for m in messages)
+
+
+MESSAGES = [b"a", b"", b"bc" * 1000, b"d"]
+
+
+def _join(request_iterator, context):
+    return b"".join(request_iterator)
+
+
+def _echo(request_iterator, context):
+    for request in request_iterator:
+        yield request
+
+
+@pytest.mark.parametrize("chunk_size", [None, 1, 7, 4096])
+def test_stream_unary(chunk_size):
+    app = make_app(sonora.wsgi.grpcWSGI, _join, grpc.stream_unary_rpc_method_handler)
+
+    frames = _call(app, _body(MESSAGES), chunk_size=chunk_size)
+
+    assert frames[0] == (False, False, b"".join(MESSAGES))
+    assert frames[1] == (True, False, b"grpc-status: 0\r\n")
+
+
+@pytest.mark.parametrize("chunk_size", [None, 3])
+def test_stream_stream(chunk_size):
+    app = make_app(sonora.wsgi.grpcWSGI, _echo, grpc.stream_stream_rpc_method_handler)
+
+    frames = _call(app, _body(MESSAGES), chunk_size=chunk_size)
+
+    assert [message for _, _, message in frames[:-1]] == MESSAGES
+    assert frames[-1][0]
+
+
+def test_stream_stream_text():
+    app = make_app(sonora.wsgi.grpcWSGI, _echo, grpc.stream_stream_rpc_method_handler)
+
+    body = b"".join(
+        base64.b64encode(protocol.wrap_message(False, False, m)) for m in MESSAGES
+    )
+
+    frames = _call(app, body, "application/grpc-web-text", chunk_size=5)
+
+    assert [message for _, _, message in frames[:-1]] == MESSAGES
+
+
+@pytest.mark.parametrize(
+    "content_type", ["application/grpc-web+proto", "application/grpc-web-text"]
+)
+def test_stream_stream_dechunked_by_server(content_type):
+    app = make_app(sonora.wsgi.grpcWSGI, _echo, grpc.stream_stream_rpc_method_handler)
+
+    body = _body(MESSAGES)
+    if content_type == "application/grpc-web-text":
+        body = base64.b64encode(body)
+
+    frames = b"".join(
+        app(
+            {
+                "PATH_INFO": "/test.Service/Method",
+                "REQUEST_METHOD": "POST",
+                "CONTENT_TYPE": content_type,
+                "HTTP_HOST": "localhost",
+                "HTTP_TRANSFER_ENCODING": "chunked",
+                "wsgi.input_terminated": True,
+                "wsgi.input": io.BytesIO(body),
+            },
+            lambda status, headers: None,
+        )
+    )
+    frames = protocol.FrameDecoder().feed(frames)
+
+    assert [message for _, _, message in frames[:-1]] == MESSAGES
+
+
+def test_stream_unary_reads_lazily():
+    body = _body([b"\0" * 1000] * 1000)
+    stream = io.BytesIO(body)
+    positions = []
+
+    def consume(request_iterator, context):
+        for request in request_iterator:
+            positions.append(stream.tell())
+        return b""
+
+    app = make_app(sonora.wsgi.grpcWSGI, consume, grpc.stream_unary_rpc_method_handler)
+
+    b"".join(
+        app(
+            {
+                "PATH_INFO": "/test.Service/Method",
+                "REQUEST_METHOD": "POST",
+                "CONTENT_TYPE": "application/grpc-web+proto",
+                "CONTENT_LENGTH": str(len(body)),
+                "HTTP_HOST": "localhost",
+                "wsgi.input": stream,
+            },
+            lambda status, headers: None,
+        )
+    )
+
+    assert len(positions) == 1000
+    assert positions[0] < len(body) // 10
+
+
+def _unary_call(app, environ):
+    environ = {
+        "PATH_INFO": "/test.Service/Method",
+        "REQUEST_METHOD": "POST",
+        "CONTENT_TYPE": "application/grpc-web+proto",
+        "HTTP_HOST": "localhost",
+        **environ,
+    }
+
+    return protocol.FrameDecoder().feed(
+        b"".join(app(environ, lambda status, headers: None))
+    )
+
+
+def _unary_echo(request, context):
+    return request
+
+
+def test_unary_input_terminated():
+    app = make_app(
+        sonora.wsgi.grpcWSGI, _unary_echo, grpc.unary_unary_rpc_method_handler
+    )
+
+    frames = _unary_call(
+        app,
+        {
+            "wsgi.input_terminated": True,
+            "wsgi.input": io.BytesIO(_body([b"x" * 100000])),
+        },
+    )
+
+    assert frames[0] == (False, False, b"x" * 100000)
+
+
+def test_unary_without_content_length():
+    app = make_app(
+        sonora.wsgi.grpcWSGI, _unary_echo, grpc.unary_unary_rpc_method_handler
+    )
+
+    frames = _unary_call(app, {"wsgi.input": io.BytesIO(_body([b"ignored"]))})
+
+    assert frames[-1] == (True, False, b"grpc-status: 0\r\n")
+
+
+@pytest.mark.parametrize(
+    "environ",
+    [
+        {"CONTENT_LENGTH": "100", "wsgi.input": io.BytesIO(_body([b"x"]))},
+        {
+            "HTTP_TRANSFER_ENCODING": "chunked",
+            "wsgi.input": io.BytesIO(_body([b"x"])),
+        },
+        {
+            "HTTP_TRANSFER_ENCODING": "chunked",
+            "wsgi.input": io.BytesIO(_chunked(_body([b"x"]), 4)[:-5]),
+        },
+    ],
+)
+def test_malformed_body(environ):
+    app = make_app(sonora.wsgi.grpcWSGI, _join, grpc.stream_unary_rpc_method_handler)
+
+    frames = _unary_call(app, environ)
+
+    assert frames[-1][0]
+    assert b"grpc-status: 13\r\n" in frames[-1][2]
+
+
+@pytest.mark.parametrize(
+    "method, handler",
+    [
+        (grpc.unary_unary_rpc_method_handler, _unary_echo),
+        (grpc.stream_unary_rpc_method_handler, _join),
+        (grpc.stream_stream_rpc_method_handler, _echo),
+    ],
+)
+def test_max_receive_message_length(method, handler):
+    app = make_app(
+        sonora.wsgi.grpcWSGI, handler, method, max_receive_message_length=1000
+    )
+
+    class Input(io.BytesIO):
+        def read(self, size=-1):
+            data = super().read(size)
+            reads.append(len(data))
+            return data
+
+    reads = []
+    body = _body([b"x" * 1000, b"x" * 1001, b"x" * 1000000])
+
+    frames = _unary_call(
+        app, {"CONTENT_LENGTH": str(len(body)), "wsgi.input": Input(body)}
+    )
+
+    assert frames[-1][0]
+    assert b"grpc-status: 8\r\n" in frames[-1][2]
+    assert sum(reads) < 100000
+
+
+def _timed_writes(app):
+    body = _body([b""])
+    environ = {
+        "PATH_INFO": "/test.Service/Method",
+        "REQUEST_METHOD": "POST",
+        "CONTENT_TYPE": "application/grpc-web+proto",
+        "CONTENT_LENGTH": str(len(body)),
+        "HTTP_HOST": "localhost",
+        "wsgi.input": io.BytesIO(body),
+    }
+
+    start = time.monotonic()
+    writes = []
+
+    for data in app(environ, lambda status, headers: None):
+        writes.append((time.monotonic() - start, data))
+
+    return writes
+
+
+@pytest.fixture
+def executor():
+    with concurrent.futures.ThreadPoolExecutor(1) as executor:
+        yield executor
+
+
+def test_coalesce_requires_executor():
+    with pytest.raises(ValueError):
+        sonora.wsgi.grpcWSGI(coalesce=True)
+
+
+def test_coalesced_burst(executor):
+    def burst(request, context):
+        for n in range(100):
+            yield b"%d" % n
+
+    app = make_app(
+        sonora.wsgi.grpcWSGI,
+        burst,
+        grpc.unary_stream_rpc_method_handler,
+        coalesce=True,
+        executor=executor,
+    )
+    writes = _timed_writes(app)
+
+    frames = protocol.FrameDecoder().feed(b"".join(data for _, data in writes))
+
+    assert [message for _, _, message in frames[:-1]] == [b"%d" % n for n in range(100)]
+    assert frames[-1][0]
+    assert len(writes) < 100
+
+
+def test_coalesced_pause(executor):
+    def pause(request, context):
+        yield from (b"x0", b"x1", b"x2")
+        time.sleep(0.5)
+        yield b"y"
+
+    app = make_app(
+        sonora.wsgi.grpcWSGI,
+        pause,
+        grpc.unary_stream_rpc_method_handler,
+        coalesce=True,
+        coalesce_max_delay=0.1,
+        executor=executor,
+    )
+    writes = _timed_writes(app)
+
+    # The burst is written as soon as the handler pauses, not along with the
+    # message after the pause.
+    tail = next(elapsed for elapsed, data in writes if b"x2" in data)
+    assert tail < 0.25
+
+    frames = protocol.FrameDecoder().feed(b"".join(data for _, data in writes))
+    assert [message for _, _, message in frames[:-1]] == [b"x0", b"x1", b"x2", b"y"]
+
+
+def test_coalesced_executor():
+    threads = []
+
+    def stream(request, context):
+        for n in range(3):
+            threads.append(threading.current_thread().name)
+            yield b"%d" % n
+
+    with concurrent.futures.ThreadPoolExecutor(
+        1, thread_name_prefix="coalesce"
+    ) as executor:
+        app = make_app(
+            sonora.wsgi.grpcWSGI,
+            stream,
+            grpc.unary_stream_rpc_method_handler,
+            coalesce=True,
+            executor=executor,
+        )
+        writes = _timed_writes(app)
+
+    frames = protocol.FrameDecoder().feed(b"".join(data for _, data in writes))
+    assert [message for _, _, message in frames[:-1]] == [b"0", b"1", b"2"]
+    assert all(name.startswith("coalesce") for name in threads[1:])
+
+
+def test_coalesced_abort(executor):
+    def abort(request, context):
+        yield b"a"
+        context.abort(grpc.StatusCode.PERMISSION_DENIED, "no")
+
+    app = make_app(
+        sonora.wsgi.grpcWSGI,
+        abort,
+        grpc.unary_stream_rpc_method_handler,
+        coalesce=True,
+        executor=executor,
+    )
+    frames = protocol.FrameDecoder().feed(
+        b"".join(data for _, data in _timed_writes(app))
+    )
+
+    assert frames[0] == (False, False, b"a")
+    assert b"grpc-status: 7\r\n" in frames[-1][2]